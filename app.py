@@ -1,13 +1,43 @@
 import os
+import io
 import json
+import uuid
+import hashlib
+import threading
+import subprocess
+import time
 import shutil
+import wave
+import struct
 import zipfile
+import resource
+import base64
+import csv
 import logging
+import re
+import unicodedata
 from datetime import datetime
-from flask import Flask, render_template, request, send_file, jsonify
+from functools import lru_cache, partial
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import numpy as np
+from scipy import fft as scipy_fft
+from scipy.signal import butter, sosfilt
+from scipy.ndimage import minimum_filter1d, uniform_filter1d
+from flask import Flask, render_template, request, send_file, jsonify, Response, stream_with_context
+from flask import session as browser_session, g
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import func
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm.exc import StaleDataError
 from pydub import AudioSegment
+from pydub.utils import mediainfo_json
+
+try:
+    import audioop
+except ImportError:
+    import pyaudioop as audioop
 from docx import Document
 
 # Configure logging
@@ -34,6 +64,14 @@ db.init_app(app)
 # Database Model
 class ForensicSession(db.Model):
     __tablename__ = 'forensic_sessions'
+    __table_args__ = (
+        # Cursor pagination walks (updated_at, id); each filter column leads its own index
+        db.Index('ix_forensic_sessions_updated', 'updated_at', 'id'),
+        db.Index('ix_forensic_sessions_case_number', 'case_number', 'updated_at', 'id'),
+        db.Index('ix_forensic_sessions_police_station', 'police_station', 'updated_at', 'id'),
+        db.Index('ix_forensic_sessions_district', 'district', 'updated_at', 'id'),
+        db.Index('ix_forensic_sessions_speaker_name', 'speaker_name', 'updated_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     session_name = db.Column(db.String(200), nullable=False)
@@ -48,24 +86,40 @@ class ForensicSession(db.Model):
     control_filename = db.Column(db.String(500))
     question_file_path = db.Column(db.String(500))
     control_file_path = db.Column(db.String(500))
+    # Audio cache entries (upload SHA-256) this session keeps from eviction
+    question_audio_hash = db.Column(db.String(64))
+    control_audio_hash = db.Column(db.String(64))
     
     # Session data
-    annotations_data = db.Column(db.Text)  # JSON string of all annotations
+    annotations_data = db.Column(db.Text)  # Legacy JSON blob, migrated into session_annotations
     bandpass_enabled = db.Column(db.Boolean, default=False)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Incremented on every write; clients send it back to detect concurrent edits
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    
+    __mapper_args__ = {'version_id_col': version}
+    
+    annotations = db.relationship(
+        'SessionAnnotation', back_populates='session', order_by='SessionAnnotation.position',
+        cascade='all, delete-orphan'
+    )
     
     def set_annotations(self, annotations):
-        """Store annotations as JSON string"""
-        self.annotations_data = json.dumps(annotations)
+        """Replace the session's annotations with rows in session_annotations"""
+        self.annotations = annotation_rows(annotations)
+        self.annotations_data = None
     
     def get_annotations(self):
-        """Retrieve annotations from JSON string"""
-        if self.annotations_data:
+        """Retrieve annotations grouped by panel"""
+        if self.annotations_data and not self.annotations:
             return json.loads(self.annotations_data)
-        return {"question": [], "control": []}
+        grouped = {panel: [] for panel in ANNOTATION_PANELS}
+        for ann in self.annotations:
+            grouped.setdefault(ann.panel, []).append(ann.to_dict())
+        return grouped
     
     def to_dict(self):
         """Convert session to dictionary for JSON serialization"""
@@ -79,12 +133,194 @@ class ForensicSession(db.Model):
             'speaker_name': self.speaker_name,
             'question_filename': self.question_filename,
             'control_filename': self.control_filename,
+            'question_audio_hash': self.question_audio_hash,
+            'control_audio_hash': self.control_audio_hash,
             'annotations': self.get_annotations(),
             'bandpass_enabled': self.bandpass_enabled,
             'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'version': self.version
         }
 
+# Bump whenever normalize_label changes, so keys stored by an older version
+# are recomputed once at startup
+LABEL_NORMALIZER_VERSION = 1
+
+class SessionAnnotation(db.Model):
+    __tablename__ = 'session_annotations'
+    __table_args__ = (
+        db.Index('ix_session_annotations_session_panel', 'session_id', 'panel', 'position'),
+        db.Index('ix_session_annotations_label', 'label_normalized', 'panel'),
+        db.Index('ix_session_annotations_normalizer', 'label_normalizer'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('forensic_sessions.id', ondelete='CASCADE'), nullable=False)
+    panel = db.Column(db.String(16), nullable=False)  # 'question' or 'control'
+    position = db.Column(db.Integer, nullable=False, default=0)
+    client_id = db.Column(db.BigInteger)  # Region id assigned by the browser, if any
+    label = db.Column(db.String(500), nullable=False)
+    label_normalized = db.Column(db.String(500), nullable=False)
+    # LABEL_NORMALIZER_VERSION that computed label_normalized
+    label_normalizer = db.Column(db.Integer, nullable=False, default=LABEL_NORMALIZER_VERSION, server_default='0')
+    start_time = db.Column(db.Float, nullable=False)
+    end_time = db.Column(db.Float, nullable=False)
+    
+    session = db.relationship('ForensicSession', back_populates='annotations')
+    
+    @property
+    def public_id(self):
+        """Id used by the API: the browser's id, or the negated row id for rows saved without one."""
+        return self.client_id if self.client_id is not None else -self.id
+    
+    def to_dict(self):
+        """Annotation in the shape the frontend sends and expects"""
+        return {'id': self.public_id, 'label': self.label, 'start': self.start_time, 'end': self.end_time}
+
+ANNOTATION_PANELS = ('question', 'control')
+
+# Devanagari spelling variants folded by normalize_label
+DEVANAGARI_DIGITS = str.maketrans('०१२३४५६७८९', '0123456789')
+# Nasal consonant + virama before a consonant is written as anusvara (हिन्दी = हिंदी)
+DEVANAGARI_NASAL_CLUSTER = re.compile('[ङञणनम]\u094d(?=[\u0915-\u0939])')
+# Nukta and zero-width (non-)joiners/spaces are dropped; chandrabindu becomes anusvara
+LABEL_CHAR_FOLDS = {0x093C: None, 0x200B: None, 0x200C: None, 0x200D: None, 0xFEFF: None, 0x00AD: None, 0x0901: 0x0902}
+
+def normalize_label(label):
+    """
+    Normalize a clueword label the way question/control matching compares
+    them: Unicode compatibility forms, case, punctuation and whitespace are
+    folded, as are Devanagari spelling variants (nukta, chandrabindu, nasal
+    clusters vs anusvara, Devanagari digits).
+    """
+    text = unicodedata.normalize('NFKD', label).translate(LABEL_CHAR_FOLDS).casefold()
+    text = DEVANAGARI_NASAL_CLUSTER.sub('\u0902', text.translate(DEVANAGARI_DIGITS))
+    text = ''.join(' ' if unicodedata.category(c).startswith('P') else c for c in text)
+    return unicodedata.normalize('NFC', ' '.join(text.split()))
+
+def annotation_rows(annotations):
+    """Build SessionAnnotation rows from the {"question": [...], "control": [...]} shape."""
+    rows = []
+    for panel in ANNOTATION_PANELS:
+        for position, ann in enumerate(annotations.get(panel) or []):
+            rows.append(SessionAnnotation(
+                panel=panel,
+                position=position,
+                client_id=ann.get('id'),
+                label=ann['label'],
+                label_normalized=normalize_label(ann['label']),
+                start_time=float(ann['start']),
+                end_time=float(ann['end'])
+            ))
+    return rows
+
+def upgrade_schema():
+    """Bring an existing database up to the current models.
+
+    create_all only creates missing tables, so columns and indexes added to
+    existing tables are created here.
+    """
+    inspector = db.inspect(db.engine)
+    added_columns = {
+        ForensicSession.__tablename__: {
+            'version': "INTEGER NOT NULL DEFAULT 1",
+            'question_audio_hash': "VARCHAR(64)",
+            'control_audio_hash': "VARCHAR(64)",
+        },
+        # Rows from before the column existed count as normalizer 0
+        SessionAnnotation.__tablename__: {
+            'label_normalizer': "INTEGER NOT NULL DEFAULT 0",
+        },
+    }
+    for table, columns in added_columns.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for name, ddl in columns.items():
+            if name not in existing:
+                with db.engine.begin() as conn:
+                    conn.execute(db.text(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}"))
+    for table in (ForensicSession.__table__, SessionAnnotation.__table__):
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    # Rows without updated_at would fall outside the pagination cursor
+    db.session.execute(
+        db.update(ForensicSession)
+        .where(ForensicSession.updated_at.is_(None))
+        .values(updated_at=func.coalesce(ForensicSession.created_at, datetime.utcnow()))
+    )
+    db.session.commit()
+
+def migrate_annotation_blobs(batch_size=200):
+    """Move annotations still stored in the legacy annotations_data column into rows.
+
+    Runs at startup and is idempotent: migrated sessions have annotations_data
+    cleared, and their updated_at is left untouched. Each session's rows are
+    inserted in the transaction that clears its blob, so workers starting
+    together migrate every session once.
+    """
+    migrated = 0
+    last_id = 0
+    while True:
+        batch = (db.session.query(ForensicSession.id, ForensicSession.annotations_data)
+                 .filter(ForensicSession.annotations_data.isnot(None), ForensicSession.id > last_id)
+                 .order_by(ForensicSession.id)
+                 .limit(batch_size).all())
+        if not batch:
+            break
+        for session_id, annotations_data in batch:
+            last_id = session_id
+            try:
+                rows = annotation_rows(json.loads(annotations_data))
+            except (ValueError, KeyError, TypeError) as e:
+                app.logger.error(f"Session {session_id} has unreadable annotations_data, not migrated: {e}")
+                continue
+            # Claim the blob first: a worker migrating concurrently blocks on
+            # the row and then matches nothing, so it inserts no duplicates
+            claimed = db.session.execute(
+                db.update(ForensicSession)
+                .where(ForensicSession.id == session_id, ForensicSession.annotations_data.isnot(None))
+                .values(annotations_data=None, updated_at=ForensicSession.updated_at)
+            )
+            if claimed.rowcount != 1:
+                continue
+            for row in rows:
+                row.session_id = session_id
+            db.session.add_all(rows)
+            migrated += 1
+        db.session.commit()
+    if migrated:
+        app.logger.info(f"Migrated annotations of {migrated} sessions into session_annotations")
+    return migrated
+
+def renormalize_annotation_labels(batch_size=1000):
+    """Recompute label_normalized for rows written by an older LABEL_NORMALIZER_VERSION.
+
+    Runs at startup after migrations. Up-to-date rows are skipped through the
+    label_normalizer index, so a restart costs one index lookup; a worker that
+    loses the race for a row leaves it to the one that stamped it first.
+    """
+    table = SessionAnnotation.__table__
+    updated = 0
+    last_id = 0
+    while True:
+        batch = (db.session.query(SessionAnnotation.id, SessionAnnotation.label)
+                 .filter(SessionAnnotation.label_normalizer < LABEL_NORMALIZER_VERSION, SessionAnnotation.id > last_id)
+                 .order_by(SessionAnnotation.id)
+                 .limit(batch_size).all())
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        db.session.execute(
+            db.update(table)
+            .where(table.c.id == db.bindparam('row_id'), table.c.label_normalizer < LABEL_NORMALIZER_VERSION)
+            .values(label_normalized=db.bindparam('key'), label_normalizer=LABEL_NORMALIZER_VERSION),
+            [{'row_id': row_id, 'key': normalize_label(label)} for row_id, label in batch]
+        )
+        db.session.commit()
+        updated += len(batch)
+    if updated:
+        app.logger.info(f"Renormalized {updated} annotation labels")
+    return updated
+
 # Initialize database tables (only if they don't exist)
 with app.app_context():
     try:
@@ -92,41 +328,620 @@ with app.app_context():
     except Exception as e:
         app.logger.info(f"Tables might already exist: {e}")
         pass
+    try:
+        upgrade_schema()
+        migrate_annotation_blobs()
+        renormalize_annotation_labels()
+    except Exception as e:
+        app.logger.error(f"Database upgrade failed: {e}")
+        db.session.rollback()
 
 # Configuration
-# Define paths for file storage
+# Define paths for file storage. Each browser gets its own workspace under
+# WORKSPACE_FOLDER holding these three subfolders and its package ZIP.
+WORKSPACE_FOLDER = 'workspaces'
 UPLOAD_FOLDER = 'uploads'
-STANDARDIZED_FOLDER = os.path.join('static', 'temp_standardized')
+STANDARDIZED_FOLDER = 'standardized'
 OUTPUT_FOLDER = 'output'
+# Workspaces idle for longer than this are removed by the artifact collector
+WORKSPACE_TTL_SECONDS = int(os.environ.get('WORKSPACE_TTL_SECONDS', 24 * 3600))
 
-def clear_directory(folder_path):
-    """Helper function to clean up directories"""
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path, exist_ok=True)
-        return
+# Standardized audio format (44.1kHz, mono, 16-bit PCM)
+STANDARD_FRAME_RATE = 44100
+STANDARD_CHANNELS = 1
+STANDARD_SAMPLE_WIDTH = 2
+# Frames decoded per block when standardizing, which bounds memory use
+STANDARDIZE_BLOCK_FRAMES = 1 << 16
+
+# Bandpass filter settings (voice band, 400Hz - 4000Hz)
+BANDPASS_LOW_FREQ = 400
+BANDPASS_HIGH_FREQ = 4000
+BANDPASS_ORDER = 2
+# Order-2 stages are RBJ biquads with FFmpeg's default highpass/lowpass width
+BANDPASS_Q = 0.707
+# 'numpy' filters in-process; 'ffmpeg' shells out to the ffmpeg binary
+BANDPASS_ENGINE = os.environ.get('BANDPASS_ENGINE', 'numpy')
+# Maximum per-sample deviation (16-bit LSB) from the FFmpeg filter chain
+BANDPASS_TOLERANCE_LSB = 2
+
+# Question/control label matching: 'exact' pairs labels equal after
+# normalize_label; 'fuzzy' also pairs labels left over on both sides that
+# are within a small edit distance (at most one edit per
+# LABEL_FUZZY_CHARS_PER_EDIT characters, and LABEL_FUZZY_MAX_DISTANCE)
+LABEL_MATCH = os.environ.get('LABEL_MATCH', 'exact')
+LABEL_MATCH_MODES = ('exact', 'fuzzy')
+LABEL_FUZZY_MAX_DISTANCE = 2
+LABEL_FUZZY_CHARS_PER_EDIT = 4
+
+# Clueword extraction worker pool ('thread' or 'process')
+EXTRACTION_EXECUTOR = os.environ.get('EXTRACTION_EXECUTOR', 'thread')
+EXTRACTION_MAX_WORKERS = int(os.environ.get('EXTRACTION_MAX_WORKERS', os.cpu_count() or 1))
+
+# Stream the /process ZIP as it is produced instead of staging it under output/
+STREAM_PACKAGE = os.environ.get('STREAM_PACKAGE', 'false').lower() == 'true'
+# PCM WAV barely shrinks with deflate, so it is stored as-is
+ZIP_COMPRESSION = {
+    '.wav': zipfile.ZIP_STORED,
+    '.docx': zipfile.ZIP_STORED,
+    '.txt': zipfile.ZIP_DEFLATED,
+}
+# Timestamp of every package entry, so the same case always gives the same archive
+PACKAGE_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# Add analysis_report.csv/.json (the report table, machine-readable) to packages
+REPORT_SIDECARS = os.environ.get('REPORT_SIDECARS', 'true').lower() == 'true'
+
+# Per-clueword acoustic features and question/control similarity scores,
+# added to the report and written to acoustic_features.json
+ACOUSTIC_FEATURES = os.environ.get('ACOUSTIC_FEATURES', 'true').lower() == 'true'
+FEATURE_FRAME_MS = 30
+FEATURE_HOP_MS = 10
+FEATURE_BATCH_FRAMES = 4096
+FEATURE_MEL_BANDS = 40
+FEATURE_MFCC_COUNT = 13
+FEATURE_F0_MIN_HZ = 70
+FEATURE_F0_MAX_HZ = 400
+FEATURE_VOICING_THRESHOLD = 0.45
+# Prefer the shortest pitch period whose peak is this close to the best one
+FEATURE_OCTAVE_RATIO = 0.9
+FEATURE_SILENCE_DBFS = -50
+# Formants come from an LPC fit to the band below FEATURE_LPC_RATE / 2
+FEATURE_LPC_RATE = 11025
+FEATURE_LPC_ORDER = 12
+FEATURE_FORMANT_MIN_HZ = 90
+FEATURE_ENVELOPE_POINTS = 512
+FEATURE_CONTOUR_POINTS = 50
+
+# Clueword candidate search: MFCC frames of each recording (cached as
+# mfcc.npy next to the standardized audio) aligned by subsequence DTW, first
+# on frames averaged SEARCH_COARSE_FACTOR at a time, then at full resolution
+# around the best SEARCH_COARSE_CANDIDATES coarse hits
+SEARCH_COARSE_FACTOR = 4
+SEARCH_COARSE_CANDIDATES = 16
+SEARCH_MAX_RESULTS = 5
+# Score is the mean cosine similarity of aligned (normalized) MFCC frames
+SEARCH_MIN_SCORE = 0.5
+SEARCH_MAX_QUERY_MS = 5000
+# The coarse pass skips target frames farther than this from any speech
+# region of the voice activity index (which can miss quiet word edges)
+SEARCH_SPEECH_MARGIN_MS = 500
+SEARCH_MAX_QUERIES = 200
+
+# Background package jobs (in-process worker threads, no external broker)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_HISTORY_LIMIT = 200
+# Finished packages, keyed by a hash of the audio, annotations and settings
+PACKAGE_CACHE_FOLDER = 'package_cache'
+PACKAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PACKAGE_CACHE_MAX_ENTRIES', 20))
+
+# Per-clueword segment/bandpass WAVs, keyed by source audio, boundaries and
+# filter settings, so re-processing only renders what changed (0 disables)
+CLUEWORD_CACHE_FOLDER = 'clueword_cache'
+CLUEWORD_CACHE_MAX_BYTES = int(os.environ.get('CLUEWORD_CACHE_MAX_BYTES', 1024 ** 3))
+
+# Content-addressed store of standardized audio, keyed by upload SHA-256
+AUDIO_CACHE_FOLDER = 'audio_cache'
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get('AUDIO_CACHE_MAX_BYTES', 5 * 1024 ** 3))
+
+# Artifact retention across the stores above and the workspaces: a
+# background collector removes artifacts unused for ARTIFACT_TTL_SECONDS,
+# then the least recently used ones until every store fits its own cap
+# (AUDIO_CACHE_MAX_BYTES, CLUEWORD_CACHE_MAX_BYTES, PACKAGE_CACHE_MAX_ENTRIES)
+# and everything together fits ARTIFACT_MAX_BYTES. Storing a new entry wakes it.
+# Audio referenced by a saved session or open in a workspace is never
+# evicted. Each pass deletes at most ARTIFACT_GC_MAX_DELETES artifacts, and
+# temporary files are removed once older than ARTIFACT_TEMP_GRACE_SECONDS.
+ARTIFACT_MAX_BYTES = int(os.environ.get('ARTIFACT_MAX_BYTES', 20 * 1024 ** 3))
+ARTIFACT_TTL_SECONDS = int(os.environ.get('ARTIFACT_TTL_SECONDS', 30 * 24 * 3600))
+ARTIFACT_GC_INTERVAL = int(os.environ.get('ARTIFACT_GC_INTERVAL', 600))
+ARTIFACT_GC_MAX_DELETES = 200
+ARTIFACT_TEMP_GRACE_SECONDS = 3600
+
+# Waveform peak pyramid: level 0 has one (max, min) pair per 256 samples and
+# every further level halves the resolution
+PEAKS_BASE_SAMPLES_PER_BIN = 256
+PEAKS_LEVEL_FACTOR = 2
+# Largest number of bins a single /peaks response may return
+PEAKS_MAX_BINS = 1 << 21
+
+# Voice activity index, built while standardizing (speech.json in the audio
+# cache entry): 10 ms frame energies are compared with a noise floor that
+# follows the quietest stretch of each VAD_FLOOR_WINDOW_MS. Speech starts
+# VAD_ON_DB above the floor and lasts while it stays VAD_OFF_DB above it.
+VAD_FRAME_MS = 10
+VAD_FLOOR_WINDOW_MS = 10000
+VAD_ON_DB = 9
+VAD_OFF_DB = 4
+VAD_MIN_SPEECH_DBFS = -55
+VAD_MIN_SPEECH_MS = 80
+# Word-like segments end at pauses of VAD_WORD_GAP_MS or energy dips of
+# VAD_WORD_DIP_DB; pauses shorter than VAD_MERGE_GAP_MS stay inside a region
+VAD_WORD_GAP_MS = 30
+VAD_WORD_DIP_DB = 6
+VAD_WORD_MIN_MS = 120
+VAD_MERGE_GAP_MS = 300
+
+# Spectrogram pyramid, built by background workers after standardization:
+# level 0 has one column per 10 ms (1024-sample Hann window), each further
+# level keeps the maximum of 4 columns. Columns hold 128 linear bands up to
+# 8 kHz, quantized to uint8 over the dB range below, and are served in tiles.
+SPECTROGRAM_WORKERS = int(os.environ.get('SPECTROGRAM_WORKERS', 1))
+SPECTROGRAM_HOP_MS = 10
+SPECTROGRAM_WINDOW = 1024
+SPECTROGRAM_ROWS = 128
+SPECTROGRAM_MAX_FREQ = 8000
+SPECTROGRAM_DB_FLOOR = -110
+SPECTROGRAM_DB_CEILING = -20
+SPECTROGRAM_LEVEL_FACTOR = 4
+SPECTROGRAM_TILE_COLUMNS = 512
+SPECTROGRAM_BLOCK_COLUMNS = 8192
+
+# Instrumentation: latency histogram buckets (seconds) for /metrics, and an
+# optional JSON-lines file receiving one per-phase timing record per job
+METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TIMING_LOG_PATH = os.environ.get('TIMING_LOG_PATH')
+
+# Session listing page size (default and upper bound for ?limit=)
+SESSIONS_PAGE_SIZE = 50
+SESSIONS_MAX_PAGE_SIZE = 500
+
+def current_workspace():
+    """Workspace directory of the requesting browser, created on first use.
+
+    The workspace id lives in the signed session cookie, so every worker
+    process resolves the same directory. Each call marks the workspace as
+    active for TTL cleanup.
+    """
+    workspace_id = browser_session.get('workspace_id', '')
+    if len(workspace_id) != 32 or not all(c in '0123456789abcdef' for c in workspace_id):
+        workspace_id = uuid.uuid4().hex
+        browser_session['workspace_id'] = workspace_id
+        browser_session.permanent = True
+    
+    workspace = os.path.abspath(os.path.join(WORKSPACE_FOLDER, workspace_id))
+    for folder in (UPLOAD_FOLDER, STANDARDIZED_FOLDER, OUTPUT_FOLDER):
+        os.makedirs(os.path.join(workspace, folder), exist_ok=True)
+    os.utime(workspace)
+    start_artifact_collector()
+    return workspace
+
+def standardized_path_for(workspace, panel_type):
+    return os.path.join(workspace, STANDARDIZED_FOLDER, f"{panel_type}_standardized.wav")
+
+# Stores scanned by the artifact collector; only the last three are evicted to fit the budget
+ARTIFACT_STORES = ('workspace', 'temp', 'audio', 'clueword', 'package')
+ARTIFACT_EVICTABLE_STORES = ('audio', 'clueword', 'package')
+
+def referenced_audio_hashes():
+    """Audio cache entries in use: referenced by a saved session or published in a workspace."""
+    hashes = set()
+    with app.app_context():
+        for column in (ForensicSession.question_audio_hash, ForensicSession.control_audio_hash):
+            hashes.update(audio_hash for (audio_hash,) in db.session.query(column).filter(column.isnot(None)).distinct())
+    try:
+        workspaces = os.listdir(WORKSPACE_FOLDER)
+    except OSError:
+        workspaces = []
+    for name in workspaces:
+        for panel in ANNOTATION_PANELS:
+            audio_hash = audio_hash_for(os.path.join(WORKSPACE_FOLDER, name), panel)
+            if audio_hash:
+                hashes.add(audio_hash)
+    return hashes
+
+def scan_artifacts(referenced):
+    """List every stored artifact with its size and last use.
+
+    Returns dicts with ``store``, ``path``, ``bytes``, ``last_used`` (the
+    mtime the stores touch on access) and ``referenced``. Files hard-linked
+    into workspaces are counted once, under the audio cache.
+    """
+    artifacts = []
+    seen_inodes = set()
     
-    for filename in os.listdir(folder_path):
-        file_path = os.path.join(folder_path, filename)
+    def tree_bytes(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for name in files:
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                if (st.st_dev, st.st_ino) not in seen_inodes:
+                    seen_inodes.add((st.st_dev, st.st_ino))
+                    total += st.st_size
+        return total
+    
+    def add(store, path, stamp_path, referenced=False):
         try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.unlink(file_path)
-            elif os.path.isdir(file_path):
-                shutil.rmtree(file_path)
-        except Exception as e:
-            app.logger.error(f"Error clearing {file_path}: {str(e)}")
+            last_used = os.path.getmtime(stamp_path)
+            size = tree_bytes(path) if os.path.isdir(path) else os.path.getsize(path)
+        except OSError:
+            return
+        artifacts.append({'store': store, 'path': path, 'stamp': stamp_path, 'bytes': size,
+                          'last_used': last_used, 'referenced': referenced})
+    
+    def entries(folder):
+        try:
+            return sorted(os.listdir(folder))
+        except OSError:
+            return []
+    
+    for name in entries(AUDIO_CACHE_FOLDER):
+        path = os.path.join(AUDIO_CACHE_FOLDER, name)
+        if name.endswith('.tmp'):
+            add('temp', path, path)
+        elif os.path.isdir(path):
+            meta_path = os.path.join(path, 'meta.json')
+            add('audio', path, meta_path if os.path.exists(meta_path) else path, name in referenced)
+    for name in entries(CLUEWORD_CACHE_FOLDER):
+        path = os.path.join(CLUEWORD_CACHE_FOLDER, name)
+        add('temp' if name.endswith('.tmp') else 'clueword', path, path)
+    for name in entries(PACKAGE_CACHE_FOLDER):
+        path = os.path.join(PACKAGE_CACHE_FOLDER, name)
+        if name.endswith('.tmp'):
+            add('temp', path, path)
+        elif name.endswith('.zip'):
+            add('package', path, path)
+    for name in entries(WORKSPACE_FOLDER):
+        path = os.path.join(WORKSPACE_FOLDER, name)
+        if os.path.isdir(path):
+            add('workspace', path, path)
+    return artifacts
+
+def summarize_artifacts(artifacts):
+    """Per-store counts and bytes of scanned artifacts."""
+    stores = {store: {'count': 0, 'bytes': 0, 'referenced_count': 0, 'referenced_bytes': 0} for store in ARTIFACT_STORES}
+    for artifact in artifacts:
+        totals = stores[artifact['store']]
+        totals['count'] += 1
+        totals['bytes'] += artifact['bytes']
+        if artifact['referenced']:
+            totals['referenced_count'] += 1
+            totals['referenced_bytes'] += artifact['bytes']
+    return {
+        'stores': stores,
+        'total_bytes': sum(totals['bytes'] for totals in stores.values()),
+        'max_bytes': ARTIFACT_MAX_BYTES,
+        'ttl_seconds': ARTIFACT_TTL_SECONDS,
+        'workspace_ttl_seconds': WORKSPACE_TTL_SECONDS
+    }
+
+def remove_artifact(artifact):
+    """Delete an artifact unless it was used after it was scanned."""
+    try:
+        if os.path.getmtime(artifact['stamp']) > artifact['last_used']:
+            return False
+    except OSError:
+        return False
+    if os.path.isdir(artifact['path']):
+        shutil.rmtree(artifact['path'], ignore_errors=True)
+    else:
+        try:
+            os.remove(artifact['path'])
+        except OSError:
+            return False
+    return True
+
+_artifact_stats = {}
+_artifact_stats_lock = threading.Lock()
+
+def collect_artifacts():
+    """One collector pass: expire unused artifacts, then evict LRU ones over a cap or the budget.
+
+    Referenced audio is kept regardless of age or budget. Returns the
+    storage summary after the pass, which is also served by /api/storage.
+    """
+    started = time.perf_counter()
+    now = time.time()
+    ttls = {'workspace': WORKSPACE_TTL_SECONDS, 'temp': ARTIFACT_TEMP_GRACE_SECONDS}
+    artifacts = sorted(scan_artifacts(referenced_audio_hashes()), key=lambda artifact: artifact['last_used'])
+    total = sum(artifact['bytes'] for artifact in artifacts)
+    removed = {'ttl': 0, 'budget': 0}
+    freed = 0
+    
+    def evict(artifact, reason):
+        nonlocal total, freed
+        if not remove_artifact(artifact):
+            return
+        artifact['removed'] = True
+        removed[reason] += 1
+        total -= artifact['bytes']
+        freed += artifact['bytes']
+        metrics.inc('clueword_artifact_evictions_total', {'store': artifact['store'], 'reason': reason})
+    
+    for artifact in artifacts:
+        if sum(removed.values()) >= ARTIFACT_GC_MAX_DELETES:
+            break
+        if not artifact['referenced'] and artifact['last_used'] < now - ttls.get(artifact['store'], ARTIFACT_TTL_SECONDS):
+            evict(artifact, 'ttl')
+    
+    # Store caps and the shared budget are enforced in one least-recently-used pass
+    store_bytes = {store: 0 for store in ARTIFACT_STORES}
+    store_count = {store: 0 for store in ARTIFACT_STORES}
+    for artifact in artifacts:
+        if not artifact.get('removed'):
+            store_bytes[artifact['store']] += artifact['bytes']
+            store_count[artifact['store']] += 1
+    
+    def over_cap(store):
+        return ((store == 'audio' and store_bytes[store] > AUDIO_CACHE_MAX_BYTES)
+                or (store == 'clueword' and store_bytes[store] > CLUEWORD_CACHE_MAX_BYTES)
+                or (store == 'package' and store_count[store] > PACKAGE_CACHE_MAX_ENTRIES))
+    
+    for artifact in artifacts:
+        if sum(removed.values()) >= ARTIFACT_GC_MAX_DELETES:
+            break
+        store = artifact['store']
+        if artifact['referenced'] or artifact.get('removed') or store not in ARTIFACT_EVICTABLE_STORES:
+            continue
+        if total > ARTIFACT_MAX_BYTES or over_cap(store):
+            evict(artifact, 'budget')
+            if artifact.get('removed'):
+                store_bytes[store] -= artifact['bytes']
+                store_count[store] -= 1
+    
+    stats = summarize_artifacts([artifact for artifact in artifacts if not artifact.get('removed')])
+    stats['last_collection'] = {
+        'finished_at': datetime.utcnow().isoformat(),
+        'seconds': round(time.perf_counter() - started, 3),
+        'removed': removed,
+        'freed_bytes': freed
+    }
+    with _artifact_stats_lock:
+        _artifact_stats.clear()
+        _artifact_stats.update(stats)
+    if freed:
+        app.logger.info(f"Artifact collector removed {sum(removed.values())} artifacts ({freed} bytes)")
+    return stats
+
+_artifact_collector = None
+_artifact_collector_lock = threading.Lock()
+_artifact_collector_wakeup = threading.Event()
+
+def start_artifact_collector():
+    """Start the background artifact collector once per worker process."""
+    global _artifact_collector
+    with _artifact_collector_lock:
+        if _artifact_collector is not None and _artifact_collector.is_alive():
+            return
+        
+        def collect_forever():
+            while True:
+                try:
+                    collect_artifacts()
+                except Exception as e:
+                    app.logger.warning(f"Error collecting artifacts: {str(e)}")
+                _artifact_collector_wakeup.wait(ARTIFACT_GC_INTERVAL)
+                _artifact_collector_wakeup.clear()
+        
+        _artifact_collector = threading.Thread(target=collect_forever, name='artifact-collector', daemon=True)
+        _artifact_collector.start()
+
+def request_artifact_collection():
+    """Run a collector pass soon, e.g. after a new cache entry was stored."""
+    start_artifact_collector()
+    _artifact_collector_wakeup.set()
+
+app.config["PERMANENT_SESSION_LIFETIME"] = WORKSPACE_TTL_SECONDS
+
+class MetricsRegistry:
+    """Thread-safe counters and histograms rendered in the Prometheus text format.
+
+    Values are per process; with several gunicorn workers each one reports
+    its own series.
+    """
+    
+    def __init__(self, buckets=METRICS_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._meta = OrderedDict()
+        self._counters = {}
+        self._histograms = {}
+    
+    def describe(self, name, kind, help_text):
+        self._meta[name] = (kind, help_text)
+    
+    def inc(self, name, labels=None, amount=1):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+    
+    def observe(self, name, value, labels=None):
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            state = self._histograms.get(key)
+            if state is None:
+                state = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+    
+    @staticmethod
+    def _labels(pairs):
+        if not pairs:
+            return ''
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+        return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+    
+    def render(self, extra_lines=()):
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(state) for key, state in self._histograms.items()}
+        lines = []
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'histogram':
+                for (metric, pairs), state in sorted(histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(self.buckets, state):
+                        lines.append(f"{name}_bucket{self._labels(pairs + (('le', repr(float(bound))),))} {count}")
+                    lines.append(f"{name}_bucket{self._labels(pairs + (('le', '+Inf'),))} {state[-1]}")
+                    lines.append(f"{name}_sum{self._labels(pairs)} {state[-2]}")
+                    lines.append(f"{name}_count{self._labels(pairs)} {state[-1]}")
+            else:
+                for (metric, pairs), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{self._labels(pairs)} {value}")
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+metrics = MetricsRegistry()
+metrics.describe('clueword_http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+metrics.describe('clueword_http_request_duration_seconds', 'histogram', 'Time to produce the HTTP response, by route.')
+metrics.describe('clueword_phase_duration_seconds', 'histogram', 'Duration of pipeline phases (decode, resample, slice, bandpass, wav_export, report, zip, ...).')
+metrics.describe('clueword_phase_bytes_total', 'counter', 'Bytes handled by each pipeline phase.')
+metrics.describe('clueword_phase_samples_total', 'counter', 'Audio samples handled by each pipeline phase.')
+metrics.describe('clueword_artifact_cache_total', 'counter', 'Clueword artifact cache lookups by result.')
+
+# Spans of the current thread: 'trace' collects a job's spans, 'deferred'
+# holds spans of extraction workers until the parent records them
+_span_local = threading.local()
+
+def record_span(span):
+    """Add a finished span to the metrics and to the current job trace."""
+    deferred = getattr(_span_local, 'deferred', None)
+    if deferred is not None:
+        deferred.append(span)
+        return
+    metrics.observe('clueword_phase_duration_seconds', span['seconds'], {'phase': span['name']})
+    if span['bytes']:
+        metrics.inc('clueword_phase_bytes_total', {'phase': span['name']}, span['bytes'])
+    if span['samples']:
+        metrics.inc('clueword_phase_samples_total', {'phase': span['name']}, span['samples'])
+    trace = getattr(_span_local, 'trace', None)
+    if trace is not None:
+        trace.append(span)
+
+@contextmanager
+def timed_span(name, nbytes=0, samples=0):
+    """Time a pipeline phase. The yielded dict's bytes/samples may be filled in by the caller."""
+    span = {'name': name, 'bytes': nbytes, 'samples': samples}
+    started = time.perf_counter()
+    try:
+        yield span
+    finally:
+        span['seconds'] = time.perf_counter() - started
+        record_span(span)
+
+@contextmanager
+def job_trace(kind):
+    """Collect the spans of one job; log a per-phase summary when it ends.
+
+    Nested traces on the same thread fold into the outer one.
+    """
+    if getattr(_span_local, 'trace', None) is not None:
+        yield
+        return
+    _span_local.trace = spans = []
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _span_local.trace = None
+        total = time.perf_counter() - started
+        phases = OrderedDict()
+        for span in spans:
+            phase = phases.setdefault(span['name'], {'seconds': 0.0, 'bytes': 0, 'samples': 0, 'count': 0})
+            phase['seconds'] += span['seconds']
+            phase['bytes'] += span['bytes']
+            phase['samples'] += span['samples']
+            phase['count'] += 1
+        app.logger.info(f"{kind} finished in {total:.3f}s: " + ', '.join(
+            f"{name} {phase['seconds']:.3f}s" for name, phase in phases.items()))
+        if TIMING_LOG_PATH:
+            record = {'time': datetime.utcnow().isoformat(), 'job': kind, 'id': uuid.uuid4().hex,
+                      'seconds': round(total, 6), 'phases': phases}
+            try:
+                with open(TIMING_LOG_PATH, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError as e:
+                app.logger.warning(f"Could not write timing log: {str(e)}")
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.inc('clueword_http_requests_total', {'route': route, 'method': request.method, 'status': str(response.status_code)})
+    if 'request_started' in g:
+        metrics.observe('clueword_http_request_duration_seconds', time.perf_counter() - g.request_started,
+                        {'route': route, 'method': request.method})
+    return response
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text exposition of request and pipeline metrics for this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    with _package_jobs_lock:
+        job_counts = {}
+        for job in _package_jobs.values():
+            job_counts[job['status']] = job_counts.get(job['status'], 0) + 1
+    extra = [
+        "# HELP process_cpu_seconds_total User and system CPU time of this process.",
+        "# TYPE process_cpu_seconds_total counter",
+        f"process_cpu_seconds_total {usage.ru_utime + usage.ru_stime}",
+        "# HELP process_max_resident_memory_bytes Peak resident set size of this process.",
+        "# TYPE process_max_resident_memory_bytes gauge",
+        f"process_max_resident_memory_bytes {usage.ru_maxrss * 1024}",
+        "# HELP clueword_package_jobs Background package jobs known to this process, by status.",
+        "# TYPE clueword_package_jobs gauge",
+    ] + [f'clueword_package_jobs{{status="{status}"}} {count}' for status, count in sorted(job_counts.items())]
+    with _artifact_stats_lock:
+        stores = dict(_artifact_stats.get('stores') or {})
+    if stores:
+        extra += [
+            "# HELP clueword_artifact_bytes Bytes on disk per artifact store at the last collector pass.",
+            "# TYPE clueword_artifact_bytes gauge",
+        ] + [f'clueword_artifact_bytes{{store="{store}"}} {totals["bytes"]}' for store, totals in stores.items()]
+    return Response(metrics.render(extra), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/storage', methods=['GET'])
+def get_storage_stats():
+    """Artifact store usage as of the last collector pass (``?refresh=true`` rescans now)"""
+    try:
+        with _artifact_stats_lock:
+            stats = dict(_artifact_stats)
+        if not stats or request.args.get('refresh', 'false').lower() == 'true':
+            # Scanning only; nothing is removed outside the collector
+            stats = dict(stats, **summarize_artifacts(scan_artifacts(referenced_audio_hashes())))
+        return jsonify(stats)
+    except Exception as e:
+        app.logger.error(f"Error reading storage stats: {str(e)}")
+        return jsonify({'error': 'Failed to read storage stats'}), 500
 
 @app.route('/')
 def index():
-    """Renders the main HTML page and clears old session data."""
+    """Renders the main HTML page."""
     try:
-        # Clean up directories for a fresh session
-        for folder in [UPLOAD_FOLDER, STANDARDIZED_FOLDER, OUTPUT_FOLDER]:
-            clear_directory(folder)
-        
-        # Clear the root-level zip file if it exists
-        if os.path.exists('clueword_analysis.zip'):
-            os.remove('clueword_analysis.zip')
-            
+        # Other browsers' work is left alone; idle workspaces expire on their own
+        current_workspace()
         return render_template('index.html')
     except Exception as e:
         app.logger.error(f"Error in index route: {str(e)}")
@@ -151,27 +966,33 @@ def standardize_audio():
         if not panel_type or panel_type not in ['question', 'control']:
             return jsonify({"error": "Invalid panel type."}), 400
         
-        # Ensure upload folder exists
-        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-        os.makedirs(STANDARDIZED_FOLDER, exist_ok=True)
-        
-        original_filename = f"{panel_type}_original"
-        original_path = os.path.join(UPLOAD_FOLDER, original_filename)
-        file.save(original_path)
+        workspace = current_workspace()
         
-        # Load and standardize audio
-        audio = AudioSegment.from_file(original_path)
-        standardized_audio = audio.set_frame_rate(44100).set_channels(1).set_sample_width(2)
-        
-        standardized_filename = f"{panel_type}_standardized.wav"
-        standardized_path = os.path.join(STANDARDIZED_FOLDER, standardized_filename)
-        standardized_audio.export(standardized_path, format="wav")
+        # The upload is only kept until its standardization is in the audio cache
+        original_path = os.path.join(workspace, UPLOAD_FOLDER, f"{panel_type}_original.{uuid.uuid4().hex}")
+        try:
+            audio_hash = save_upload(file, original_path)
+            
+            # Reuse a previous standardization of the same bytes when possible
+            meta = lookup_audio_cache(audio_hash)
+            cached = meta is not None
+            if not cached:
+                with job_trace('standardize'):
+                    meta = build_audio_cache_entry(audio_hash, original_path, file.filename)
+        finally:
+            if os.path.exists(original_path):
+                os.remove(original_path)
+        publish_cached_audio(audio_hash, workspace, panel_type)
+        schedule_spectrogram(audio_hash)
+        schedule_search_index(audio_hash)
         
-        return jsonify({
-            "success": True,
-            "url": f"/static/temp_standardized/{standardized_filename}",
-            "original_filename": file.filename
-        })
+        return jsonify(dict(
+            published_audio_info(panel_type, audio_hash, meta),
+            success=True,
+            cached=cached,
+            throughput_samples_per_sec=None if cached else meta['samples_per_sec'],
+            original_filename=file.filename
+        ))
 
     except Exception as e:
         app.logger.error(f"Error in standardize_audio: {str(e)}")
@@ -197,6 +1018,19 @@ def process_audio():
         q_original_filename = request.form.get('question_original_filename')
         c_original_filename = request.form.get('control_original_filename')
         enable_bandpass = request.form.get('enable_bandpass', 'true').lower() == 'true'
+        label_match = request.form.get('label_match', LABEL_MATCH)
+        if label_match not in LABEL_MATCH_MODES:
+            return jsonify({"error": "Invalid label matching mode."}), 400
+        try:
+            bandpass_low = float(request.form.get('bandpass_low', BANDPASS_LOW_FREQ))
+            bandpass_high = float(request.form.get('bandpass_high', BANDPASS_HIGH_FREQ))
+            bandpass_order = int(request.form.get('bandpass_order', BANDPASS_ORDER))
+        except ValueError:
+            return jsonify({"error": "Invalid bandpass filter settings."}), 400
+        bandpass_engine = request.form.get('bandpass_engine', BANDPASS_ENGINE)
+        
+        if not 0 < bandpass_low < bandpass_high or bandpass_order < 1 or bandpass_engine not in ['numpy', 'ffmpeg']:
+            return jsonify({"error": "Invalid bandpass filter settings."}), 400
         
         # Get case information
         case_info = {
@@ -210,82 +1044,62 @@ def process_audio():
         if not q_original_filename or not c_original_filename:
             return jsonify({"error": "Original filenames are required."}), 400
 
-        # Load original audio files
-        q_audio_path = os.path.join(UPLOAD_FOLDER, "question_original")
-        c_audio_path = os.path.join(UPLOAD_FOLDER, "control_original")
+        # Map the standardized PCM once per file; segments are sliced from it
+        workspace = current_workspace()
+        q_pcm, q_rate = load_source_pcm(workspace, 'question')
+        c_pcm, c_rate = load_source_pcm(workspace, 'control')
         
-        if not os.path.exists(q_audio_path) or not os.path.exists(c_audio_path):
+        if q_pcm is None or c_pcm is None:
             return jsonify({"error": "Original audio files not found."}), 400
-            
-        q_audio = AudioSegment.from_file(q_audio_path)
-        c_audio = AudioSegment.from_file(c_audio_path)
-
-        report_data = []
-        matches_found = 0
-        
-        # Create a map of control annotations for quick lookup
-        control_map = {ann['label'].lower().strip(): ann for ann in c_annotations}
-
-        # Clear output directory
-        clear_directory(OUTPUT_FOLDER)
-
-        # Process question annotations and find matches
-        for q_ann in q_annotations:
-            q_label_clean = q_ann['label'].lower().strip()
-            if q_label_clean in control_map:
-                matches_found += 1
-                c_ann = control_map[q_label_clean]
-                
-                # Create safe directory name
-                safe_label = "".join(c for c in q_ann['label'] if c.isalnum() or c in (' ', '_')).rstrip()
-                if not safe_label:
-                    safe_label = f"clueword_{matches_found}"
-                    
-                clueword_dir = os.path.join(OUTPUT_FOLDER, safe_label)
-                os.makedirs(clueword_dir, exist_ok=True)
-
-                # Extract question segment
-                q_start_ms = float(q_ann['start']) * 1000
-                q_end_ms = float(q_ann['end']) * 1000
-                q_seg = q_audio[q_start_ms:q_end_ms].set_channels(1).set_frame_rate(44100)
-                q_seg.export(os.path.join(clueword_dir, "question.wav"), format="wav")
-                
-                # Apply bandpass filter to question segment if enabled (400Hz - 4000Hz)
-                if enable_bandpass:
-                    q_seg_bpf = apply_bandpass_filter(q_seg, 400, 4000)
-                    q_seg_bpf.export(os.path.join(clueword_dir, "bpf_question.wav"), format="wav")
-                
-                report_data.append(["Question", q_ann['label'], q_start_ms, q_end_ms, q_end_ms - q_start_ms])
-
-                # Extract control segment
-                c_start_ms = float(c_ann['start']) * 1000
-                c_end_ms = float(c_ann['end']) * 1000
-                c_seg = c_audio[c_start_ms:c_end_ms].set_channels(1).set_frame_rate(44100)
-                c_seg.export(os.path.join(clueword_dir, "control.wav"), format="wav")
-                
-                # Apply bandpass filter to control segment if enabled (400Hz - 4000Hz)
-                if enable_bandpass:
-                    c_seg_bpf = apply_bandpass_filter(c_seg, 400, 4000)
-                    c_seg_bpf.export(os.path.join(clueword_dir, "bpf_control.wav"), format="wav")
-                
-                report_data.append(["Control", c_ann['label'], c_start_ms, c_end_ms, c_end_ms - c_start_ms])
-        
-        if matches_found == 0:
+
+        # Match question annotations to control annotations; each run gets a
+        # name of its own under output/ for its ZIP, removed once it is opened
+        output_folder = os.path.join(workspace, OUTPUT_FOLDER, uuid.uuid4().hex)
+        jobs = build_clueword_jobs(q_annotations, c_annotations, output_folder, label_match)
+        
+        if not jobs:
             return jsonify({"error": "No matching annotations found between question and control files."}), 400
 
-        # Create analysis report
-        create_report(report_data, OUTPUT_FOLDER, q_original_filename, c_original_filename, matches_found, enable_bandpass, case_info)
+        bandpass = make_bandpass_settings(enable_bandpass, bandpass_low, bandpass_high, bandpass_order, bandpass_engine)
+        sources = {'question': (q_pcm, q_rate), 'control': (c_pcm, c_rate)}
+        # The upload hashes already identify the standardized audio
+        fingerprints = {panel: source_fingerprint(*sources[panel], audio_hash_for(workspace, panel)) for panel in sources}
+        
+        if request.form.get('async', 'false').lower() == 'true':
+            # Build in the background; the client polls /jobs/<id> for progress
+            job = submit_package_job(jobs, sources, fingerprints, bandpass, q_original_filename, c_original_filename, enable_bandpass, case_info)
+            return jsonify(job_status(job)), 202
+
+        stream_package = request.form.get('stream_package', str(STREAM_PACKAGE)).lower() == 'true'
+        if stream_package:
+            # Nothing is staged on disk; the ZIP is sent as it is produced
+            package = generate_package_stream(jobs, sources, bandpass, q_original_filename, c_original_filename, enable_bandpass, case_info, fingerprints=fingerprints)
+            return Response(
+                stream_with_context(package),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename=clueword_analysis.zip'}
+            )
 
-        # Create ZIP file
-        zip_path = 'clueword_analysis.zip'
-        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, _, files in os.walk(OUTPUT_FOLDER):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arc_name = os.path.relpath(file_path, OUTPUT_FOLDER)
-                    zipf.write(file_path, arc_name)
+        # The same writer as the streamed and batch packages, so every
+        # path produces the same archive for the same case
+        zip_path = f"{output_folder}.zip"
+        try:
+            with job_trace('process'):
+                failures = write_package(zip_path, jobs, sources, bandpass, q_original_filename, c_original_filename, enable_bandpass, case_info, fingerprints=fingerprints)
+            if len(failures) == len(jobs):
+                discard_run_output(output_folder)
+                return jsonify({"error": "Clueword extraction failed for every matching annotation."}), 500
+            response = send_file(zip_path, as_attachment=True, download_name='clueword_analysis.zip')
+        except Exception:
+            discard_run_output(output_folder)
+            raise
         
-        return send_file(zip_path, as_attachment=True, download_name='clueword_analysis.zip')
+        # An open file cannot be deleted on Windows, so the ZIP is removed
+        # once the response has closed it. Close callbacks are skipped for
+        # responses handed straight to the server's file wrapper.
+        response.direct_passthrough = False
+        response.call_on_close(partial(discard_run_output, output_folder))
+        return response
 
     except json.JSONDecodeError:
         return jsonify({"error": "Invalid JSON in annotations data."}), 400
@@ -293,227 +1107,1405 @@ def process_audio():
         app.logger.error(f"Error in process_audio: {str(e)}")
         return jsonify({"error": "An internal server error occurred during processing."}), 500
 
-def create_report(data, output_dir, q_filename, c_filename, matches_count, enable_bandpass=True, case_info=None):
-    """Generates a comprehensive .docx report."""
+def discard_run_output(output_folder):
+    """Remove a /process run's ZIP."""
     try:
-        from docx.shared import Inches
-        from docx.enum.text import WD_ALIGN_PARAGRAPH
-        from docx.oxml.ns import qn
-        
-        doc = Document()
-        
-        # Title
-        title = doc.add_heading('Clueword Sheet', 0)
-        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        
-        # Add page numbers
-        from docx.oxml import parse_xml
-        section = doc.sections[0]
-        header = section.header
-        footer = section.footer
+        os.remove(f"{output_folder}.zip")
+    except OSError:
+        pass
+
+def build_report_files(data, q_filename, c_filename, matches_count, enable_bandpass=True, case_info=None, features=None):
+    """
+    The report plus, with REPORT_SIDECARS, its CSV/JSON sidecars and, when
+    features (from compare_cluewords) are given, acoustic_features.json.
+    Returns [(filename, bytes)].
+    """
+    with timed_span('report') as span:
+        report_files = [build_report(data, q_filename, c_filename, matches_count, enable_bandpass, case_info, features)]
+        span['bytes'] = len(report_files[0][1])
+    if REPORT_SIDECARS:
+        with timed_span('report_sidecars') as span:
+            sidecars = build_report_sidecars(data, q_filename, c_filename, matches_count, enable_bandpass, case_info, features)
+            span['bytes'] = sum(len(data) for _, data in sidecars)
+        report_files += sidecars
+    if features:
+        report_files.append(("acoustic_features.json", build_features_sidecar(q_filename, c_filename, features)))
+    return report_files
+
+REPORT_SUBHEADERS = [
+    'Clueword',
+    'Start (HH:MM:SS:MS)',
+    'End (HH:MM:SS:MS)',
+    'Duration (ms)',
+    'Start (HH:MM:SS:MS)',
+    'End (HH:MM:SS:MS)',
+    'Duration (ms)'
+]
+
+def report_matches(data):
+    """
+    Group report_data rows into one (label, question, control) entry per
+    clueword pair. Both rows of a pair carry the job's unique pair label
+    (see build_clueword_jobs).
+    """
+    clueword_matches = {}
+    for source, label, start_ms, end_ms, duration_ms in data:
+        match = clueword_matches.setdefault(label, {'question': None, 'control': None})
+        match[source.lower()] = {'start_ms': start_ms, 'end_ms': end_ms, 'duration_ms': duration_ms}
+    return [(label, match['question'], match['control'])
+            for label, match in clueword_matches.items()
+            if match['question'] and match['control']]
+
+FEATURE_SUBHEADERS = [
+    'Clueword',
+    'MFCC Similarity',
+    'Spectral Correlation',
+    'F0 Question / Control (Hz)',
+    'F0 Difference (semitones)',
+    'Formant Difference (%)',
+    'Score'
+]
+
+def feature_table_rows(matches, features):
+    """The acoustic comparison rows of the report, as text cells."""
+    def cell(value, fmt):
+        return 'N/A' if value is None else format(value, fmt)
+    
+    rows = []
+    for label, _, _ in matches:
+        if label not in features:
+            continue
+        q, c, scores = features[label]['question'], features[label]['control'], features[label]['similarity']
+        rows.append([
+            label,
+            cell(scores['mfcc_cosine'], '.3f'),
+            cell(scores['spectral_correlation'], '.3f'),
+            f"{cell(q['f0_mean_hz'], '.0f')} / {cell(c['f0_mean_hz'], '.0f')}",
+            cell(scores['f0_difference_semitones'], '+.1f'),
+            cell(scores['formant_difference_pct'], '.1f'),
+            cell(None if scores['score'] is None else 100 * scores['score'], '.0f'),
+        ])
+    return rows
+
+def report_table_rows(matches):
+    """The clueword table rows of the report, as text cells."""
+    return [
+        [label,
+         format_time_hhmmssms(q['start_ms']), format_time_hhmmssms(q['end_ms']), f"{q['duration_ms']:.0f}",
+         format_time_hhmmssms(c['start_ms']), format_time_hhmmssms(c['end_ms']), f"{c['duration_ms']:.0f}"]
+        for label, q, c in matches
+    ]
+
+@lru_cache(maxsize=4)
+def report_template(with_case_info, with_features=False):
+    """
+    Build the report skeleton once per process: title, page-number footer,
+    case table and clueword table headers with their styling applied, plus
+    one prototype data row (and the acoustic comparison table when
+    with_features). Each value to fill in is a run of its own whose text is
+    a {placeholder}.
+    """
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml import parse_xml
+    
+    doc = Document()
+    
+    title = doc.add_heading('Clueword Sheet', 0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Page number field in the footer
+    footer_para = doc.sections[0].footer.paragraphs[0]
+    footer_para.text = "Page "
+    run = footer_para.runs[0]
+    w_ns = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    run._r.append(parse_xml(f'<w:fldChar w:fldCharType="begin" {w_ns}/>'))
+    run._r.append(parse_xml(f'<w:instrText xml:space="preserve" {w_ns}> PAGE </w:instrText>'))
+    run._r.append(parse_xml(f'<w:fldChar w:fldCharType="end" {w_ns}/>'))
+    footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    if with_case_info:
+        case_header = doc.add_heading('Header Title:', level=1)
+        case_header.alignment = WD_ALIGN_PARAGRAPH.LEFT
         
-        # Add page number to footer
-        footer_para = footer.paragraphs[0]
-        footer_para.text = "Page "
-        run = footer_para.runs[0]
-        fldChar1 = parse_xml(r'<w:fldChar w:fldCharType="begin" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-        run._r.append(fldChar1)
+        case_rows = [
+            ("Case No.", '{case_number}'),
+            ("Police Station Name", '{police_station}'),
+            ("District", '{district}'),
+            ("C.R./A.D.R. No.", '{cr_adr_number}'),
+            ("Speaker Name", '{speaker_name}'),
+        ]
+        case_table = doc.add_table(rows=len(case_rows), cols=2)
+        case_table.style = 'Table Grid'
+        for row, (label, placeholder) in zip(case_table.rows, case_rows):
+            row.cells[0].paragraphs[0].add_run(label).font.bold = True
+            row.cells[1].text = placeholder
         
-        instrText = parse_xml(r'<w:instrText xml:space="preserve" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"> PAGE </w:instrText>')
-        run._r.append(instrText)
+        doc.add_paragraph()
+    
+    doc.add_paragraph("Total Matching Cluewords Found: ").add_run('{matches_count}')
+    doc.add_paragraph()
+    
+    table = doc.add_table(rows=3, cols=7, style='Table Grid')
+    table.autofit = False
+    
+    hdr_cells = table.rows[0].cells
+    hdr_cells[0].merge(hdr_cells[3])
+    hdr_cells[4].merge(hdr_cells[6])
+    for cell, caption, placeholder in ((hdr_cells[0], 'Question File: ', '{q_filename}'), (hdr_cells[4], 'Control File: ', '{c_filename}')):
+        cell.paragraphs[0].add_run(caption).font.bold = True
+        cell.paragraphs[0].add_run(placeholder).font.bold = True
+    
+    for cell, header in zip(table.rows[1].cells, REPORT_SUBHEADERS):
+        cell.paragraphs[0].add_run(header).font.bold = True
+    
+    # Prototype data row, cloned for every clueword
+    for cell in table.rows[2].cells:
+        cell.text = '{cell}'
+    
+    if with_features:
+        doc.add_paragraph()
+        doc.add_heading('Acoustic Comparison', level=1)
+        doc.add_paragraph(
+            "Measured on the unfiltered question and control segments. Score (0-100) is the mean of "
+            "the MFCC, spectral, F0 and formant similarities; it is a screening aid, not a conclusion."
+        )
+        features_table = doc.add_table(rows=2, cols=len(FEATURE_SUBHEADERS), style='Table Grid')
+        for cell, header in zip(features_table.rows[0].cells, FEATURE_SUBHEADERS):
+            cell.paragraphs[0].add_run(header).font.bold = True
+        for cell in features_table.rows[1].cells:
+            cell.text = '{cell}'
+    
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def build_report(data, q_filename, c_filename, matches_count, enable_bandpass=True, case_info=None, features=None):
+    """
+    Generates a comprehensive .docx report in memory by filling the cached
+    report template; data rows are cloned from a prototype row in bulk.
+    Returns (filename, bytes), falling back to a plain-text report.
+    """
+    try:
+        from copy import deepcopy
+        from docx.oxml.ns import qn
         
-        fldChar2 = parse_xml(r'<w:fldChar w:fldCharType="end" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"/>')
-        run._r.append(fldChar2)
-        footer_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        doc = Document(io.BytesIO(report_template(bool(case_info), bool(features))))
         
-        # Case Information Header (Bold format as requested)
+        values = {
+            '{q_filename}': q_filename,
+            '{c_filename}': c_filename,
+            '{matches_count}': str(matches_count),
+        }
         if case_info:
-            case_header = doc.add_heading('Header Title:', level=1)
-            case_header.alignment = WD_ALIGN_PARAGRAPH.LEFT
-            
-            # Create case information table
-            case_table = doc.add_table(rows=2, cols=2)
-            case_table.style = 'Table Grid'
-            
-            # Row 1
-            case_table.cell(0, 0).text = "Case No."
-            case_table.cell(0, 1).text = case_info.get('case_number', 'N/A')
-            case_table.cell(1, 0).text = "Police Station Name"
-            case_table.cell(1, 1).text = case_info.get('police_station', 'N/A')
-            
-            # Add more rows for district and CR/ADR
-            row = case_table.add_row()
-            row.cells[0].text = "District"
-            row.cells[1].text = case_info.get('district', 'N/A')
-            
-            row = case_table.add_row()
-            row.cells[0].text = "C.R./A.D.R. No."
-            row.cells[1].text = case_info.get('cr_adr_number', 'N/A')
-            
-            row = case_table.add_row()
-            row.cells[0].text = "Speaker Name"
-            row.cells[1].text = case_info.get('speaker_name', 'N/A')
-            
-            # Make labels bold
-            for row in case_table.rows:
-                for i, cell in enumerate(row.cells):
-                    if i == 0:  # First column (labels)
-                        for paragraph in cell.paragraphs:
-                            for run in paragraph.runs:
-                                run.font.bold = True
-            
-            doc.add_paragraph()
-        
-        # Simple separator
-        doc.add_paragraph(f"Total Matching Cluewords Found: {matches_count}")
-        doc.add_paragraph()
-        
-        # Add detailed table with new format
-        table = doc.add_table(rows=1, cols=7, style='Table Grid')
-        table.autofit = False
-        
-        # Table headers - new format
-        hdr_cells = table.rows[0].cells
-        headers = [
-            f'Question File: {q_filename}', 
-            '', 
-            '', 
-            '', 
-            f'Control File: {c_filename}', 
-            '', 
-            ''
-        ]
+            for key in ('case_number', 'police_station', 'district', 'cr_adr_number', 'speaker_name'):
+                values[f'{{{key}}}'] = case_info.get(key, 'N/A')
         
-        # Merge cells for file headers
-        hdr_cells[0].merge(hdr_cells[3])
-        hdr_cells[4].merge(hdr_cells[6])
-        
-        for i, header in enumerate([f'Question File: {q_filename}', f'Control File: {c_filename}']):
-            cell_idx = 0 if i == 0 else 4
-            hdr_cells[cell_idx].text = header
-            for paragraph in hdr_cells[cell_idx].paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
-        
-        # Add subheaders row
-        subhdr_row = table.add_row()
-        subhdr_cells = subhdr_row.cells
-        subheaders = [
-            'Clueword', 
-            'Start (HH:MM:SS:MS)', 
-            'End (HH:MM:SS:MS)', 
-            'Duration (ms)',
-            'Start (HH:MM:SS:MS)', 
-            'End (HH:MM:SS:MS)', 
-            'Duration (ms)'
-        ]
+        for text in doc.element.body.iter(qn('w:t')):
+            if text.text in values:
+                text.text = values[text.text]
         
-        for i, header in enumerate(subheaders):
-            subhdr_cells[i].text = header
-            for paragraph in subhdr_cells[i].paragraphs:
-                for run in paragraph.runs:
-                    run.font.bold = True
+        matches = report_matches(data)
+        filled_tables = [(doc.tables[1 if case_info else 0], report_table_rows(matches))]
+        if features:
+            filled_tables.append((doc.tables[-1], feature_table_rows(matches, features)))
+        for table, rows in filled_tables:
+            tbl = table._tbl
+            prototype = tbl.findall(qn('w:tr'))[-1]
+            tbl.remove(prototype)
+            for row in rows:
+                tr = deepcopy(prototype)
+                for text, value in zip(tr.iter(qn('w:t')), row):
+                    text.text = value
+                tbl.append(tr)
         
-        # Group data by matching cluewords
-        clueword_matches = {}
-        for item in data:
-            source, label, start_ms, end_ms, duration_ms = item
-            if label not in clueword_matches:
-                clueword_matches[label] = {'question': None, 'control': None}
-            
-            clueword_matches[label][source.lower()] = {
-                'start_ms': start_ms,
-                'end_ms': end_ms,
-                'duration_ms': duration_ms
-            }
-        
-        # Add data rows - one row per matching clueword pair
-        for label, match_data in clueword_matches.items():
-            if match_data['question'] and match_data['control']:
-                row_cells = table.add_row().cells
-                
-                # Question data
-                q_data = match_data['question']
-                row_cells[0].text = label
-                row_cells[1].text = format_time_hhmmssms(q_data['start_ms'])
-                row_cells[2].text = format_time_hhmmssms(q_data['end_ms'])
-                row_cells[3].text = f"{q_data['duration_ms']:.0f}"
-                
-                # Control data (no clueword column - it's already shown in the first column)
-                c_data = match_data['control']
-                row_cells[4].text = format_time_hhmmssms(c_data['start_ms'])
-                row_cells[5].text = format_time_hhmmssms(c_data['end_ms'])
-                row_cells[6].text = f"{c_data['duration_ms']:.0f}"
-        
-        doc.save(os.path.join(output_dir, "analysis_report.docx"))
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return "analysis_report.docx", buffer.getvalue()
         
     except Exception as e:
         app.logger.error(f"Error creating report: {str(e)}")
         # Create a simple fallback report
-        with open(os.path.join(output_dir, "analysis_report.txt"), 'w') as f:
-            f.write(f"Forensic Clueword Analysis Report\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Question File: {q_filename}\n")
-            f.write(f"Control File: {c_filename}\n")
-            f.write(f"Matches Found: {matches_count}\n\n")
-            f.write("Detailed Analysis:\n")
-            for item in data:
-                f.write(f"{item}\n")
+        f = io.StringIO()
+        f.write(f"Forensic Clueword Analysis Report\n")
+        f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write(f"Question File: {q_filename}\n")
+        f.write(f"Control File: {c_filename}\n")
+        f.write(f"Matches Found: {matches_count}\n\n")
+        f.write("Detailed Analysis:\n")
+        for item in data:
+            f.write(f"{item}\n")
+        return "analysis_report.txt", f.getvalue().encode('utf-8')
 
-# Session Management Routes
-@app.route('/api/sessions', methods=['GET'])
-def get_sessions():
-    """Get all saved forensic sessions"""
-    try:
-        sessions = ForensicSession.query.order_by(ForensicSession.updated_at.desc()).all()
-        return jsonify([session.to_dict() for session in sessions])
-    except Exception as e:
-        app.logger.error(f"Error fetching sessions: {str(e)}")
-        return jsonify({'error': 'Failed to fetch sessions'}), 500
+def build_report_sidecars(data, q_filename, c_filename, matches_count, enable_bandpass=True, case_info=None, features=None):
+    """
+    The report's clueword table as CSV (same columns and text as the DOCX)
+    and as JSON with raw millisecond values and, with features, each
+    pair's similarity scores. Returns [(filename, bytes)].
+    """
+    matches = report_matches(data)
+    
+    csv_buffer = io.StringIO()
+    writer = csv.writer(csv_buffer)
+    writer.writerow(['Clueword'] + [f"Question {h}" for h in REPORT_SUBHEADERS[1:4]] + [f"Control {h}" for h in REPORT_SUBHEADERS[4:]])
+    writer.writerows(report_table_rows(matches))
+    
+    report = {
+        'question_file': q_filename,
+        'control_file': c_filename,
+        'matches_count': matches_count,
+        'bandpass_enabled': enable_bandpass,
+        'case_info': case_info or {},
+        'cluewords': [{'label': label, 'question': q, 'control': c} for label, q, c in matches]
+    }
+    if features:
+        for clueword in report['cluewords']:
+            if clueword['label'] in features:
+                clueword['similarity'] = features[clueword['label']]['similarity']
+    return [
+        ("analysis_report.csv", csv_buffer.getvalue().encode('utf-8')),
+        ("analysis_report.json", json.dumps(report, indent=2).encode('utf-8'))
+    ]
 
-@app.route('/api/sessions', methods=['POST'])
-def save_session():
-    """Save a forensic session"""
+def build_features_sidecar(q_filename, c_filename, features):
+    """acoustic_features.json: per-segment features and similarity scores of every compared pair."""
+    report = {
+        'question_file': q_filename,
+        'control_file': c_filename,
+        'settings': {
+            'frame_ms': FEATURE_FRAME_MS,
+            'hop_ms': FEATURE_HOP_MS,
+            'mel_bands': FEATURE_MEL_BANDS,
+            'mfcc_count': FEATURE_MFCC_COUNT,
+            'f0_range_hz': [FEATURE_F0_MIN_HZ, FEATURE_F0_MAX_HZ],
+            'lpc_rate': FEATURE_LPC_RATE,
+            'lpc_order': FEATURE_LPC_ORDER
+        },
+        'cluewords': [dict(label=label, **entry) for label, entry in features.items()]
+    }
+    return json.dumps(report, indent=2).encode('utf-8')
+
+def collect_extraction_results(jobs, errors):
+    """
+    Turn per-job extraction errors into report rows (in annotation order,
+    so the report stays stable) and a list of failure messages.
+    """
+    report_data = []
+    failures = []
+    for job, error in zip(jobs, errors):
+        if error:
+            failures.append(f"{job['label']}: {error}")
+            continue
+        q_start_ms, q_end_ms = job['question']
+        c_start_ms, c_end_ms = job['control']
+        report_data.append(["Question", job['label'], q_start_ms, q_end_ms, q_end_ms - q_start_ms])
+        report_data.append(["Control", job['label'], c_start_ms, c_end_ms, c_end_ms - c_start_ms])
+    return report_data, failures
+
+def format_extraction_errors(failures):
+    return "The following cluewords could not be extracted:\n" + "\n".join(failures) + "\n"
+
+def index_labels(annotations):
+    """
+    Group annotations by normalized label: {key: [annotation, ...]} with
+    each key's occurrences in time order and keys in order of first
+    appearance.
+    """
+    index = {}
+    for ann in annotations:
+        index.setdefault(normalize_label(ann['label']), []).append(ann)
+    for occurrences in index.values():
+        occurrences.sort(key=lambda ann: float(ann['start']))
+    return index
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance of a and b, or limit + 1 once it is known to exceed limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+def deletion_variants(key, depth):
+    """key and every string obtained from it by deleting up to depth characters."""
+    variants = {key}
+    frontier = {key}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))} - variants
+        variants |= frontier
+    return variants
+
+def fuzzy_label_distance(key):
+    """Edits a label of this normalized form may differ by and still fuzzy-match."""
+    return min(LABEL_FUZZY_MAX_DISTANCE, len(key) // LABEL_FUZZY_CHARS_PER_EDIT)
+
+def fuzzy_label_pairs(q_keys, c_keys):
+    """
+    Pair question and control label keys that differ by a few edits.
+
+    Candidates come from a symmetric-deletion index (two labels within
+    distance d share a string reachable by at most d deletions from each),
+    so only near neighbours are compared instead of every question label
+    against every control label. Pairs are assigned closest first, each key
+    at most once. Returns [(q_key, c_key, distance)] in question order.
+    """
+    deletion_index = {}
+    for c_key in c_keys:
+        for variant in deletion_variants(c_key, fuzzy_label_distance(c_key)):
+            deletion_index.setdefault(variant, set()).add(c_key)
+
+    c_order = {c_key: position for position, c_key in enumerate(c_keys)}
+    candidates = []
+    for q_position, q_key in enumerate(q_keys):
+        seen = set()
+        for variant in deletion_variants(q_key, fuzzy_label_distance(q_key)):
+            for c_key in deletion_index.get(variant, ()):
+                if c_key in seen:
+                    continue
+                seen.add(c_key)
+                limit = min(fuzzy_label_distance(q_key), fuzzy_label_distance(c_key))
+                distance = edit_distance(q_key, c_key, limit)
+                if distance <= limit:
+                    candidates.append((distance, q_position, c_order[c_key], q_key, c_key))
+
+    pairs = []
+    used_q, used_c = set(), set()
+    for distance, q_position, _, q_key, c_key in sorted(candidates):
+        if q_key not in used_q and c_key not in used_c:
+            used_q.add(q_key)
+            used_c.add(c_key)
+            pairs.append((q_position, q_key, c_key, distance))
+    return [(q_key, c_key, distance) for _, q_key, c_key, distance in sorted(pairs)]
+
+def match_labels(q_annotations, c_annotations, label_match=LABEL_MATCH):
+    """
+    Match question and control labels through a label index over both
+    panels. Returns [(q_occurrences, c_occurrences, match, distance)] in
+    question order, where match is 'exact' or 'fuzzy'.
+    """
+    q_index = index_labels(q_annotations)
+    c_index = index_labels(c_annotations)
+    groups = {key: (q_index[key], c_index[key], 'exact', 0) for key in q_index if key in c_index}
+    if label_match == 'fuzzy':
+        q_left = [key for key in q_index if key not in c_index]
+        c_left = [key for key in c_index if key not in q_index]
+        for q_key, c_key, distance in fuzzy_label_pairs(q_left, c_left):
+            groups[q_key] = (q_index[q_key], c_index[c_key], 'fuzzy', distance)
+    return [groups[key] for key in q_index if key in groups]
+
+def clueword_dir_name(name, used):
+    """A directory name for a clueword that is unique (case-insensitively) within used."""
+    safe = " ".join("".join(c if c.isalnum() or c in (' ', '_') or unicodedata.category(c).startswith('M') else ' '
+                            for c in name).split())
+    base = safe or f"clueword_{len(used) + 1}"
+    safe = base
+    suffix = 2
+    while safe.casefold() in used:
+        safe = f"{base}_{suffix}"
+        suffix += 1
+    used.add(safe.casefold())
+    return safe
+
+def numbered_label(name, used, number=1):
+    """The first "name (n)" from number on that is unique (case-insensitively) within used."""
+    label = f"{name} ({number})"
+    while label.casefold() in used:
+        number += 1
+        label = f"{name} ({number})"
+    used.add(label.casefold())
+    return label
+
+def build_clueword_jobs(q_annotations, c_annotations, output_folder=OUTPUT_FOLDER, label_match=LABEL_MATCH):
+    """
+    Pair question annotations with control annotations by label. Each match
+    becomes an independent extraction job.
+
+    Labels are compared after normalize_label (or, with label_match='fuzzy',
+    within a small edit distance). A label spoken several times pairs its
+    occurrences in time order, reusing the other side's occurrences in turn
+    when one side has more, so every utterance is extracted; such pairs are
+    numbered "label (1)", "label (2)", ..., skipping numbers that would
+    repeat another pair's label. Each job's label is unique
+    (case-insensitively) and names the pair in the report.
+    """
+    groups = []
+    for q_occurrences, c_occurrences, match, distance in match_labels(q_annotations, c_annotations, label_match):
+        name = q_occurrences[0]['label'].strip()
+        if match == 'fuzzy':
+            name = f"{name} ~ {c_occurrences[0]['label'].strip()}"
+        groups.append((name, q_occurrences, c_occurrences, match, distance))
+    
+    # Pairs of labels spoken once keep their name; numbered pairs are named after them
+    used_labels = set()
+    labels = {}
+    for index, (name, q_occurrences, c_occurrences, _, _) in enumerate(groups):
+        if max(len(q_occurrences), len(c_occurrences)) == 1:
+            labels[index] = [name if name.casefold() not in used_labels else numbered_label(name, used_labels, 2)]
+            used_labels.add(name.casefold())
+    for index, (name, q_occurrences, c_occurrences, _, _) in enumerate(groups):
+        if index not in labels:
+            labels[index] = [numbered_label(name, used_labels, i + 1)
+                             for i in range(max(len(q_occurrences), len(c_occurrences)))]
+    
+    jobs = []
+    used_dirs = set()
+    for index, (name, q_occurrences, c_occurrences, match, distance) in enumerate(groups):
+        for i, label in enumerate(labels[index]):
+            q_ann = q_occurrences[i % len(q_occurrences)]
+            c_ann = c_occurrences[i % len(c_occurrences)]
+            jobs.append({
+                'label': label,
+                'question_label': q_ann['label'],
+                'control_label': c_ann['label'],
+                'occurrence': i + 1,
+                'match': match,
+                'distance': distance,
+                'dir': os.path.join(output_folder, clueword_dir_name(label, used_dirs)),
+                'question': (float(q_ann['start']) * 1000, float(q_ann['end']) * 1000),
+                'control': (float(c_ann['start']) * 1000, float(c_ann['end']) * 1000)
+            })
+    return jobs
+
+def make_bandpass_settings(enable_bandpass, low_freq=BANDPASS_LOW_FREQ, high_freq=BANDPASS_HIGH_FREQ, order=BANDPASS_ORDER, engine=None):
+    """Keyword arguments for apply_bandpass_filter, or None when disabled."""
+    if not enable_bandpass:
+        return None
+    return {
+        'low_freq': low_freq,
+        'high_freq': high_freq,
+        'order': order,
+        'engine': engine or BANDPASS_ENGINE
+    }
+
+def write_package(path, jobs, sources, bandpass, q_filename, c_filename, enable_bandpass, case_info, progress=None, max_workers=None, fingerprints=None):
+    """Write a clueword package ZIP to path atomically. Returns the extraction failures."""
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
     try:
-        data = request.get_json()
-        
-        session_id = data.get('session_id')
-        if session_id:
-            # Update existing session
-            session = ForensicSession.query.get(session_id)
-            if not session:
-                return jsonify({'error': 'Session not found'}), 404
-        else:
-            # Create new session
-            session = ForensicSession()
-        
-        # Update session data
-        session.session_name = data.get('session_name', '')
-        session.case_number = data.get('case_number', '')
-        session.police_station = data.get('police_station', '')
-        session.district = data.get('district', '')
-        session.cr_number = data.get('cr_number', '')
-        session.speaker_name = data.get('speaker_name', '')
-        session.question_filename = data.get('question_filename', '')
-        session.control_filename = data.get('control_filename', '')
-        session.question_file_path = data.get('question_file_path', '')
-        session.control_file_path = data.get('control_file_path', '')
-        session.bandpass_enabled = data.get('bandpass_enabled', False)
+        with open(temp_path, 'wb') as f:
+            package = generate_package_stream(jobs, sources, bandpass, q_filename, c_filename, enable_bandpass, case_info, progress, max_workers, fingerprints)
+            while True:
+                try:
+                    f.write(next(package))
+                except StopIteration as finished:
+                    failures = finished.value
+                    break
+        os.replace(temp_path, path)
+        return failures
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def generate_package_stream(jobs, sources, bandpass, q_filename, c_filename, enable_bandpass, case_info, progress=None, max_workers=None, fingerprints=None):
+    """
+    Builds the clueword package as a ZIP stream. Segment WAVs are encoded
+    straight into the archive and yielded as each clueword finishes; the
+    report follows once every job is done. ``progress(phase, done)`` is
+    called as cluewords complete. Entries carry PACKAGE_ZIP_DATE_TIME, so
+    the same case always gives the same bytes; the generator returns the
+    extraction failures.
+    """
+    with job_trace('package'):
+        buffer = ZipStreamBuffer()
+        errors = [None] * len(jobs)
+        done = 0
+        with zipfile.ZipFile(buffer, 'w') as zipf:
+            for indices, group_errors, files in iter_extraction_groups(jobs, sources, bandpass, max_workers=max_workers, fingerprints=fingerprints):
+                for i, error in zip(indices, group_errors):
+                    errors[i] = error
+                arc_dir = os.path.basename(jobs[indices[0]]['dir'])
+                with timed_span('zip') as span:
+                    for filename, data in files:
+                        write_package_entry(zipf, f"{arc_dir}/{filename}", data)
+                        span['bytes'] += len(data)
+                done += len(indices)
+                if progress:
+                    progress('extracting', done)
+                yield buffer.drain()
         
-        # Save annotations
-        annotations = data.get('annotations', {"question": [], "control": []})
-        session.set_annotations(annotations)
+            if progress:
+                progress('features', done)
+            features = analyse_cluewords(jobs, sources, errors)
+            if progress:
+                progress('report', done)
+            report_data, failures = collect_extraction_results(jobs, errors)
+            if failures:
+                write_package_entry(zipf, "extraction_errors.txt", format_extraction_errors(failures))
         
-        db.session.add(session)
-        db.session.commit()
+            report_files = build_report_files(report_data, q_filename, c_filename, len(jobs) - len(failures), enable_bandpass, case_info, features)
+            with timed_span('zip') as span:
+                for report_name, report_bytes in report_files:
+                    write_package_entry(zipf, report_name, report_bytes)
+                    span['bytes'] += len(report_bytes)
+        yield buffer.drain()
+        return failures
+
+@lru_cache(maxsize=32)
+def _file_sha256(path, mtime_ns, size):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_sha256(path):
+    """SHA-256 of a file, memoized until the file changes."""
+    st = os.stat(path)
+    return _file_sha256(path, st.st_mtime_ns, st.st_size)
+
+def package_cache_key(jobs, fingerprints, bandpass, q_filename, c_filename, enable_bandpass, case_info):
+    """Hash everything that determines the contents of a clueword package."""
+    h = hashlib.sha256()
+    for panel in ('question', 'control'):
+        h.update(fingerprints[panel].encode())
+    h.update(json.dumps({
+        # Only the folder name of a job's output reaches the archive
+        'jobs': [dict(job, dir=os.path.basename(job['dir'])) for job in jobs],
+        'bandpass': dict(bandpass, q=BANDPASS_Q) if bandpass else bandpass,
+        'filenames': [q_filename, c_filename],
+        'enable_bandpass': enable_bandpass,
+        'case_info': case_info,
+        'acoustic_features': ACOUSTIC_FEATURES,
+        'report_sidecars': REPORT_SIDECARS
+    }, sort_keys=True).encode())
+    return h.hexdigest()
+
+def source_fingerprint(samples, frame_rate, audio_hash=None):
+    """
+    Identify a PCM source by content: the audio cache key of the upload it
+    was standardized from when known, so the samples are not read again,
+    else the hash of the samples.
+    """
+    digest = audio_hash or hashlib.sha256(np.ascontiguousarray(samples)).hexdigest()
+    return f"{digest}:{frame_rate}"
+
+def cached_package_path(cache_key):
+    return os.path.abspath(os.path.join(PACKAGE_CACHE_FOLDER, f"{cache_key}.zip"))
+
+# Background package jobs by id, oldest first
+_package_jobs = OrderedDict()
+_package_jobs_lock = threading.Lock()
+_package_job_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='package-job')
+
+def package_job_state_path(job_id):
+    return os.path.join(PACKAGE_CACHE_FOLDER, 'jobs', f"{job_id}.json")
+
+def update_package_job(job, **changes):
+    """Apply changes to a job and persist its state, so any worker process can report on it."""
+    with _package_jobs_lock:
+        job.update(changes)
+        state = dict(job)
+    path = package_job_state_path(job['id'])
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        app.logger.warning(f"Could not record state of package job {job['id']}: {str(e)}")
+
+def find_package_job(job_id):
+    """A job started by this process, or the recorded state of one started by another worker."""
+    job = _package_jobs.get(job_id)
+    if job is not None or len(job_id) != 32 or not all(c in '0123456789abcdef' for c in job_id):
+        return job
+    try:
+        with open(package_job_state_path(job_id)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def prune_package_job_states():
+    """Keep the state files of the most recent JOB_HISTORY_LIMIT jobs."""
+    try:
+        jobs_dir = os.path.dirname(package_job_state_path('x'))
+        states = [os.path.join(jobs_dir, name) for name in os.listdir(jobs_dir) if name.endswith('.json')]
+        states.sort(key=os.path.getmtime, reverse=True)
+        for path in states[JOB_HISTORY_LIMIT:]:
+            os.remove(path)
+    except OSError as e:
+        app.logger.warning(f"Error pruning package job states: {str(e)}")
+
+def job_status(job):
+    """Public view of a package job for the progress endpoint."""
+    with _package_jobs_lock:
+        status = {k: job[k] for k in ('id', 'status', 'phase', 'done', 'total', 'cached', 'error', 'created_at')}
+    status['progress_url'] = f"/jobs/{job['id']}"
+    if status['status'] == 'done':
+        status['download_url'] = f"/jobs/{job['id']}/download"
+    return status
+
+def submit_package_job(jobs, sources, fingerprints, bandpass, q_filename, c_filename, enable_bandpass, case_info):
+    """
+    Queue a clueword package build on the background workers. A package
+    already built for identical inputs is reused without any work.
+    """
+    cache_key = package_cache_key(jobs, fingerprints, bandpass, q_filename, c_filename, enable_bandpass, case_info)
+    job = {
+        'id': uuid.uuid4().hex,
+        'status': 'queued',
+        'phase': 'queued',
+        'done': 0,
+        'total': len(jobs),
+        'cached': False,
+        'error': None,
+        'created_at': datetime.utcnow().isoformat(),
+        'package_path': cached_package_path(cache_key)
+    }
+    
+    with _package_jobs_lock:
+        _package_jobs[job['id']] = job
+        while len(_package_jobs) > JOB_HISTORY_LIMIT:
+            _package_jobs.popitem(last=False)
+    os.makedirs(os.path.dirname(package_job_state_path(job['id'])), exist_ok=True)
+    
+    if os.path.exists(job['package_path']):
+        # Mark as recently used for cache pruning
+        os.utime(job['package_path'])
+        update_package_job(job, status='done', phase='done', done=len(jobs), cached=True)
+    else:
+        update_package_job(job)
+        _package_job_executor.submit(run_package_job, job, jobs, sources, fingerprints, bandpass, q_filename, c_filename, enable_bandpass, case_info)
+    return job
+
+def run_package_job(job, jobs, sources, fingerprints, bandpass, q_filename, c_filename, enable_bandpass, case_info):
+    """Build a clueword package into the package cache, recording progress."""
+    def progress(phase, done):
+        update_package_job(job, phase=phase, done=done)
+    
+    update_package_job(job, status='running', phase='extracting')
+    
+    try:
+        os.makedirs(PACKAGE_CACHE_FOLDER, exist_ok=True)
+        write_package(job['package_path'], jobs, sources, bandpass, q_filename, c_filename, enable_bandpass, case_info, progress, fingerprints=fingerprints)
+        request_artifact_collection()
+        update_package_job(job, status='done', phase='done', done=len(jobs))
+    
+    except Exception as e:
+        app.logger.error(f"Error in package job {job['id']}: {str(e)}")
+        update_package_job(job, status='failed', error=str(e))
+    prune_package_job_states()
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_progress(job_id):
+    """Report progress of a background package job"""
+    job = find_package_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_status(job))
+
+@app.route('/jobs/<job_id>/download', methods=['GET'])
+def download_job_package(job_id):
+    """Download the package built by a finished job"""
+    job = find_package_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'done':
+        return jsonify({'error': f"Job is {job['status']}"}), 409
+    if not os.path.exists(job['package_path']):
+        return jsonify({'error': 'Package is no longer available'}), 410
+    
+    return send_file(job['package_path'], as_attachment=True, download_name='clueword_analysis.zip')
+
+@app.route('/audio/<panel_type>', methods=['GET'])
+def serve_audio(panel_type):
+    """
+    Serve standardized audio for playback with HTTP Range and conditional
+    GET (ETag/Last-Modified) support, so the player fetches only the bytes
+    it needs and revalidates instead of re-downloading.
+
+    With ``start``/``end`` (seconds) only that window is returned, as a
+    self-contained WAV with its own header.
+    """
+    try:
+        if panel_type not in ['question', 'control']:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        path = standardized_path_for(current_workspace(), panel_type)
+        if not os.path.exists(path):
+            return jsonify({"error": "Audio not found."}), 404
+        
+        if 'start' not in request.args and 'end' not in request.args:
+            response = send_file(path, mimetype='audio/wav', conditional=True, etag=True)
+            response.cache_control.no_cache = True
+            return response
+        
+        samples, frame_rate = map_standardized_wav(path)
+        start_ms = float(request.args.get('start', 0)) * 1000
+        end_ms = float(request.args.get('end', len(samples) / frame_rate)) * 1000
+        start_frame = min(int(start_ms * frame_rate / 1000.0), len(samples))
+        end_frame = start_frame + len(slice_pcm(samples, frame_rate, start_ms, end_ms))
+        
+        stat = os.stat(path)
+        etag = f"{stat.st_mtime_ns:x}-{stat.st_size:x}-{start_frame}-{end_frame}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        buffer = io.BytesIO()
+        export_pcm_wav(buffer, samples[start_frame:end_frame], frame_rate)
+        data = buffer.getvalue()
+        
+        response = Response(data, mimetype='audio/wav')
+        response.set_etag(etag)
+        response.last_modified = datetime.utcfromtimestamp(stat.st_mtime)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+    
+    except ValueError:
+        return jsonify({"error": "Invalid audio window."}), 400
+    except Exception as e:
+        app.logger.error(f"Error in serve_audio: {str(e)}")
+        return jsonify({"error": "Failed to serve audio."}), 500
+
+@app.route('/peaks/<panel_type>', methods=['GET'])
+def get_peaks(panel_type):
+    """
+    Serve waveform peaks for a time window at a given resolution.
+
+    Query parameters: ``start``/``end`` in seconds (default: whole file) and
+    one of ``samples_per_bin``, ``px_per_sec`` or ``pixels``. The finest
+    pyramid level not exceeding the requested resolution is used; windows
+    finer than the pyramid are computed from the standardized audio.
+    ``format=int16`` returns raw little-endian (max, min) pairs with the
+    metadata in X-Peaks-* headers instead of JSON.
+    """
+    try:
+        if panel_type not in ['question', 'control']:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        workspace = current_workspace()
+        path = peaks_path_for(workspace, panel_type)
+        if not os.path.exists(path):
+            return jsonify({"error": "Peaks not found."}), 404
+        
+        info, levels = read_peak_pyramid(path)
+        frame_rate = info['frame_rate']
+        duration = info['frame_count'] / frame_rate
+        
+        start = max(0.0, float(request.args.get('start', 0)))
+        end = min(duration, float(request.args.get('end', duration)))
+        if end < start:
+            return jsonify({"error": "Invalid time window."}), 400
+        window = (end - start) * frame_rate
+        
+        if 'samples_per_bin' in request.args:
+            samples_per_bin = float(request.args['samples_per_bin'])
+        elif 'px_per_sec' in request.args:
+            samples_per_bin = frame_rate / float(request.args['px_per_sec'])
+        elif 'pixels' in request.args:
+            samples_per_bin = window / max(1, int(request.args['pixels']))
+        else:
+            samples_per_bin = window / 2000
+        samples_per_bin = max(1, int(samples_per_bin), int(np.ceil(window / PEAKS_MAX_BINS)))
+        
+        start_frame = int(start * frame_rate)
+        end_frame = int(np.ceil(end * frame_rate))
+        if samples_per_bin < info['base']:
+            # Finer than the pyramid: compute straight from the PCM window
+            samples, _ = map_standardized_wav(standardized_path_for(workspace, panel_type))
+            peaks = compute_peaks(samples[start_frame:end_frame], samples_per_bin)
+        else:
+            level_index = min(len(levels) - 1, int(np.log(samples_per_bin / info['base']) / np.log(info['factor'])))
+            samples_per_bin = info['base'] * info['factor'] ** level_index
+            # Widen the window to whole bins of the chosen level
+            first_bin = start_frame // samples_per_bin
+            last_bin = -(-end_frame // samples_per_bin)
+            peaks = levels[level_index][first_bin:last_bin]
+            start_frame = first_bin * samples_per_bin
+            end_frame = min(info['frame_count'], last_bin * samples_per_bin)
+        
+        meta = {
+            'frame_rate': frame_rate,
+            'duration': duration,
+            'samples_per_bin': samples_per_bin,
+            'start': start_frame / frame_rate,
+            'end': end_frame / frame_rate,
+            'bins': len(peaks)
+        }
+        
+        if request.args.get('format') == 'int16':
+            headers = {f"X-Peaks-{key.replace('_', '-').title()}": str(value) for key, value in meta.items()}
+            return Response(np.ascontiguousarray(peaks).tobytes(), mimetype='application/octet-stream', headers=headers)
+        
+        meta['peaks'] = (np.asarray(peaks, dtype=np.float32).ravel() / 32768.0).round(5).tolist()
+        return jsonify(meta)
+    
+    except ValueError:
+        return jsonify({"error": "Invalid peaks request."}), 400
+    except Exception as e:
+        app.logger.error(f"Error in get_peaks: {str(e)}")
+        return jsonify({"error": "Failed to load peaks."}), 500
+
+@app.route('/spectrogram/<panel_type>', methods=['GET'])
+def get_spectrogram_info(panel_type):
+    """
+    Describe a panel's spectrogram pyramid: its levels (seconds per column,
+    columns, tiles) and the quantization, with a ``tile_url`` template.
+    Returns 202 with ``status: pending`` while the background worker is
+    still building it.
+    """
+    try:
+        if panel_type not in ['question', 'control']:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        audio_hash = audio_hash_for(current_workspace(), panel_type)
+        if audio_hash is None or lookup_audio_cache(audio_hash) is None:
+            return jsonify({"error": "Audio not found."}), 404
+        
+        future = schedule_spectrogram(audio_hash)
+        if future is not None:
+            if future.done() and future.exception() is not None:
+                # Reported once; the next request schedules a new build
+                with _spectrogram_jobs_lock:
+                    if _spectrogram_jobs.get(audio_hash) is future:
+                        del _spectrogram_jobs[audio_hash]
+                return jsonify({"status": "failed", "error": "Spectrogram generation failed."}), 500
+            return jsonify({"status": "pending"}), 202
+        
+        info, levels = read_spectrogram_pyramid(spectrogram_path(audio_hash))
+        seconds_per_column = info['hop'] / info['frame_rate']
+        return jsonify({
+            'status': 'ready',
+            'audio_hash': audio_hash,
+            'duration': info['frame_count'] / info['frame_rate'],
+            'rows': info['rows'],
+            'max_freq': info['max_freq'],
+            'db_floor': info['db_floor'],
+            'db_ceiling': info['db_ceiling'],
+            'tile_columns': SPECTROGRAM_TILE_COLUMNS,
+            'tile_url': f"/spectrogram/{panel_type}/tiles/{{level}}/{{tile}}",
+            'levels': [
+                {
+                    'seconds_per_column': seconds_per_column * info['factor'] ** i,
+                    'columns': len(level),
+                    'tiles': -(-len(level) // SPECTROGRAM_TILE_COLUMNS)
+                }
+                for i, level in enumerate(levels)
+            ]
+        })
+    
+    except Exception as e:
+        app.logger.error(f"Error in get_spectrogram_info: {str(e)}")
+        return jsonify({"error": "Failed to load spectrogram."}), 500
+
+@app.route('/spectrogram/<panel_type>/tiles/<int:level>/<int:tile>', methods=['GET'])
+def get_spectrogram_tile(panel_type, level, tile):
+    """
+    One spectrogram tile: SPECTROGRAM_TILE_COLUMNS columns (fewer at the
+    end) of ``rows`` uint8 values each, lowest band first, as raw bytes.
+    The time span is in the X-Spectrogram-* headers.
+    """
+    try:
+        if panel_type not in ['question', 'control']:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        audio_hash = audio_hash_for(current_workspace(), panel_type)
+        path = spectrogram_path(audio_hash) if audio_hash else None
+        if path is None or not os.path.exists(path):
+            return jsonify({"error": "Spectrogram not found."}), 404
+        
+        info, levels = read_spectrogram_pyramid(path)
+        if level >= len(levels) or tile * SPECTROGRAM_TILE_COLUMNS >= len(levels[level]):
+            return jsonify({"error": "Tile out of range."}), 404
+        
+        # Tiles never change for a given audio hash
+        etag = f"{audio_hash}-{level}-{tile}"
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+        
+        first = tile * SPECTROGRAM_TILE_COLUMNS
+        columns = levels[level][first:first + SPECTROGRAM_TILE_COLUMNS]
+        seconds_per_column = info['hop'] * info['factor'] ** level / info['frame_rate']
+        response = Response(np.ascontiguousarray(columns).tobytes(), mimetype='application/octet-stream', headers={
+            'X-Spectrogram-Start': str(first * seconds_per_column),
+            'X-Spectrogram-Seconds-Per-Column': str(seconds_per_column),
+            'X-Spectrogram-Columns': str(len(columns)),
+            'X-Spectrogram-Rows': str(info['rows'])
+        })
+        response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+    
+    except Exception as e:
+        app.logger.error(f"Error in get_spectrogram_tile: {str(e)}")
+        return jsonify({"error": "Failed to load spectrogram tile."}), 500
+
+@app.route('/candidates/<panel_type>', methods=['POST'])
+def find_candidates(panel_type):
+    """
+    Search a panel's recording for regions that sound like annotated
+    segments of the other panel (or of ``source``). JSON body:
+    ``{"annotations": [{"label", "start", "end"}], "limit", "min_score"}``.
+    Returns ranked ``{"start", "end", "score"}`` candidates per annotation.
+    """
+    try:
+        if panel_type not in ANNOTATION_PANELS:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        body = request.get_json(silent=True) or {}
+        source = body.get('source') or ('control' if panel_type == 'question' else 'question')
+        annotations = body.get('annotations')
+        if source not in ANNOTATION_PANELS:
+            return jsonify({"error": "Invalid source panel."}), 400
+        if not annotations or not isinstance(annotations, list):
+            return jsonify({"error": "No annotations provided."}), 400
+        if len(annotations) > SEARCH_MAX_QUERIES:
+            return jsonify({"error": f"At most {SEARCH_MAX_QUERIES} annotations can be searched at once."}), 400
+        try:
+            limit = int(body.get('limit', SEARCH_MAX_RESULTS))
+            min_score = float(body.get('min_score', SEARCH_MIN_SCORE))
+            segments = [(str(ann.get('label', '')), float(ann['start']), float(ann['end'])) for ann in annotations]
+        except (KeyError, TypeError, ValueError, AttributeError):
+            return jsonify({"error": "Invalid search request."}), 400
+        if limit < 1 or any(not 0 <= start < end or end - start > SEARCH_MAX_QUERY_MS / 1000 for _, start, end in segments):
+            return jsonify({"error": f"Segments must be non-empty and at most {SEARCH_MAX_QUERY_MS / 1000:g}s long."}), 400
+        
+        workspace = current_workspace()
+        audio_hashes = {panel: audio_hash_for(workspace, panel) for panel in (source, panel_type)}
+        if any(audio_hash is None or lookup_audio_cache(audio_hash) is None for audio_hash in audio_hashes.values()):
+            return jsonify({"error": "Audio not found."}), 404
+        
+        started = time.perf_counter()
+        with job_trace('search'):
+            results = search_cluewords(audio_hashes[source], audio_hashes[panel_type], segments, limit, min_score)
+        return jsonify({
+            'panel': panel_type,
+            'source': source,
+            'results': results,
+            'seconds': round(time.perf_counter() - started, 3)
+        })
+    
+    except Exception as e:
+        app.logger.error(f"Error in find_candidates: {str(e)}")
+        return jsonify({"error": "Candidate search failed."}), 500
+
+@app.route('/speech/<panel_type>', methods=['GET'])
+def get_speech(panel_type):
+    """
+    Speech regions and word-like segments of a panel's recording that
+    overlap ``start``/``end`` (seconds, default: whole file), from the
+    voice activity index built at upload.
+    """
+    try:
+        if panel_type not in ['question', 'control']:
+            return jsonify({"error": "Invalid panel type."}), 400
+        
+        audio_hash = audio_hash_for(current_workspace(), panel_type)
+        if audio_hash is None or lookup_audio_cache(audio_hash) is None:
+            return jsonify({"error": "Audio not found."}), 404
+        
+        info, regions, words = load_speech_index(audio_hash)
+        try:
+            start = max(0.0, float(request.args.get('start', 0)))
+            end = float(request.args.get('end', info['duration_ms'] / 1000))
+        except ValueError:
+            return jsonify({"error": "Invalid time window."}), 400
+        if end < start:
+            return jsonify({"error": "Invalid time window."}), 400
+        
+        def as_seconds(segments):
+            return [{'start': s / 1000, 'end': e / 1000} for s, e in segments.tolist()]
+        
+        window_regions = segments_in_window(regions, start * 1000, end * 1000)
+        return jsonify({
+            'start': start,
+            'end': end,
+            'duration': info['duration_ms'] / 1000,
+            'speech_seconds': info['speech_ms'] / 1000,
+            'regions': as_seconds(window_regions),
+            'words': as_seconds(segments_in_window(words, start * 1000, end * 1000))
+        })
+    
+    except Exception as e:
+        app.logger.error(f"Error in get_speech: {str(e)}")
+        return jsonify({"error": "Failed to load speech index."}), 500
+
+# Session Management Routes
+@app.route('/api/sessions', methods=['GET'])
+def get_sessions():
+    """List saved forensic sessions, newest first, one page at a time.
+
+    Query parameters: ``limit`` (default 50), ``cursor`` (``next_cursor`` of
+    the previous page), exact-match filters on case_number, police_station,
+    district and speaker_name, and ``fields`` (comma-separated summary fields;
+    ``id`` is always included). Responses carry an ETag derived from the
+    (id, version, updated_at) keys of the page, read through the keyset index
+    without counting the matching sessions, and answer 304 when unchanged.
+    """
+    try:
+        limit = min(max(request.args.get('limit', SESSIONS_PAGE_SIZE, type=int), 1), SESSIONS_MAX_PAGE_SIZE)
+        fields = request.args.get('fields')
+        if fields:
+            fields = {field.strip() for field in fields.split(',') if field.strip()} | {'id'}
+            unknown = fields - set(SESSION_SUMMARY_FIELDS)
+            if unknown:
+                return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+        else:
+            fields = set(SESSION_SUMMARY_FIELDS)
+
+        filters = [getattr(ForensicSession, name) == request.args[name]
+                   for name in SESSION_FILTERS if request.args.get(name)]
+
+        query = db.session.query(*[ForensicSession.id, ForensicSession.updated_at, ForensicSession.version] + [
+            SESSION_SUMMARY_FIELDS[name] for name in sorted(fields)
+            if name not in ('id', 'updated_at', 'version', 'annotation_count')
+        ]).filter(*filters)
+        cursor = request.args.get('cursor')
+        if cursor:
+            cursor_updated_at, cursor_id = decode_session_cursor(cursor)
+            query = query.filter(db.or_(
+                ForensicSession.updated_at < cursor_updated_at,
+                db.and_(ForensicSession.updated_at == cursor_updated_at, ForensicSession.id < cursor_id)
+            ))
+        rows = (query.order_by(ForensicSession.updated_at.desc(), ForensicSession.id.desc())
+                .limit(limit + 1).all())
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Every write bumps version, and a new or deleted session shifts the page
+        page_keys = ','.join(f"{row.id}:{row.version}:{row.updated_at.isoformat() if row.updated_at else ''}" for row in rows)
+        etag = hashlib.sha1(f"{page_keys}|{has_more}|{request.query_string.decode()}".encode()).hexdigest()
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            return response
+
+        counts = {}
+        if 'annotation_count' in fields and rows:
+            counts = dict(db.session.query(SessionAnnotation.session_id, func.count(SessionAnnotation.id))
+                          .filter(SessionAnnotation.session_id.in_([row.id for row in rows]))
+                          .group_by(SessionAnnotation.session_id).all())
+
+        sessions = []
+        for row in rows:
+            summary = {name: value for name, value in row._asdict().items() if name in fields}
+            for key in ('created_at', 'updated_at'):
+                if key in summary:
+                    summary[key] = summary[key].isoformat() if summary[key] else None
+            if 'annotation_count' in fields:
+                summary['annotation_count'] = counts.get(row.id, 0)
+            sessions.append(summary)
+
+        response = jsonify({
+            'sessions': sessions,
+            'next_cursor': encode_session_cursor(rows[-1].updated_at, rows[-1].id) if has_more else None
+        })
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
+    except ValueError:
+        return jsonify({'error': 'Invalid sessions request'}), 400
+    except Exception as e:
+        app.logger.error(f"Error fetching sessions: {str(e)}")
+        return jsonify({'error': 'Failed to fetch sessions'}), 500
+
+SESSION_FILTERS = ('case_number', 'police_station', 'district', 'speaker_name')
+SESSION_SUMMARY_FIELDS = {
+    'id': ForensicSession.id,
+    'session_name': ForensicSession.session_name,
+    'case_number': ForensicSession.case_number,
+    'police_station': ForensicSession.police_station,
+    'district': ForensicSession.district,
+    'cr_number': ForensicSession.cr_number,
+    'speaker_name': ForensicSession.speaker_name,
+    'question_filename': ForensicSession.question_filename,
+    'control_filename': ForensicSession.control_filename,
+    'bandpass_enabled': ForensicSession.bandpass_enabled,
+    'created_at': ForensicSession.created_at,
+    'updated_at': ForensicSession.updated_at,
+    'version': ForensicSession.version,
+    'annotation_count': None,
+}
+
+def encode_session_cursor(updated_at, session_id):
+    """Opaque pagination cursor for the position after (updated_at, id)."""
+    return base64.urlsafe_b64encode(f"{updated_at.isoformat()}|{session_id}".encode()).decode()
+
+def decode_session_cursor(cursor):
+    """Inverse of encode_session_cursor; raises ValueError on a malformed cursor."""
+    try:
+        updated_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    except Exception:
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(updated_at), int(session_id)
+
+@app.route('/api/annotations/search', methods=['GET'])
+def search_annotations():
+    """Find annotations across all sessions by clueword label.
+
+    Matches the normalized label exactly, or as a prefix with ``prefix=true``;
+    ``panel`` restricts to question/control and ``limit`` caps the results.
+    """
+    try:
+        label = normalize_label(request.args.get('label', ''))
+        if not label:
+            return jsonify({'error': 'label is required'}), 400
+        panel = request.args.get('panel')
+        if panel and panel not in ANNOTATION_PANELS:
+            return jsonify({'error': 'panel must be question or control'}), 400
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+
+        query = (db.session.query(SessionAnnotation, ForensicSession.session_name, ForensicSession.case_number)
+                 .join(ForensicSession, ForensicSession.id == SessionAnnotation.session_id))
+        if request.args.get('prefix', 'false').lower() == 'true':
+            # A range on the indexed column instead of LIKE, so the index is used on every backend
+            query = query.filter(SessionAnnotation.label_normalized >= label,
+                                 SessionAnnotation.label_normalized < label + '\U0010ffff')
+        else:
+            query = query.filter(SessionAnnotation.label_normalized == label)
+        if panel:
+            query = query.filter(SessionAnnotation.panel == panel)
+        rows = query.order_by(SessionAnnotation.label_normalized, SessionAnnotation.session_id,
+                              SessionAnnotation.panel, SessionAnnotation.position).limit(limit).all()
+
+        return jsonify([
+            dict(ann.to_dict(), session_id=ann.session_id, session_name=session_name,
+                 case_number=case_number, panel=ann.panel)
+            for ann, session_name, case_number in rows
+        ])
+    except Exception as e:
+        app.logger.error(f"Error searching annotations: {str(e)}")
+        return jsonify({'error': 'Failed to search annotations'}), 500
+
+@app.route('/api/sessions', methods=['POST'])
+def save_session():
+    """Save a forensic session"""
+    try:
+        data = request.get_json()
+        
+        session_id = data.get('session_id')
+        if session_id:
+            # Update existing session
+            session = ForensicSession.query.get(session_id)
+            if not session:
+                return jsonify({'error': 'Session not found'}), 404
+            if 'version' in data and data['version'] != session.version:
+                return session_conflict(session)
+        else:
+            # Create new session
+            session = ForensicSession()
+        
+        # Audio references keep the cached standardizations from eviction.
+        # Clients that don't send them reference the audio open in this workspace.
+        audio_hashes = {}
+        for panel in ANNOTATION_PANELS:
+            key = f'{panel}_audio_hash'
+            if key in data:
+                audio_hashes[panel] = data[key] or None
+            elif getattr(session, key) or data.get(f'{panel}_filename'):
+                audio_hashes[panel] = getattr(session, key) or audio_hash_for(current_workspace(), panel)
+            else:
+                audio_hashes[panel] = None
+            if not valid_audio_hash(audio_hashes[panel]):
+                return jsonify({'error': f'Invalid {key}'}), 400
+        
+        # Update session data
+        session.session_name = data.get('session_name', '')
+        session.case_number = data.get('case_number', '')
+        session.police_station = data.get('police_station', '')
+        session.district = data.get('district', '')
+        session.cr_number = data.get('cr_number', '')
+        session.speaker_name = data.get('speaker_name', '')
+        session.question_filename = data.get('question_filename', '')
+        session.control_filename = data.get('control_filename', '')
+        session.question_file_path = data.get('question_file_path', '')
+        session.control_file_path = data.get('control_file_path', '')
+        for panel, audio_hash in audio_hashes.items():
+            set_session_audio(session, panel, audio_hash)
+        session.bandpass_enabled = data.get('bandpass_enabled', False)
+        # Annotation edits only touch child rows, so bump the timestamp explicitly
+        # (before any autoflush, so the session row is written once per save)
+        session.updated_at = datetime.utcnow()
+        
+        # Save annotations
+        annotations = data.get('annotations', {"question": [], "control": []})
+        session.set_annotations(annotations)
+        
+        db.session.add(session)
+        db.session.commit()
         
         return jsonify(session.to_dict())
         
+    except StaleDataError:
+        db.session.rollback()
+        return session_conflict(ForensicSession.query.get(session_id))
     except Exception as e:
         app.logger.error(f"Error saving session: {str(e)}")
         db.session.rollback()
         return jsonify({'error': 'Failed to save session'}), 500
 
+SESSION_PATCH_FIELDS = (
+    'session_name', 'case_number', 'police_station', 'district', 'cr_number', 'speaker_name',
+    'question_filename', 'control_filename', 'question_file_path', 'control_file_path', 'bandpass_enabled',
+    'question_audio_hash', 'control_audio_hash'
+)
+
+def valid_audio_hash(value):
+    """True for None or a hex SHA-256, the key of an audio cache entry."""
+    return value is None or (isinstance(value, str) and len(value) == 64 and all(c in '0123456789abcdef' for c in value))
+
+def session_field_error(name, value):
+    """Why a PATCH value does not fit its session column, or None if it does."""
+    if name.endswith('_audio_hash'):
+        return None if valid_audio_hash(value) else f'Invalid {name}'
+    column = ForensicSession.__table__.columns[name]
+    if value is None:
+        return None if column.nullable else f'{name} cannot be null'
+    if isinstance(column.type, db.Boolean):
+        return None if isinstance(value, bool) else f'{name} must be true or false'
+    if not isinstance(value, str):
+        return f'{name} must be a string'
+    if column.type.length is not None and len(value) > column.type.length:
+        return f'{name} is longer than {column.type.length} characters'
+    return None
+
+def annotation_patch_error(op, ann):
+    """Why an annotation to add, update or delete is malformed, or None if it is usable."""
+    if not isinstance(ann, dict) or ann.get('panel') not in ANNOTATION_PANELS or type(ann.get('id')) is not int:
+        return f"Each annotation to {op} needs a panel and an integer id"
+    if op == 'delete':
+        return None
+    missing = [key for key in ('label', 'start', 'end') if op == 'add' and key not in ann]
+    if missing:
+        return f"Annotation {ann['id']} needs {', '.join(missing)}"
+    label_column = SessionAnnotation.__table__.columns['label']
+    if 'label' in ann and (not isinstance(ann['label'], str) or len(ann['label']) > label_column.type.length):
+        return f"Annotation {ann['id']} needs a label of at most {label_column.type.length} characters"
+    for key in ('start', 'end'):
+        if key in ann and (isinstance(ann[key], bool) or not isinstance(ann[key], (int, float))):
+            return f"Annotation {ann['id']} {key} must be a number"
+    return None
+
+def set_session_audio(session, panel, audio_hash):
+    """Reference cached audio from a session; its file path then points into the audio cache."""
+    setattr(session, f'{panel}_audio_hash', audio_hash)
+    if audio_hash:
+        setattr(session, f'{panel}_file_path', os.path.abspath(cached_audio_path(audio_hash)))
+
+def session_conflict(session):
+    """409 response telling the client which version it is behind."""
+    return jsonify({
+        'error': 'Session was modified by someone else. Reload it before saving again.',
+        'version': session.version if session else None
+    }), 409
+
+def find_annotation(session_id, panel, annotation_id):
+    """Look up one annotation row by the id the API exposes (see SessionAnnotation.public_id)."""
+    match = SessionAnnotation.client_id == annotation_id
+    if annotation_id < 0:
+        match = db.or_(match, db.and_(SessionAnnotation.client_id.is_(None), SessionAnnotation.id == -annotation_id))
+    return SessionAnnotation.query.filter(
+        SessionAnnotation.session_id == session_id, SessionAnnotation.panel == panel, match
+    ).first()
+
+@app.route('/api/sessions/<int:session_id>', methods=['PATCH'])
+def patch_session(session_id):
+    """Apply an incremental change to a session.
+
+    Body: ``version`` (required, the version the client last saw), optional
+    ``fields`` with metadata columns to change, and optional ``annotations``
+    with ``add``/``update``/``delete`` lists of ``{"panel", "id", ...}``.
+    Only the touched rows are written. A stale ``version`` gets 409 and
+    nothing is applied.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Expected a JSON object'}), 400
+        if type(data.get('version')) is not int:
+            return jsonify({'error': 'version is required'}), 400
+        fields = data.get('fields') or {}
+        ops = data.get('annotations') or {}
+        if not isinstance(fields, dict) or not isinstance(ops, dict):
+            return jsonify({'error': 'fields and annotations must be objects'}), 400
+        if not all(isinstance(ops.get(op) or [], list) for op in ('add', 'update', 'delete')):
+            return jsonify({'error': 'Annotations to add, update and delete must be lists'}), 400
+        
+        session = ForensicSession.query.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+        if data['version'] != session.version:
+            return session_conflict(session)
+        
+        unknown = set(fields) - set(SESSION_PATCH_FIELDS)
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(sorted(unknown))}"}), 400
+        for name, value in fields.items():
+            error = session_field_error(name, value)
+            if error:
+                db.session.rollback()
+                return jsonify({'error': error}), 400
+            if name.endswith('_audio_hash'):
+                set_session_audio(session, name[:-len('_audio_hash')], value)
+            else:
+                setattr(session, name, value)
+        session.updated_at = datetime.utcnow()
+        
+        added = []
+        for op in ('add', 'update', 'delete'):
+            for ann in ops.get(op) or []:
+                error = annotation_patch_error(op, ann)
+                if error:
+                    db.session.rollback()
+                    return jsonify({'error': error}), 400
+                row = find_annotation(session_id, ann['panel'], ann['id'])
+                if op == 'add':
+                    if row is not None:
+                        db.session.rollback()
+                        return jsonify({'error': f"Annotation {ann['id']} already exists"}), 400
+                    last_position = (db.session.query(func.max(SessionAnnotation.position))
+                                     .filter_by(session_id=session_id, panel=ann['panel']).scalar())
+                    row = annotation_rows({ann['panel']: [ann]})[0]
+                    row.session_id = session_id
+                    row.position = (last_position + 1) if last_position is not None else 0
+                    db.session.add(row)
+                    db.session.flush()
+                    added.append(row)
+                    continue
+                if row is None:
+                    db.session.rollback()
+                    return jsonify({'error': f"Annotation {ann['id']} not found"}), 404
+                if op == 'delete':
+                    db.session.delete(row)
+                    continue
+                if 'label' in ann:
+                    row.label = ann['label']
+                    row.label_normalized = normalize_label(ann['label'])
+                    row.label_normalizer = LABEL_NORMALIZER_VERSION
+                if 'start' in ann:
+                    row.start_time = float(ann['start'])
+                if 'end' in ann:
+                    row.end_time = float(ann['end'])
+        
+        db.session.commit()
+        
+        return jsonify({
+            'id': session.id,
+            'version': session.version,
+            'updated_at': session.updated_at.isoformat(),
+            'added': [{'panel': row.panel, 'id': row.public_id} for row in added]
+        })
+        
+    except StaleDataError:
+        db.session.rollback()
+        return session_conflict(ForensicSession.query.get(session_id))
+    except (KeyError, TypeError, ValueError):
+        db.session.rollback()
+        return jsonify({'error': 'Invalid session patch'}), 400
+    except Exception as e:
+        app.logger.error(f"Error patching session: {str(e)}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to save session'}), 500
+
 @app.route('/api/sessions/<int:session_id>', methods=['GET'])
 def load_session(session_id):
     """Load a specific forensic session"""
@@ -528,6 +2520,36 @@ def load_session(session_id):
         app.logger.error(f"Error loading session: {str(e)}")
         return jsonify({'error': 'Failed to load session'}), 500
 
+@app.route('/api/sessions/<int:session_id>/audio', methods=['POST'])
+def restore_session_audio(session_id):
+    """Open a saved session's audio in this workspace straight from the audio cache.
+
+    Nothing is uploaded or transcoded again. A panel comes back as null when
+    the session references no audio for it or the audio is no longer stored.
+    """
+    try:
+        session = ForensicSession.query.get(session_id)
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+        
+        workspace = current_workspace()
+        restored = {}
+        for panel in ANNOTATION_PANELS:
+            audio_hash = getattr(session, f'{panel}_audio_hash')
+            meta = lookup_audio_cache(audio_hash) if audio_hash else None
+            if meta is None:
+                restored[panel] = None
+                continue
+            publish_cached_audio(audio_hash, workspace, panel)
+            schedule_spectrogram(audio_hash)
+            schedule_search_index(audio_hash)
+            restored[panel] = published_audio_info(panel, audio_hash, meta)
+        return jsonify(restored)
+        
+    except Exception as e:
+        app.logger.error(f"Error restoring session audio: {str(e)}")
+        return jsonify({'error': 'Failed to restore session audio'}), 500
+
 @app.route('/api/sessions/<int:session_id>', methods=['DELETE'])
 def delete_session(session_id):
     """Delete a forensic session"""
@@ -546,25 +2568,979 @@ def delete_session(session_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to delete session'}), 500
 
-def apply_bandpass_filter(audio_segment, low_freq, high_freq):
-    """Apply bandpass filter using FFmpeg"""
-    import tempfile
-    import os
+def map_standardized_wav(path):
+    """Memory-map the PCM samples of a standardized (mono 16-bit) WAV file.
+
+    Returns ``(samples, frame_rate)`` where ``samples`` is a read-only int16
+    array backed by the file, so slicing it never copies the recording.
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"{path} is not a WAV file")
+        
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no data chunk")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack('<HHIIHH', f.read(16))
+                f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b'data':
+                data_offset = f.tell()
+                break
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    
+    if fmt is None:
+        raise ValueError(f"{path} has no fmt chunk")
+    audio_format, channels, frame_rate, _, _, bits = fmt
+    if audio_format != 1 or channels != STANDARD_CHANNELS or bits != 8 * STANDARD_SAMPLE_WIDTH:
+        raise ValueError(f"{path} is not standardized mono 16-bit PCM")
     
+    # Clamp to the real file size in case the header was not finalized
+    frame_count = min(chunk_size, os.path.getsize(path) - data_offset) // STANDARD_SAMPLE_WIDTH
+    if frame_count == 0:
+        return np.zeros(0, dtype='<i2'), frame_rate
+    return np.memmap(path, dtype='<i2', mode='r', offset=data_offset, shape=(frame_count,)), frame_rate
+
+def load_source_pcm(workspace, panel_type):
+    """Get the standardized PCM for a panel from the WAV written by /standardize.
+
+    Returns ``(None, None)`` if the panel has not been standardized or its
+    WAV cannot be memory-mapped.
+    """
+    standardized_path = standardized_path_for(workspace, panel_type)
+    if not os.path.exists(standardized_path):
+        return None, None
     try:
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_input:
-            audio_segment.export(temp_input.name, format='wav')
-            temp_input_path = temp_input.name
+        return map_standardized_wav(standardized_path)
+    except ValueError as e:
+        app.logger.warning(f"Cannot map {standardized_path}: {str(e)}")
+        return None, None
+
+def slice_pcm(samples, frame_rate, start_ms, end_ms):
+    """Return a zero-copy view of the samples between two times (in ms)."""
+    start = min(int(start_ms * frame_rate / 1000.0), len(samples))
+    end = min(int(end_ms * frame_rate / 1000.0), len(samples))
+    return samples[start:max(start, end)]
+
+def pcm_to_segment(samples, frame_rate):
+    """Wrap mono 16-bit samples in an AudioSegment."""
+    return AudioSegment(
+        data=np.ascontiguousarray(samples, dtype='<i2').tobytes(),
+        sample_width=STANDARD_SAMPLE_WIDTH,
+        frame_rate=frame_rate,
+        channels=STANDARD_CHANNELS
+    )
+
+def export_pcm_wav(path, samples, frame_rate):
+    """Write mono 16-bit samples straight to a WAV file."""
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(STANDARD_CHANNELS)
+        wav_file.setsampwidth(STANDARD_SAMPLE_WIDTH)
+        wav_file.setframerate(frame_rate)
+        wav_file.writeframes(memoryview(np.ascontiguousarray(samples, dtype='<i2')).cast('B'))
+
+def save_upload(file, path):
+    """Stream an uploaded file to disk, returning the SHA-256 of its bytes."""
+    h = hashlib.sha256()
+    with timed_span('upload') as span, open(path, 'wb') as f:
+        for chunk in iter(lambda: file.stream.read(1 << 20), b''):
+            h.update(chunk)
+            f.write(chunk)
+            span['bytes'] += len(chunk)
+    return h.hexdigest()
+
+def widen_24bit_pcm(data):
+    """
+    Widen 24-bit PCM to 32-bit exactly as pydub does on load: the 24-bit
+    value moves to the top three bytes and the low byte repeats the sign.
+    """
+    samples = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3)
+    widened = np.empty((len(samples), 4), dtype=np.uint8)
+    widened[:, 0] = np.where(samples[:, 2] > 0x7f, 0xff, 0x00)
+    widened[:, 1:] = samples
+    return widened.tobytes()
+
+def decode_pcm_blocks(path, block_frames=STANDARDIZE_BLOCK_FRAMES):
+    """
+    Decode an audio file into fixed-size blocks of interleaved signed PCM.
+    Yields ``(data, sample_width, channels, frame_rate)``. PCM WAV files are
+    read directly; anything else is piped through ffmpeg. 24-bit samples are
+    widened to 32-bit, as pydub does, since audioop and numpy need whole words.
+    """
+    try:
+        wav_file = wave.open(path, 'rb')
+    except (wave.Error, EOFError):
+        wav_file = None
+    
+    if wav_file is not None:
+        with wav_file:
+            sample_width = wav_file.getsampwidth()
+            channels = wav_file.getnchannels()
+            frame_rate = wav_file.getframerate()
+            while True:
+                data = wav_file.readframes(block_frames)
+                if not data:
+                    break
+                if sample_width == 1:
+                    # 8-bit WAV is unsigned
+                    data = audioop.bias(data, 1, -128)
+                elif sample_width == 3:
+                    data = widen_24bit_pcm(data)
+                yield data, 4 if sample_width == 3 else sample_width, channels, frame_rate
+        return
+    
+    # Pick the PCM format the same way pydub does
+    info = mediainfo_json(path)
+    stream = [x for x in info['streams'] if x['codec_type'] == 'audio'][0]
+    if stream.get('sample_fmt') == 'fltp' and stream.get('codec_name') in ['mp3', 'mp4', 'aac', 'webm', 'ogg']:
+        bits = 16
+    else:
+        bits = int(stream.get('bits_per_sample') or 16)
+    sample_width = bits // 8
+    channels = int(stream['channels'])
+    frame_rate = int(stream['sample_rate'])
+    pcm_format = 'u8' if bits == 8 else f's{bits}le'
+    
+    cmd = ['ffmpeg', '-nostdin', '-v', 'error', '-i', path, '-vn', '-acodec', f'pcm_{pcm_format}', '-f', pcm_format, '-']
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = proc.stdout.read(block_frames * sample_width * channels)
+            if not data:
+                break
+            if sample_width == 1:
+                data = audioop.bias(data, 1, -128)
+            elif sample_width == 3:
+                data = widen_24bit_pcm(data)
+            yield data, 4 if sample_width == 3 else sample_width, channels, frame_rate
+        stderr = proc.stderr.read()
+        if proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed to decode audio: {stderr.decode('utf-8', 'ignore').strip()}")
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+        proc.stderr.close()
+
+def standardize_pcm_block(data, sample_width, channels, frame_rate, ratecv_state=None):
+    """
+    Resample, downmix and convert one PCM block to the standard format,
+    applying the same audioop steps as pydub's set_frame_rate, set_channels
+    and set_sample_width. Returns ``(data, ratecv_state)``.
+    """
+    if frame_rate != STANDARD_FRAME_RATE:
+        data, ratecv_state = audioop.ratecv(data, sample_width, channels, frame_rate, STANDARD_FRAME_RATE, ratecv_state)
+    
+    if channels == 2:
+        data = audioop.tomono(data, sample_width, 0.5, 0.5)
+    elif channels > 2:
+        dtype = {1: np.int8, 2: np.int16, 4: np.int32}[sample_width]
+        frames = np.frombuffer(data, dtype=dtype).reshape(-1, channels).astype(np.int64)
+        data = (frames // channels).sum(axis=1).astype(dtype).tobytes()
+    
+    if sample_width != STANDARD_SAMPLE_WIDTH:
+        data = audioop.lin2lin(data, sample_width, STANDARD_SAMPLE_WIDTH)
+    return data, ratecv_state
+
+def standardize_to_wav(source_path, output_path, on_block=None):
+    """
+    Stream an audio file into a 44.1kHz mono 16-bit WAV block by block, so
+    memory use does not depend on the recording length. Each standardized
+    block is also passed to on_block, if given.
+    Returns throughput statistics.
+    """
+    started = time.perf_counter()
+    input_frames = 0
+    input_bytes = 0
+    decode_seconds = 0.0
+    ratecv_state = None
+    with wave.open(output_path, 'wb') as out:
+        out.setnchannels(STANDARD_CHANNELS)
+        out.setsampwidth(STANDARD_SAMPLE_WIDTH)
+        out.setframerate(STANDARD_FRAME_RATE)
+        blocks = decode_pcm_blocks(source_path)
+        while True:
+            decode_started = time.perf_counter()
+            block = next(blocks, None)
+            decode_seconds += time.perf_counter() - decode_started
+            if block is None:
+                break
+            data, sample_width, channels, frame_rate = block
+            input_frames += len(data) // (sample_width * channels)
+            input_bytes += len(data)
+            data, ratecv_state = standardize_pcm_block(data, sample_width, channels, frame_rate, ratecv_state)
+            out.writeframes(data)
+            if on_block is not None:
+                on_block(data)
+        output_frames = out.getnframes()
+    
+    seconds = time.perf_counter() - started
+    # Decoding and resampling interleave block by block, so their spans are accumulated
+    record_span({'name': 'decode', 'seconds': decode_seconds, 'bytes': input_bytes, 'samples': input_frames})
+    record_span({'name': 'resample', 'seconds': seconds - decode_seconds, 'bytes': output_frames * STANDARD_SAMPLE_WIDTH, 'samples': output_frames})
+    return {
+        'input_frames': input_frames,
+        'output_frames': output_frames,
+        'seconds': seconds,
+        'samples_per_sec': input_frames / seconds if seconds > 0 else 0.0
+    }
+
+def audio_cache_dir(audio_hash):
+    return os.path.join(AUDIO_CACHE_FOLDER, audio_hash)
+
+def cached_audio_path(audio_hash):
+    return os.path.join(audio_cache_dir(audio_hash), 'standardized.wav')
+
+def lookup_audio_cache(audio_hash):
+    """Return the metadata of a cached standardization, or None on a miss."""
+    meta_path = os.path.join(audio_cache_dir(audio_hash), 'meta.json')
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('frame_rate') != STANDARD_FRAME_RATE:
+        return None
+    
+    # Record the access for LRU eviction
+    os.utime(meta_path)
+    return meta
+
+def build_audio_cache_entry(audio_hash, original_path, original_filename):
+    """Standardize an upload and store it, with its peaks and speech index, in the audio cache."""
+    os.makedirs(AUDIO_CACHE_FOLDER, exist_ok=True)
+    entry_dir = audio_cache_dir(audio_hash)
+    temp_dir = f"{entry_dir}.{uuid.uuid4().hex}.tmp"
+    os.makedirs(temp_dir)
+    try:
+        standardized_path = os.path.join(temp_dir, 'standardized.wav')
+        # Frame energies are measured as the standardized blocks are written
+        meter = FrameEnergyMeter()
+        stats = standardize_to_wav(original_path, standardized_path, meter.feed)
+        with timed_span('vad', samples=stats['output_frames']):
+            write_speech_index(os.path.join(temp_dir, 'speech.json'), meter.energies())
+        app.logger.info(
+            f"Standardized {original_filename}: {stats['input_frames']} frames in "
+            f"{stats['seconds']:.2f}s ({stats['samples_per_sec']:.0f} samples/sec)"
+        )
+        
+        # Precompute waveform peaks so the browser never decodes the file
+        samples, frame_rate = map_standardized_wav(standardized_path)
+        with timed_span('peaks', samples=len(samples)):
+            write_peak_pyramid(os.path.join(temp_dir, 'peaks.bin'), samples, frame_rate)
         
-        with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_output:
-            temp_output_path = temp_output.name
+        meta = {
+            'hash': audio_hash,
+            'original_filename': original_filename,
+            'frame_rate': frame_rate,
+            'frame_count': len(samples),
+            'samples_per_sec': stats['samples_per_sec'],
+            'created_at': datetime.utcnow().isoformat()
+        }
+        del samples
+        with open(os.path.join(temp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        
+        try:
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            # Another request stored the same audio first
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    
+    request_artifact_collection()
+    return meta
+
+def standardize_into_cache(source_path, original_filename=None):
+    """Standardize an audio file through the audio cache; returns its audio hash (the cache key)."""
+    audio_hash = file_sha256(source_path)
+    if lookup_audio_cache(audio_hash) is None:
+        build_audio_cache_entry(audio_hash, source_path, original_filename or os.path.basename(source_path))
+    return audio_hash
+
+def _link_or_copy(src, dst):
+    """Point dst at src's bytes (hard link when possible) without touching src."""
+    temp_path = f"{dst}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.link(src, temp_path)
+    except OSError:
+        shutil.copyfile(src, temp_path)
+    os.replace(temp_path, dst)
+
+def publish_cached_audio(audio_hash, workspace, panel_type):
+    """Expose a cached standardization as the panel's standardized audio and peaks."""
+    _link_or_copy(cached_audio_path(audio_hash), standardized_path_for(workspace, panel_type))
+    _link_or_copy(os.path.join(audio_cache_dir(audio_hash), 'peaks.bin'), peaks_path_for(workspace, panel_type))
+    # The spectrogram is built later, so it is looked up through the hash
+    with open(audio_hash_path_for(workspace, panel_type), 'w') as f:
+        f.write(audio_hash)
+
+def published_audio_info(panel_type, audio_hash, meta):
+    """URLs and duration of a panel's audio once published to the workspace."""
+    return {
+        "url": f"/audio/{panel_type}",
+        "peaks_url": f"/peaks/{panel_type}",
+        "spectrogram_url": f"/spectrogram/{panel_type}",
+        "duration": meta['frame_count'] / meta['frame_rate'],
+        "audio_hash": audio_hash
+    }
+
+class FrameEnergyMeter:
+    """Energy (dBFS) of every VAD_FRAME_MS frame of standardized PCM fed block by block."""
+    
+    def __init__(self, frame_rate=STANDARD_FRAME_RATE):
+        self.frame_len = int(frame_rate * VAD_FRAME_MS / 1000)
+        self._rest = np.zeros(0, dtype=np.float32)
+        self._blocks = []
+    
+    def feed(self, data):
+        samples = np.concatenate([self._rest, np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0])
+        count = len(samples) // self.frame_len
+        frames = samples[:count * self.frame_len].reshape(count, self.frame_len)
+        self._blocks.append((10 * np.log10((frames ** 2).mean(axis=1) + 1e-10) + 3.01).astype(np.float32))
+        self._rest = samples[count * self.frame_len:]
+    
+    def energies(self):
+        return np.concatenate(self._blocks) if self._blocks else np.zeros(0, dtype=np.float32)
+
+def frame_runs(mask):
+    """[start, end) frame pairs of the runs of True in mask."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.stack([np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)], axis=1)
+
+def merge_runs(runs, gap):
+    """Join runs separated by fewer than gap frames."""
+    if len(runs) == 0:
+        return runs
+    breaks = runs[1:, 0] - runs[:-1, 1] >= gap
+    return np.stack([runs[np.concatenate([[True], breaks]), 0], runs[np.concatenate([breaks, [True]]), 1]], axis=1)
+
+def speech_segments(energy):
+    """
+    Speech regions and word-like segments of a frame energy track, as
+    [start, end) frame pairs.
+
+    Frames are speech with hysteresis against an adaptive noise floor.
+    Runs split by short pauses become words, words are split further at
+    energy dips between louder neighbours, and words closer than
+    VAD_MERGE_GAP_MS form a region.
+    """
+    empty = np.zeros((0, 2), dtype=np.int64)
+    if len(energy) == 0:
+        return empty, empty
+    per_ms = 1.0 / VAD_FRAME_MS
+    smooth = uniform_filter1d(energy.astype(np.float32), 3, mode='nearest')
+    floor_frames = max(1, int(VAD_FLOOR_WINDOW_MS * per_ms))
+    floor = uniform_filter1d(minimum_filter1d(smooth, floor_frames, mode='nearest'), floor_frames, mode='nearest')
+    strong = smooth > np.maximum(floor + VAD_ON_DB, VAD_MIN_SPEECH_DBFS)
+    weak = smooth > np.maximum(floor + VAD_OFF_DB, VAD_MIN_SPEECH_DBFS - (VAD_ON_DB - VAD_OFF_DB))
+    
+    # Keep runs above the lower threshold that reach the upper one
+    runs = frame_runs(weak)
+    strong_count = np.concatenate([[0], np.cumsum(strong)])
+    runs = runs[strong_count[runs[:, 1]] > strong_count[runs[:, 0]]]
+    words = merge_runs(runs, max(1, int(VAD_WORD_GAP_MS * per_ms)))
+    
+    # Split words at dips well below the loudest frame on either side
+    reach = max(1, int(VAD_WORD_MIN_MS * per_ms))
+    if len(words):
+        padded = np.concatenate([np.full(reach, -np.inf, dtype=np.float32), smooth, np.full(reach, -np.inf, dtype=np.float32)])
+        window_max = np.lib.stride_tricks.sliding_window_view(padded, reach).max(axis=1)
+        left, right = window_max[:len(smooth)], window_max[reach + 1:reach + 1 + len(smooth)]
+        dips = np.flatnonzero((smooth == minimum_filter1d(smooth, 2 * reach + 1, mode='nearest'))
+                              & (left - smooth >= VAD_WORD_DIP_DB) & (right - smooth >= VAD_WORD_DIP_DB))
+        dips = dips[np.concatenate([[True], np.diff(dips) >= reach])] if len(dips) else dips
+        owner = np.searchsorted(words[:, 0], dips, side='right') - 1
+        inside = (owner >= 0) & (dips >= words[np.maximum(owner, 0), 0] + reach) & (dips <= words[np.maximum(owner, 0), 1] - reach)
+        words = np.stack([np.sort(np.concatenate([words[:, 0], dips[inside]])),
+                          np.sort(np.concatenate([words[:, 1], dips[inside]]))], axis=1)
+    
+    min_frames = max(1, int(VAD_MIN_SPEECH_MS * per_ms))
+    words = words[words[:, 1] - words[:, 0] >= min_frames]
+    regions = merge_runs(words, max(1, int(VAD_MERGE_GAP_MS * per_ms)))
+    return regions.astype(np.int64), words.astype(np.int64)
+
+def write_speech_index(path, energy):
+    """Store the speech regions and words of a frame energy track (times in ms) as JSON."""
+    regions, words = speech_segments(energy)
+    index = {
+        'version': 1,
+        'frame_ms': VAD_FRAME_MS,
+        'duration_ms': len(energy) * VAD_FRAME_MS,
+        'speech_ms': int((regions[:, 1] - regions[:, 0]).sum()) * VAD_FRAME_MS,
+        'regions': (regions * VAD_FRAME_MS).tolist(),
+        'words': (words * VAD_FRAME_MS).tolist()
+    }
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+def speech_index_path(audio_hash):
+    return os.path.join(audio_cache_dir(audio_hash), 'speech.json')
+
+@lru_cache(maxsize=16)
+def load_speech_index(audio_hash):
+    """
+    The speech index of a cached standardization as (info, regions, words),
+    with [start, end) ms pairs as arrays. Entries cached before the index
+    existed get it now, from one pass over the standardized audio.
+    """
+    path = speech_index_path(audio_hash)
+    if not os.path.exists(path):
+        samples, _ = map_standardized_wav(os.path.join(audio_cache_dir(audio_hash), 'standardized.wav'))
+        meter = FrameEnergyMeter()
+        with timed_span('vad', samples=len(samples)):
+            for i in range(0, len(samples), STANDARDIZE_BLOCK_FRAMES):
+                meter.feed(np.asarray(samples[i:i + STANDARDIZE_BLOCK_FRAMES]).tobytes())
+            write_speech_index(path, meter.energies())
+    with open(path) as f:
+        info = json.load(f)
+    regions = np.array(info.pop('regions'), dtype=np.int64).reshape(-1, 2)
+    words = np.array(info.pop('words'), dtype=np.int64).reshape(-1, 2)
+    return info, regions, words
+
+def segments_in_window(segments, start_ms, end_ms):
+    """The [start, end) ms pairs (sorted, non-overlapping) that overlap a time window."""
+    first = np.searchsorted(segments[:, 1], start_ms, side='right')
+    last = np.searchsorted(segments[:, 0], end_ms, side='left')
+    return segments[first:max(first, last)]
+
+PEAKS_HEADER = struct.Struct('<4sHIQIHH')
+PEAKS_MAGIC = b'PEAK'
+
+def peaks_path_for(workspace, panel_type):
+    return os.path.join(workspace, STANDARDIZED_FOLDER, f"{panel_type}_peaks.bin")
+
+def compute_peaks(samples, samples_per_bin):
+    """Interleaved (max, min) int16 pairs per bin of ``samples_per_bin`` samples."""
+    full_bins = len(samples) // samples_per_bin
+    peaks = np.empty((full_bins + (len(samples) % samples_per_bin > 0), 2), dtype='<i2')
+    if full_bins:
+        bins = np.asarray(samples[:full_bins * samples_per_bin]).reshape(full_bins, samples_per_bin)
+        peaks[:full_bins, 0] = bins.max(axis=1)
+        peaks[:full_bins, 1] = bins.min(axis=1)
+    if len(peaks) > full_bins:
+        tail = np.asarray(samples[full_bins * samples_per_bin:])
+        peaks[-1] = tail.max(), tail.min()
+    return peaks
+
+def write_peak_pyramid(path, samples, frame_rate):
+    """
+    Build the multi-resolution min/max pyramid for a recording and store it
+    as: header, one uint64 bin count per level, then each level's int16
+    (max, min) pairs.
+    """
+    # Level 0 in fixed-size blocks so memory stays bounded on long files
+    block = PEAKS_BASE_SAMPLES_PER_BIN * 65536
+    level = np.concatenate(
+        [compute_peaks(samples[i:i + block], PEAKS_BASE_SAMPLES_PER_BIN) for i in range(0, len(samples), block)]
+        or [np.zeros((0, 2), dtype='<i2')]
+    )
+    levels = [level]
+    while len(level) > 1:
+        pairs = len(level) // PEAKS_LEVEL_FACTOR
+        coarse = np.empty((-(-len(level) // PEAKS_LEVEL_FACTOR), 2), dtype='<i2')
+        grouped = level[:pairs * PEAKS_LEVEL_FACTOR].reshape(pairs, PEAKS_LEVEL_FACTOR, 2)
+        coarse[:pairs, 0] = grouped[:, :, 0].max(axis=1)
+        coarse[:pairs, 1] = grouped[:, :, 1].min(axis=1)
+        if len(coarse) > pairs:
+            rest = level[pairs * PEAKS_LEVEL_FACTOR:]
+            coarse[-1] = rest[:, 0].max(), rest[:, 1].min()
+        level = coarse
+        levels.append(level)
+    
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(PEAKS_HEADER.pack(PEAKS_MAGIC, 1, frame_rate, len(samples), PEAKS_BASE_SAMPLES_PER_BIN, PEAKS_LEVEL_FACTOR, len(levels)))
+        f.write(np.array([len(lv) for lv in levels], dtype='<u8').tobytes())
+        for lv in levels:
+            f.write(lv.tobytes())
+    os.replace(temp_path, path)
+
+def read_peak_pyramid(path):
+    """Memory-map a stored peak pyramid. Returns (info, levels)."""
+    with open(path, 'rb') as f:
+        magic, _, frame_rate, frame_count, base, factor, n_levels = PEAKS_HEADER.unpack(f.read(PEAKS_HEADER.size))
+        if magic != PEAKS_MAGIC:
+            raise ValueError(f"{path} is not a peak pyramid")
+        counts = np.frombuffer(f.read(8 * n_levels), dtype='<u8')
+    
+    offset = PEAKS_HEADER.size + 8 * n_levels
+    levels = []
+    for count in counts:
+        count = int(count)
+        if count:
+            levels.append(np.memmap(path, dtype='<i2', mode='r', offset=offset, shape=(count, 2)))
+        else:
+            levels.append(np.zeros((0, 2), dtype='<i2'))
+        offset += 4 * count
+    info = {'frame_rate': frame_rate, 'frame_count': frame_count, 'base': base, 'factor': factor}
+    return info, levels
+
+SPECTROGRAM_HEADER = struct.Struct('<4sHIQIHHHHhh')
+SPECTROGRAM_MAGIC = b'SPEC'
+
+_spectrogram_jobs = {}
+_spectrogram_jobs_lock = threading.Lock()
+_spectrogram_executor = ThreadPoolExecutor(max_workers=SPECTROGRAM_WORKERS, thread_name_prefix='spectrogram')
+
+def audio_hash_path_for(workspace, panel_type):
+    return os.path.join(workspace, STANDARDIZED_FOLDER, f"{panel_type}_audio_hash")
+
+def audio_hash_for(workspace, panel_type):
+    """The audio cache key of a panel's standardized audio, or None."""
+    try:
+        with open(audio_hash_path_for(workspace, panel_type)) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def spectrogram_path(audio_hash):
+    return os.path.join(audio_cache_dir(audio_hash), 'spectrogram.bin')
+
+@lru_cache(maxsize=4)
+def spectrogram_rows_matrix(frame_rate):
+    """(fft bins, rows) matrix averaging FFT bin power into SPECTROGRAM_ROWS linear bands."""
+    freqs = np.fft.rfftfreq(SPECTROGRAM_WINDOW, 1.0 / frame_rate)
+    row = (freqs * SPECTROGRAM_ROWS / SPECTROGRAM_MAX_FREQ).astype(int)
+    matrix = np.zeros((len(freqs), SPECTROGRAM_ROWS), dtype=np.float32)
+    inside = row < SPECTROGRAM_ROWS
+    matrix[np.flatnonzero(inside), row[inside]] = 1.0
+    return matrix / np.maximum(matrix.sum(axis=0), 1)
+
+def spectrogram_columns(samples, frame_rate, first, count):
+    """
+    Quantized STFT columns ``first`` .. ``first + count`` of a recording:
+    (count, SPECTROGRAM_ROWS) uint8, column c centred on sample c * hop.
+    """
+    hop = int(frame_rate * SPECTROGRAM_HOP_MS / 1000)
+    half = SPECTROGRAM_WINDOW // 2
+    start = first * hop - half
+    stop = (first + count - 1) * hop + half
+    block = np.zeros(stop - start, dtype=np.float32)
+    lo, hi = max(start, 0), min(stop, len(samples))
+    if hi > lo:
+        block[lo - start:hi - start] = np.asarray(samples[lo:hi], dtype=np.float32) / 32768.0
+    frames = np.lib.stride_tricks.sliding_window_view(block, SPECTROGRAM_WINDOW)[::hop][:count]
+    window = np.hanning(SPECTROGRAM_WINDOW).astype(np.float32)
+    power = np.abs(scipy_fft.rfft(frames * window, workers=-1)) ** 2
+    # 0 dB is a full-scale sine
+    db = 10 * np.log10(power @ spectrogram_rows_matrix(frame_rate) / (window.sum() / 2) ** 2 + 1e-20)
+    scaled = (db - SPECTROGRAM_DB_FLOOR) * (255.0 / (SPECTROGRAM_DB_CEILING - SPECTROGRAM_DB_FLOOR))
+    return np.clip(np.rint(scaled), 0, 255).astype(np.uint8)
+
+def write_spectrogram_pyramid(path, samples, frame_rate):
+    """
+    Store the spectrogram of a recording as: header, one uint64 column
+    count per level, then each level's (columns, rows) uint8 data. Level 0
+    has one column per SPECTROGRAM_HOP_MS; every further level keeps the
+    maximum of SPECTROGRAM_LEVEL_FACTOR columns. Levels are written block
+    by block through a memory map, so memory stays bounded on long files.
+    """
+    hop = int(frame_rate * SPECTROGRAM_HOP_MS / 1000)
+    counts = [max(1, -(-len(samples) // hop))]
+    while counts[-1] > SPECTROGRAM_TILE_COLUMNS:
+        counts.append(-(-counts[-1] // SPECTROGRAM_LEVEL_FACTOR))
+    
+    data_offset = SPECTROGRAM_HEADER.size + 8 * len(counts)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(SPECTROGRAM_HEADER.pack(
+                SPECTROGRAM_MAGIC, 1, frame_rate, len(samples), hop, SPECTROGRAM_LEVEL_FACTOR,
+                len(counts), SPECTROGRAM_ROWS, SPECTROGRAM_MAX_FREQ, SPECTROGRAM_DB_FLOOR, SPECTROGRAM_DB_CEILING
+            ))
+            f.write(np.array(counts, dtype='<u8').tobytes())
+            f.truncate(data_offset + SPECTROGRAM_ROWS * sum(counts))
+        
+        data = np.memmap(temp_path, dtype=np.uint8, mode='r+', offset=data_offset, shape=(sum(counts), SPECTROGRAM_ROWS))
+        level = data[:counts[0]]
+        for first in range(0, counts[0], SPECTROGRAM_BLOCK_COLUMNS):
+            count = min(SPECTROGRAM_BLOCK_COLUMNS, counts[0] - first)
+            level[first:first + count] = spectrogram_columns(samples, frame_rate, first, count)
+        
+        offset = counts[0]
+        for count in counts[1:]:
+            coarse = data[offset:offset + count]
+            step = SPECTROGRAM_BLOCK_COLUMNS * SPECTROGRAM_LEVEL_FACTOR
+            for first in range(0, len(level), step):
+                fine = np.asarray(level[first:first + step])
+                pad = -len(fine) % SPECTROGRAM_LEVEL_FACTOR
+                if pad:
+                    fine = np.concatenate([fine, np.zeros((pad, SPECTROGRAM_ROWS), dtype=np.uint8)])
+                coarse[first // SPECTROGRAM_LEVEL_FACTOR:(first + len(fine)) // SPECTROGRAM_LEVEL_FACTOR] = \
+                    fine.reshape(-1, SPECTROGRAM_LEVEL_FACTOR, SPECTROGRAM_ROWS).max(axis=1)
+            level = coarse
+            offset += count
+        data.flush()
+        del data, level
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def read_spectrogram_pyramid(path):
+    """Memory-map a stored spectrogram pyramid. Returns (info, levels)."""
+    with open(path, 'rb') as f:
+        (magic, _, frame_rate, frame_count, hop, factor, n_levels,
+         rows, max_freq, db_floor, db_ceiling) = SPECTROGRAM_HEADER.unpack(f.read(SPECTROGRAM_HEADER.size))
+        if magic != SPECTROGRAM_MAGIC:
+            raise ValueError(f"{path} is not a spectrogram pyramid")
+        counts = [int(c) for c in np.frombuffer(f.read(8 * n_levels), dtype='<u8')]
+    
+    offset = SPECTROGRAM_HEADER.size + 8 * n_levels
+    data = np.memmap(path, dtype=np.uint8, mode='r', offset=offset, shape=(sum(counts), rows))
+    levels = []
+    for count in counts:
+        levels.append(data[:count])
+        data = data[count:]
+    info = {
+        'frame_rate': frame_rate, 'frame_count': frame_count, 'hop': hop, 'factor': factor,
+        'rows': rows, 'max_freq': max_freq, 'db_floor': db_floor, 'db_ceiling': db_ceiling
+    }
+    return info, levels
+
+def build_spectrogram(audio_hash):
+    """Background task: compute the spectrogram pyramid of a cached standardization."""
+    try:
+        with job_trace('spectrogram'):
+            samples, frame_rate = map_standardized_wav(os.path.join(audio_cache_dir(audio_hash), 'standardized.wav'))
+            with timed_span('spectrogram', samples=len(samples)) as span:
+                write_spectrogram_pyramid(spectrogram_path(audio_hash), samples, frame_rate)
+                span['bytes'] = os.path.getsize(spectrogram_path(audio_hash))
+    except Exception as e:
+        # The failed future stays registered until a status request reports it
+        app.logger.error(f"Error building spectrogram for {audio_hash}: {str(e)}")
+        raise
+    with _spectrogram_jobs_lock:
+        _spectrogram_jobs.pop(audio_hash, None)
+
+def schedule_spectrogram(audio_hash):
+    """
+    Queue spectrogram generation for a cached standardization unless it
+    exists or is already queued. Returns the job's future, or None.
+    """
+    if os.path.exists(spectrogram_path(audio_hash)):
+        return None
+    with _spectrogram_jobs_lock:
+        future = _spectrogram_jobs.get(audio_hash)
+        if future is None:
+            future = _spectrogram_executor.submit(build_spectrogram, audio_hash)
+            _spectrogram_jobs[audio_hash] = future
+    return future
+
+def render_clueword(job, sources, bandpass=None):
+    """Cut one matched clueword from both recordings as in-memory WAV files.
+
+    Files whose cache key (``job['artifact_keys']``) is already in the
+    clueword cache are reused instead of rendered. Returns a list of
+    ``(filename, wav_bytes)`` pairs.
+    """
+    keys = job.get('artifact_keys') or {}
+    files = []
+    for panel in ('question', 'control'):
+        samples, frame_rate = sources[panel]
+        start_ms, end_ms = job[panel]
+        with timed_span('slice') as span:
+            seg = slice_pcm(samples, frame_rate, start_ms, end_ms)
+            span['samples'] = len(seg)
+        
+        def render_segment():
+            with timed_span('wav_export', samples=len(seg)) as span:
+                buffer = io.BytesIO()
+                export_pcm_wav(buffer, seg, frame_rate)
+                span['bytes'] = buffer.tell()
+            return buffer.getvalue()
+        
+        def render_bandpass():
+            with timed_span('bandpass', nbytes=seg.nbytes, samples=len(seg)):
+                seg_bpf = apply_bandpass_filter(pcm_to_segment(seg, frame_rate), fallback=False, **bandpass)
+            with timed_span('wav_export', samples=len(seg)) as span:
+                buffer = io.BytesIO()
+                seg_bpf.export(buffer, format="wav")
+                span['bytes'] = buffer.tell()
+            return buffer.getvalue()
+        
+        segment_wav = cached_clueword_artifact(keys.get(f"{panel}.wav"), render_segment)
+        files.append((f"{panel}.wav", segment_wav))
+        if bandpass:
+            try:
+                bpf_wav = cached_clueword_artifact(keys.get(f"bpf_{panel}.wav"), render_bandpass)
+            except Exception as e:
+                # The unfiltered fallback is never cached, so a later run filters again
+                app.logger.warning(f"Bandpass filter failed: {str(e)}, returning original audio")
+                bpf_wav = segment_wav
+            files.append((f"bpf_{panel}.wav", bpf_wav))
+    return files
+
+def clueword_artifact_keys(job, fingerprints, bandpass=None):
+    """Cache keys of the files render_clueword produces for a job.
+
+    A key covers everything that determines the bytes: the source audio,
+    the segment boundaries and, for bandpass files, the filter settings.
+    The label only names the output directory, so relabelling reuses files.
+    """
+    keys = {}
+    for panel in ('question', 'control'):
+        start_ms, end_ms = job[panel]
+        inputs = {'source': fingerprints[panel], 'start_ms': start_ms, 'end_ms': end_ms}
+        keys[f"{panel}.wav"] = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+        if bandpass:
+            # Q marks the filter design, so files from an earlier design are not reused
+            inputs['bandpass'] = dict(bandpass, q=BANDPASS_Q)
+            keys[f"bpf_{panel}.wav"] = hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    return keys
+
+def clueword_artifact_path(key):
+    return os.path.join(CLUEWORD_CACHE_FOLDER, f"{key}.wav")
+
+def cached_clueword_artifact(key, render):
+    """Bytes of a clueword artifact from the cache, rendering and storing it on a miss."""
+    if not key:
+        return render()
+    path = clueword_artifact_path(key)
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        # Record the access for LRU eviction
+        os.utime(path)
+        metrics.inc('clueword_artifact_cache_total', {'result': 'hit'})
+        return data
+    except OSError:
+        pass
+    
+    metrics.inc('clueword_artifact_cache_total', {'result': 'miss'})
+    data = render()
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        os.makedirs(CLUEWORD_CACHE_FOLDER, exist_ok=True)
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError as e:
+        app.logger.warning(f"Could not cache clueword artifact: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return data
+
+def extract_clueword_group(jobs, sources, bandpass=None):
+    """Run jobs that share an output directory one after another.
+
+    The WAV files are returned in memory, later jobs replacing earlier files
+    of the same name. Returns ``(errors, files, spans)`` with one error
+    message (or None) per job and the timing spans of the group.
+    """
+    if sources is None:
+        sources = _worker_sources
+    errors = []
+    files = OrderedDict()
+    # Spans are handed back to the caller, which may be in another process
+    _span_local.deferred = spans = []
+    for job in jobs:
+        try:
+            files.update(render_clueword(job, sources, bandpass))
+            errors.append(None)
+        except Exception as e:
+            app.logger.error(f"Error extracting clueword '{job['label']}': {str(e)}")
+            errors.append(str(e))
+    _span_local.deferred = None
+    return errors, list(files.items()), spans
+
+# PCM sources of the current process-pool worker, set by _init_extraction_worker
+_worker_sources = None
+
+def _share_sources(sources):
+    """Describe PCM sources so a worker process can re-open them cheaply."""
+    shared = {}
+    for panel, (samples, frame_rate) in sources.items():
+        if isinstance(samples, np.memmap) and samples.filename:
+            shared[panel] = ('memmap', samples.filename, samples.offset, len(samples), frame_rate)
+        else:
+            shared[panel] = ('array', np.asarray(samples), frame_rate)
+    return shared
+
+def _init_extraction_worker(shared):
+    global _worker_sources
+    _worker_sources = {}
+    for panel, source in shared.items():
+        if source[0] == 'memmap':
+            _, filename, offset, length, frame_rate = source
+            samples = np.memmap(filename, dtype='<i2', mode='r', offset=offset, shape=(length,))
+        else:
+            _, samples, frame_rate = source
+        _worker_sources[panel] = (samples, frame_rate)
+
+def iter_extraction_groups(jobs, sources, bandpass=None, max_workers=None, executor=None, fingerprints=None):
+    """Fan clueword extraction jobs out to a worker pool.
+
+    Jobs writing to the same clueword directory run in one task so they
+    cannot race. Yields ``(job_indices, errors, files)`` per directory in
+    job order, keeping at most two tasks per worker in flight; a failing
+    job never aborts the others. ``fingerprints`` (see source_fingerprint)
+    key the clueword cache; without them the samples are hashed.
+    """
+    executor = executor or EXTRACTION_EXECUTOR
+    max_workers = max(1, max_workers or EXTRACTION_MAX_WORKERS)
+    
+    groups = OrderedDict()
+    for index, job in enumerate(jobs):
+        groups.setdefault(job['dir'], []).append(index)
+    max_workers = min(max_workers, len(groups)) or 1
+    
+    if CLUEWORD_CACHE_MAX_BYTES > 0:
+        fingerprints = fingerprints or {panel: source_fingerprint(*source) for panel, source in sources.items()}
+        jobs = [dict(job, artifact_keys=clueword_artifact_keys(job, fingerprints, bandpass)) for job in jobs]
+    
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_extraction_worker, initargs=(_share_sources(sources),))
+        task = partial(extract_clueword_group, sources=None, bandpass=bandpass)
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        task = partial(extract_clueword_group, sources=sources, bandpass=bandpass)
+    
+    with pool:
+        pending = deque()
+        group_indices = iter(groups.values())
+        while True:
+            while len(pending) < 2 * max_workers:
+                indices = next(group_indices, None)
+                if indices is None:
+                    break
+                pending.append((indices, pool.submit(task, [jobs[i] for i in indices])))
+            if not pending:
+                break
+            
+            indices, future = pending.popleft()
+            try:
+                errors, files, spans = future.result()
+            except Exception as e:
+                app.logger.error(f"Clueword extraction worker failed: {str(e)}")
+                errors, files, spans = [str(e)] * len(indices), [], []
+            for span in spans:
+                record_span(span)
+            yield indices, errors, files
+    
+    if CLUEWORD_CACHE_MAX_BYTES > 0:
+        request_artifact_collection()
+
+def zip_compression_for(filename):
+    """Pick the ZIP compression method for a package entry by file type."""
+    return ZIP_COMPRESSION.get(os.path.splitext(filename)[1].lower(), zipfile.ZIP_DEFLATED)
+
+def write_package_entry(zipf, arcname, data):
+    """Add a file to a package ZIP with the fixed timestamp and its type's compression."""
+    info = zipfile.ZipInfo(arcname, date_time=PACKAGE_ZIP_DATE_TIME)
+    info.external_attr = 0o644 << 16
+    zipf.writestr(info, data, compress_type=zip_compression_for(arcname))
+
+class ZipStreamBuffer:
+    """Write-only file object that hands ZIP output to a generator in chunks."""
+    
+    def __init__(self):
+        self._chunks = []
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def flush(self):
+        pass
+    
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+@lru_cache(maxsize=32)
+def rbj_biquad_sos(btype, freq, frame_rate, q=BANDPASS_Q):
+    """One RBJ cookbook highpass/lowpass biquad as a (1, 6) SOS array, as FFmpeg computes it."""
+    w0 = 2 * np.pi * freq / frame_rate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2 * q)
+    if btype == 'highpass':
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+    else:
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+    a = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    return np.array([b + a]) / a[0]
+
+def design_bandpass_sos(low_freq, high_freq, frame_rate, order=BANDPASS_ORDER):
+    """Design the highpass and lowpass stages as second-order sections.
+
+    With the default order of 2 each stage is the RBJ biquad (Q =
+    BANDPASS_Q) that FFmpeg's ``highpass``/``lowpass`` filters use, so the
+    cascade matches the ``highpass=f=low,lowpass=f=high`` chain. Other
+    orders use Butterworth sections.
+    """
+    nyquist = frame_rate / 2.0
+    if not 0 < low_freq < high_freq < nyquist:
+        raise ValueError(
+            f"Invalid bandpass cutoffs {low_freq}-{high_freq} Hz for {frame_rate} Hz audio"
+        )
+    if order == 2:
+        return rbj_biquad_sos('highpass', low_freq, frame_rate), rbj_biquad_sos('lowpass', high_freq, frame_rate)
+    highpass = butter(order, low_freq, btype='highpass', fs=frame_rate, output='sos')
+    lowpass = butter(order, high_freq, btype='lowpass', fs=frame_rate, output='sos')
+    return highpass, lowpass
+
+def apply_bandpass_filter(audio_segment, low_freq, high_freq, order=BANDPASS_ORDER, engine=None, fallback=True):
+    """Apply a bandpass filter to an AudioSegment.
+
+    The default NumPy/SciPy engine filters the raw sample array in memory.
+    Its output stays within BANDPASS_TOLERANCE_LSB of the FFmpeg filter chain
+    for the default order. Pass ``engine='ffmpeg'`` (or set BANDPASS_ENGINE)
+    to use the FFmpeg subprocess instead.
+
+    If filtering fails the original audio is returned, or with
+    ``fallback=False`` the error is raised.
+    """
+    engine = engine or BANDPASS_ENGINE
+    try:
+        if engine == 'ffmpeg':
+            return apply_bandpass_filter_ffmpeg(audio_segment, low_freq, high_freq)
+
+        stages = design_bandpass_sos(low_freq, high_freq, audio_segment.frame_rate, order)
+
+        full_scale = float(1 << (8 * audio_segment.sample_width - 1))
+        samples = np.asarray(audio_segment.get_array_of_samples())
+
+        # Interleaved samples -> (frames, channels), filtered along time
+        filtered = samples.reshape(-1, audio_segment.channels).astype(np.float64)
+        for sos in stages:
+            # Like FFmpeg, hand integer samples from one stage to the next
+            filtered = np.clip(np.trunc(sosfilt(sos, filtered, axis=0)), -full_scale, full_scale - 1)
+
+        return audio_segment._spawn(filtered.astype(samples.dtype).tobytes())
+
+    except Exception as e:
+        if not fallback:
+            raise
+        app.logger.warning(f"Bandpass filter failed: {str(e)}, returning original audio")
+        return audio_segment
+
+def apply_bandpass_filter_ffmpeg(audio_segment, low_freq, high_freq):
+    """Apply bandpass filter using FFmpeg; raises if FFmpeg fails"""
+    import tempfile
+    
+    # The temporary directory, and both WAVs in it, is removed even when FFmpeg fails
+    with tempfile.TemporaryDirectory(prefix='bandpass-') as temp_dir:
+        temp_input_path = os.path.join(temp_dir, 'input.wav')
+        temp_output_path = os.path.join(temp_dir, 'output.wav')
+        audio_segment.export(temp_input_path, format='wav')
         
         # Apply bandpass filter using FFmpeg
         # highpass=400Hz, lowpass=4000Hz
         filter_cmd = f"highpass=f={low_freq},lowpass=f={high_freq}"
         
-        import subprocess
         cmd = [
             'ffmpeg', '-y', '-i', temp_input_path,
             '-af', filter_cmd,
@@ -575,17 +3551,488 @@ def apply_bandpass_filter(audio_segment, low_freq, high_freq):
         subprocess.run(cmd, check=True, capture_output=True)
         
         # Load filtered audio
-        filtered_audio = AudioSegment.from_wav(temp_output_path)
-        
-        # Clean up temp files
-        os.unlink(temp_input_path)
-        os.unlink(temp_output_path)
-        
-        return filtered_audio
-        
+        return AudioSegment.from_wav(temp_output_path)
+
+@lru_cache(maxsize=8)
+def feature_filters(frame_rate):
+    """Per-rate constants of the acoustic feature stage.
+
+    Returns frame/hop lengths, the FFT size, the Hann window, bin
+    frequencies, the mel filterbank, the MFCC DCT matrix, the number of
+    bins below FEATURE_LPC_RATE / 2 with the rate they resample to, the
+    window's autocorrelation at that rate and the pre-emphasis response.
+    """
+    frame_len = int(frame_rate * FEATURE_FRAME_MS / 1000)
+    hop = int(frame_rate * FEATURE_HOP_MS / 1000)
+    n_fft = 1 << int(np.ceil(np.log2(frame_len)))
+    window = np.hanning(frame_len).astype(np.float32)
+    freqs = np.fft.rfftfreq(n_fft, 1.0 / frame_rate)
+    
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    
+    mel_edges = 700.0 * (10 ** (np.linspace(hz_to_mel(0), hz_to_mel(frame_rate / 2.0), FEATURE_MEL_BANDS + 2) / 2595.0) - 1.0)
+    lower, center, upper = mel_edges[:-2, None], mel_edges[1:-1, None], mel_edges[2:, None]
+    mel_fb = np.maximum(0, np.minimum((freqs - lower) / (center - lower), (upper - freqs) / (upper - center)))
+    
+    n = np.arange(FEATURE_MEL_BANDS)
+    dct = np.sqrt(2.0 / FEATURE_MEL_BANDS) * np.cos(np.pi / FEATURE_MEL_BANDS * (n + 0.5) * np.arange(FEATURE_MFCC_COUNT)[:, None])
+    dct[0] /= np.sqrt(2.0)
+    
+    # Autocorrelations for F0 and LPC are taken from the low band only, which
+    # is the same as resampling each frame to about FEATURE_LPC_RATE
+    band_bins = min(int(n_fft * FEATURE_LPC_RATE / (2 * frame_rate)), n_fft // 2)
+    band_rate = 2 * band_bins * frame_rate / n_fft
+    window_acf = np.fft.irfft(np.abs(np.fft.rfft(window, n_fft)[:band_bins + 1]) ** 2, 2 * band_bins)
+    window_acf = window_acf / window_acf[0]
+    pre_emphasis = 1.0 + 0.97 ** 2 - 2 * 0.97 * np.cos(2 * np.pi * freqs[:band_bins + 1] / frame_rate)
+    return (frame_len, hop, n_fft, window, freqs, mel_fb.astype(np.float32), dct.astype(np.float32),
+            band_bins, band_rate, window_acf, pre_emphasis.astype(np.float32))
+
+def levinson_durbin(r, order):
+    """LPC coefficients ``a`` (with a[:, 0] == 1) for each row of autocorrelations."""
+    a = np.zeros((len(r), order + 1))
+    a[:, 0] = 1.0
+    err = r[:, 0].copy()
+    for i in range(1, order + 1):
+        k = -(a[:, :i] * r[:, i:0:-1]).sum(axis=1) / err
+        a[:, 1:i + 1] = a[:, 1:i + 1] + k[:, None] * a[:, i - 1::-1]
+        err *= 1.0 - k ** 2
+    return a
+
+def lpc_formants(a, rate, count=3):
+    """
+    The lowest ``count`` formant frequencies per frame: peaks of the LPC
+    envelope 1/|A|, refined by parabolic interpolation (NaN when not found).
+    """
+    log_envelope = -np.log(np.abs(scipy_fft.rfft(a, FEATURE_ENVELOPE_POINTS, workers=-1)) + 1e-12)
+    left, mid, right = log_envelope[:, :-2], log_envelope[:, 1:-1], log_envelope[:, 2:]
+    is_peak = (mid > left) & (mid >= right)
+    curvature = left - 2 * mid + right
+    bins = np.arange(1, log_envelope.shape[1] - 1) + np.where(curvature < 0, 0.5 * (left - right) / np.where(curvature < 0, curvature, -1), 0)
+    freq = np.where(is_peak, bins * rate / FEATURE_ENVELOPE_POINTS, np.nan)
+    freq[freq < FEATURE_FORMANT_MIN_HZ] = np.nan
+    return np.sort(freq, axis=1)[:, :count]
+
+def frame_features(frames, frame_rate):
+    """Per-frame features of a (frames, frame_len) batch of samples scaled to [-1, 1)."""
+    (frame_len, hop, n_fft, window, freqs, mel_fb, dct,
+     band_bins, band_rate, window_acf, pre_emphasis) = feature_filters(frame_rate)
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    power = np.abs(scipy_fft.rfft(frames * window, n_fft, workers=-1)) ** 2
+    total = power.sum(axis=1) + 1e-12
+    
+    log_mel = 10 * np.log10(power @ mel_fb.T + 1e-10)
+    mfcc = log_mel @ dct.T
+    
+    centroid = power @ freqs / total
+    bandwidth = np.sqrt(np.maximum(power @ freqs ** 2 / total - centroid ** 2, 0))
+    rolloff = freqs[np.argmax(np.cumsum(power, axis=1) >= 0.85 * total[:, None], axis=1)]
+    flatness = np.exp(np.log(power + 1e-12).mean(axis=1)) / (total / power.shape[1])
+    rms_dbfs = 10 * np.log10((frames ** 2).mean(axis=1) + 1e-12) + 3.01
+    
+    # F0: the shortest-lag autocorrelation peak close to the strongest one.
+    # Lags stay below half a frame (window correction) and the FFT wrap-around.
+    min_lag = max(1, int(band_rate / FEATURE_F0_MAX_HZ))
+    max_lag = min(int(band_rate / FEATURE_F0_MIN_HZ), int(band_rate * min(frame_len / 2, n_fft - frame_len) / frame_rate))
+    acf = scipy_fft.irfft(power[:, :band_bins + 1], 2 * band_bins, workers=-1)[:, :max_lag + 2]
+    acf = acf / (acf[:, :1] + 1e-12) / window_acf[:max_lag + 2]
+    candidates = acf[:, min_lag:max_lag + 1]
+    is_peak = (candidates >= acf[:, min_lag - 1:max_lag]) & (candidates >= acf[:, min_lag + 1:max_lag + 2])
+    is_peak &= candidates >= FEATURE_OCTAVE_RATIO * candidates.max(axis=1, keepdims=True)
+    lag = min_lag + np.argmax(is_peak, axis=1)
+    rows = np.arange(len(acf))
+    left, peak, right = acf[rows, lag - 1], acf[rows, lag], acf[rows, lag + 1]
+    curvature = left - 2 * peak + right
+    shift = np.where(curvature < 0, 0.5 * (left - right) / np.where(curvature < 0, curvature, -1), 0)
+    voiced = (peak >= FEATURE_VOICING_THRESHOLD) & (rms_dbfs >= FEATURE_SILENCE_DBFS)
+    f0 = np.where(voiced, band_rate / (lag + np.clip(shift, -0.5, 0.5)), np.nan)
+    
+    # Formants: LPC fit to the pre-emphasized low band of voiced frames
+    formants = np.full((len(frames), 3), np.nan)
+    if voiced.any():
+        lpc_acf = scipy_fft.irfft(power[voiced, :band_bins + 1] * pre_emphasis, 2 * band_bins, workers=-1)[:, :FEATURE_LPC_ORDER + 1]
+        lpc_acf = lpc_acf.astype(np.float64)
+        lpc_acf[:, 0] = lpc_acf[:, 0] * (1 + 1e-9) + 1e-12
+        formants[voiced] = lpc_formants(levinson_durbin(lpc_acf, FEATURE_LPC_ORDER), band_rate)
+    
+    return {
+        'mfcc': mfcc, 'log_mel': log_mel, 'centroid': centroid, 'bandwidth': bandwidth,
+        'rolloff': rolloff, 'flatness': flatness, 'rms_dbfs': rms_dbfs, 'f0': f0, 'formants': formants
+    }
+
+def segment_features(samples, frame_rate, segments):
+    """
+    Acoustic features of several segments of one recording. All frames of
+    all segments go through frame_features together, FEATURE_BATCH_FRAMES
+    at a time. segments are ``(start_ms, end_ms)``; returns one dict each.
+    """
+    frame_len, hop = feature_filters(frame_rate)[:2]
+    bounds = np.array([(int(start_ms * frame_rate / 1000.0), int(end_ms * frame_rate / 1000.0)) for start_ms, end_ms in segments], dtype=np.int64).reshape(-1, 2)
+    starts = np.clip(bounds[:, 0], 0, len(samples))
+    ends = np.clip(bounds[:, 1], starts, len(samples))
+    counts = np.maximum(1, (ends - starts - frame_len) // hop + 1)
+    
+    # One row per frame; frames of a segment are contiguous
+    frame_segment = np.repeat(np.arange(len(segments)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    frame_starts = starts[frame_segment] + offsets * hop
+    frame_ends = ends[frame_segment]
+    
+    per_frame = []
+    for i in range(0, len(frame_starts), FEATURE_BATCH_FRAMES):
+        idx = frame_starts[i:i + FEATURE_BATCH_FRAMES, None] + np.arange(frame_len)
+        inside = idx < frame_ends[i:i + FEATURE_BATCH_FRAMES, None]
+        if len(samples):
+            frames = np.asarray(samples)[np.minimum(idx, len(samples) - 1)].astype(np.float32) / 32768.0
+        else:
+            frames = np.zeros(idx.shape, dtype=np.float32)
+        per_frame.append(frame_features(np.where(inside, frames, 0), frame_rate))
+    per_frame = {name: np.concatenate([batch[name] for batch in per_frame]) for name in per_frame[0]}
+    
+    first = np.cumsum(counts) - counts
+    
+    def segment_mean(values, mask=None):
+        mask = np.ones(len(values), dtype=bool) if mask is None else mask
+        if values.ndim > 1 and mask.ndim == 1:
+            mask = np.broadcast_to(mask[:, None], values.shape)
+        sums = np.add.reduceat(np.where(mask, values, 0), first)
+        n = np.add.reduceat(mask.astype(np.int64), first)
+        return np.where(n > 0, sums / np.maximum(n, 1), np.nan), n
+    
+    f0 = per_frame['f0']
+    voiced = ~np.isnan(f0)
+    f0_mean, voiced_frames = segment_mean(f0, voiced)
+    f0_sq, _ = segment_mean(f0 ** 2, voiced)
+    f0_std = np.sqrt(np.maximum(f0_sq - f0_mean ** 2, 0))
+    formants, _ = segment_mean(per_frame['formants'], ~np.isnan(per_frame['formants']))
+    mfcc_mean, _ = segment_mean(per_frame['mfcc'])
+    mfcc_sq, _ = segment_mean(per_frame['mfcc'] ** 2)
+    mfcc_std = np.sqrt(np.maximum(mfcc_sq - mfcc_mean ** 2, 0))
+    log_mel, _ = segment_mean(per_frame['log_mel'])
+    stats = {name: segment_mean(per_frame[name])[0] for name in ('centroid', 'bandwidth', 'rolloff', 'flatness', 'rms_dbfs')}
+    
+    def number(value, digits=2):
+        return None if np.isnan(value) else round(float(value), digits)
+    
+    results = []
+    for s in range(len(segments)):
+        contour = f0[first[s]:first[s] + counts[s]]
+        results.append({
+            'duration_ms': round(float((ends[s] - starts[s]) * 1000.0 / frame_rate), 1),
+            'frames': int(counts[s]),
+            'voiced_fraction': round(float(voiced_frames[s] / counts[s]), 3),
+            'f0_mean_hz': number(f0_mean[s]),
+            'f0_std_hz': number(f0_std[s]),
+            'f0_contour_hz': [number(v, 1) for v in contour],
+            'formants_hz': [number(v, 1) for v in formants[s]],
+            'mfcc_mean': [number(v, 3) for v in mfcc_mean[s]],
+            'mfcc_std': [number(v, 3) for v in mfcc_std[s]],
+            'log_mel_mean_db': [number(v, 2) for v in log_mel[s]],
+            'spectral_centroid_hz': number(stats['centroid'][s], 1),
+            'spectral_bandwidth_hz': number(stats['bandwidth'][s], 1),
+            'spectral_rolloff_hz': number(stats['rolloff'][s], 1),
+            'spectral_flatness': number(stats['flatness'][s], 4),
+            'rms_dbfs': number(stats['rms_dbfs'][s], 2),
+        })
+    return results
+
+def similarity_scores(q, c):
+    """
+    Question-vs-control similarity of two segment_features dicts. Each
+    component score is in [0, 1]; ``score`` is their mean. These are
+    screening aids for the examiner, not a conclusion.
+    """
+    def cosine(x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        norm = np.linalg.norm(x) * np.linalg.norm(y)
+        return float(x @ y / norm) if norm > 1e-9 else None
+    
+    def correlation(x, y):
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        return cosine(x - x.mean(), y - y.mean())
+    
+    scores = {}
+    # c0 is overall level, not timbre
+    scores['mfcc_cosine'] = cosine(q['mfcc_mean'][1:], c['mfcc_mean'][1:])
+    scores['spectral_correlation'] = correlation(q['log_mel_mean_db'], c['log_mel_mean_db'])
+    
+    scores['f0_difference_semitones'] = None
+    scores['f0_contour_correlation'] = None
+    if q['f0_mean_hz'] and c['f0_mean_hz']:
+        scores['f0_difference_semitones'] = 12 * float(np.log2(q['f0_mean_hz'] / c['f0_mean_hz']))
+        contours = []
+        for features in (q, c):
+            contour = np.array([np.nan if v is None else v for v in features['f0_contour_hz']])
+            voiced = np.flatnonzero(~np.isnan(contour))
+            if len(voiced) >= 3:
+                # Compare shapes on a common time base, in semitones
+                points = np.linspace(0, len(contour) - 1, FEATURE_CONTOUR_POINTS)
+                contours.append(12 * np.log2(np.interp(points, voiced, contour[voiced])))
+        if len(contours) == 2:
+            scores['f0_contour_correlation'] = correlation(*contours)
+    
+    pairs = [(fq, fc) for fq, fc in zip(q['formants_hz'], c['formants_hz']) if fq and fc]
+    scores['formant_difference_pct'] = 100 * float(np.mean([abs(fq - fc) / fc for fq, fc in pairs])) if pairs else None
+    
+    components = []
+    if scores['mfcc_cosine'] is not None:
+        components.append((1 + scores['mfcc_cosine']) / 2)
+    if scores['spectral_correlation'] is not None:
+        components.append((1 + scores['spectral_correlation']) / 2)
+    if scores['f0_difference_semitones'] is not None:
+        components.append(max(0.0, 1 - abs(scores['f0_difference_semitones']) / 12))
+    if scores['formant_difference_pct'] is not None:
+        components.append(max(0.0, 1 - scores['formant_difference_pct'] / 100))
+    scores['score'] = float(np.mean(components)) if components else None
+    return {name: None if value is None else round(value, 4) for name, value in scores.items()}
+
+def compare_cluewords(jobs, sources, errors=None):
+    """
+    Acoustic features of both sides of every extracted clueword pair and
+    their similarity scores, keyed by pair label like the report.
+    Features are taken from the unfiltered recordings.
+    """
+    errors = errors or [None] * len(jobs)
+    kept = [job for job, error in zip(jobs, errors) if not error]
+    features = {}
+    with timed_span('features') as span:
+        for panel in ('question', 'control'):
+            samples, frame_rate = sources[panel]
+            features[panel] = segment_features(samples, frame_rate, [job[panel] for job in kept])
+            span['samples'] += int(sum(f['duration_ms'] for f in features[panel]) * frame_rate / 1000)
+    return {
+        job['label']: {
+            'question': q,
+            'control': c,
+            'similarity': similarity_scores(q, c)
+        }
+        for job, q, c in zip(kept, features['question'], features['control'])
+    }
+
+def analyse_cluewords(jobs, sources, errors=None):
+    """compare_cluewords when ACOUSTIC_FEATURES is on; None if it is off or fails."""
+    if not ACOUSTIC_FEATURES:
+        return None
+    try:
+        return compare_cluewords(jobs, sources, errors)
     except Exception as e:
-        app.logger.warning(f"Bandpass filter failed: {str(e)}, returning original audio")
-        return audio_segment
+        app.logger.error(f"Acoustic comparison failed: {str(e)}")
+        return None
+
+_search_index_locks = {}
+_search_index_locks_lock = threading.Lock()
+
+def search_index_path(audio_hash):
+    return os.path.join(audio_cache_dir(audio_hash), 'mfcc.npy')
+
+def recording_mfcc(samples, frame_rate):
+    """
+    MFCCs of a whole recording, one row per FEATURE_HOP_MS frame, with the
+    frame constants of the acoustic comparison stage.
+    """
+    frame_len, hop, n_fft, window, _, mel_fb, dct = feature_filters(frame_rate)[:7]
+    count = max(0, (len(samples) - frame_len) // hop + 1)
+    mfcc = np.empty((count, FEATURE_MFCC_COUNT), dtype=np.float32)
+    for first in range(0, count, FEATURE_BATCH_FRAMES):
+        rows = min(FEATURE_BATCH_FRAMES, count - first)
+        block = np.asarray(samples[first * hop:(first + rows - 1) * hop + frame_len], dtype=np.float32) / 32768.0
+        frames = np.lib.stride_tricks.sliding_window_view(block, frame_len)[::hop]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        power = np.abs(scipy_fft.rfft(frames * window, n_fft, workers=-1)) ** 2
+        mfcc[first:first + rows] = (10 * np.log10(power @ mel_fb.T + 1e-10)) @ dct.T
+    return mfcc
+
+def load_search_index(audio_hash):
+    """MFCC frames of a cached standardization, computed and saved on first use."""
+    path = search_index_path(audio_hash)
+    with _search_index_locks_lock:
+        lock = _search_index_locks.setdefault(audio_hash, threading.Lock())
+    with lock:
+        if not os.path.exists(path):
+            with job_trace('search_index'):
+                samples, frame_rate = map_standardized_wav(os.path.join(audio_cache_dir(audio_hash), 'standardized.wav'))
+                with timed_span('search_index', samples=len(samples)) as span:
+                    mfcc = recording_mfcc(samples, frame_rate)
+                    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+                    with open(temp_path, 'wb') as f:
+                        np.save(f, mfcc)
+                    os.replace(temp_path, path)
+                    span['bytes'] = mfcc.nbytes
+    return np.load(path, mmap_mode='r')
+
+def build_search_index(audio_hash):
+    """Background task: build the search index ahead of the first candidate search."""
+    try:
+        load_search_index(audio_hash)
+    except Exception as e:
+        app.logger.error(f"Error building search index for {audio_hash}: {str(e)}")
+
+def schedule_search_index(audio_hash):
+    """Queue the search index of a cached standardization on the spectrogram workers unless it exists."""
+    if not os.path.exists(search_index_path(audio_hash)):
+        _spectrogram_executor.submit(build_search_index, audio_hash)
+
+def unit_rows(frames):
+    return frames / (np.linalg.norm(frames, axis=1, keepdims=True) + 1e-9)
+
+@lru_cache(maxsize=4)
+def search_features(audio_hash):
+    """
+    (fine, coarse) search frames of a recording: MFCCs normalized to zero
+    mean and unit variance over the recording (so channel and level
+    differences cancel), scaled to unit length, and their
+    SEARCH_COARSE_FACTOR-frame averages.
+    """
+    mfcc = np.asarray(load_search_index(audio_hash))
+    fine = unit_rows((mfcc - mfcc.mean(axis=0)) / (mfcc.std(axis=0) + 1e-6)).astype(np.float32)
+    blocks = len(fine) // SEARCH_COARSE_FACTOR
+    coarse = unit_rows(fine[:blocks * SEARCH_COARSE_FACTOR].reshape(blocks, SEARCH_COARSE_FACTOR, -1).mean(axis=1))
+    return fine, coarse.astype(np.float32)
+
+def subsequence_dtw(query, target, penalty=None):
+    """
+    Align the whole query with every stretch of target (rows are unit
+    vectors; the local cost is cosine distance, plus penalty per target
+    frame if given). Steps (1,1), (1,2) and (2,1) keep the slope between
+    1/2 and 2, so each row depends only on the two before it and is
+    computed for all target frames at once.
+    Returns (mean cost, start frame) per target end frame.
+    """
+    n = len(target)
+    pad = np.full(2, np.inf, dtype=np.float32)
+    # Row -1 is free, so alignments may start at any target frame
+    previous2, starts2 = np.zeros(n + 2, dtype=np.float32), np.arange(-1, n + 1)
+    penalty = np.zeros(n, dtype=np.float32) if penalty is None else penalty
+    previous1 = np.concatenate([pad, 1 - target @ query[0] + penalty])
+    starts1 = np.arange(-2, n)
+    for row in query[1:]:
+        cost = 1 - target @ row + penalty
+        diagonal = previous1[1:-1] + cost
+        stretch = previous1[:-2] + cost
+        # Skipping a query frame charges its cost too, so totals sum len(query) costs
+        compress = previous2[1:-1] + 2 * cost
+        best = np.minimum(np.minimum(diagonal, stretch), compress)
+        starts = np.where(best == diagonal, starts1[1:-1], np.where(best == stretch, starts1[:-2], starts2[1:-1]))
+        previous2, starts2 = previous1, starts1
+        previous1 = np.concatenate([pad, best])
+        starts1 = np.concatenate([[-2, -1], starts])
+    return previous1[2:] / len(query), starts1[2:]
+
+def best_alignments(totals, starts, width, count, exclude=None):
+    """
+    End frames of up to count alignments that are local minima of totals
+    within width frames, best first, skipping any that overlap exclude
+    (a (first, last) frame range).
+    """
+    totals = np.where(np.isfinite(totals), totals, np.inf)
+    if exclude is not None:
+        ends = np.arange(len(totals))
+        totals = np.where((starts <= exclude[1]) & (ends >= exclude[0]), np.inf, totals)
+    minima = np.flatnonzero(np.isfinite(totals) & (totals == minimum_filter1d(totals, max(1, width), mode='nearest')))
+    return minima[np.argsort(totals[minima], kind='stable')[:count]]
+
+def silence_penalty(audio_hash, frames, frame_ms, span_ms):
+    """
+    Infinite cost for each of frames (frame_ms apart, span_ms long) that is
+    farther than SEARCH_SPEECH_MARGIN_MS from every speech region, zero
+    elsewhere; None when no speech was detected in the recording at all.
+    """
+    _, regions, _ = load_speech_index(audio_hash)
+    if not len(regions):
+        return None
+    starts = np.arange(frames) * frame_ms - SEARCH_SPEECH_MARGIN_MS
+    following = np.searchsorted(regions[:, 1], starts, side='right')
+    near = (following < len(regions)) & (regions[np.minimum(following, len(regions) - 1), 0] < starts + span_ms + 2 * SEARCH_SPEECH_MARGIN_MS)
+    return np.where(near, 0, np.inf).astype(np.float32)
+
+def search_segment(query, query_coarse, target, target_coarse, limit, exclude=None, coarse_penalty=None):
+    """
+    Best alignments of one query in a target recording as
+    ``[(cost, first_frame, last_frame)]``, best first and not overlapping.
+
+    Coarse hits (with an optional per-frame coarse_penalty) are refined at
+    full resolution in a window around each. The windows are aligned in
+    one pass, joined by two infinite-cost frames that no alignment can
+    cross. Queries too short for the coarse pass are aligned at full
+    resolution.
+    """
+    factor = SEARCH_COARSE_FACTOR
+    length = len(query)
+    hits = []
+    if len(query_coarse) >= 2 and len(target_coarse) >= len(query_coarse):
+        coarse_exclude = None if exclude is None else (exclude[0] // factor, exclude[1] // factor)
+        totals, starts = subsequence_dtw(query_coarse, target_coarse, coarse_penalty)
+        windows = []
+        for end in sorted(best_alignments(totals, starts, len(query_coarse), SEARCH_COARSE_CANDIDATES, coarse_exclude)):
+            lo = max(0, int(starts[end]) * factor - length // 2)
+            hi = min(len(target), (int(end) + 1) * factor + length // 2)
+            if windows and lo <= windows[-1][1]:
+                windows[-1][1] = max(windows[-1][1], hi)
+            else:
+                windows.append([lo, hi])
+        windows = [(lo, hi) for lo, hi in windows if hi - lo >= (length + 1) // 2]
+        if windows:
+            separator = np.zeros((2, target.shape[1]), dtype=target.dtype)
+            joined = np.concatenate([part for lo, hi in windows for part in (target[lo:hi], separator)])
+            penalty = np.concatenate([part for lo, hi in windows
+                                      for part in (np.zeros(hi - lo, dtype=np.float32), np.full(2, np.inf, dtype=np.float32))])
+            fine_totals, fine_starts = subsequence_dtw(query, joined, penalty)
+            offset = 0
+            for lo, hi in windows:
+                window_totals = fine_totals[offset:offset + hi - lo]
+                window_starts = fine_starts[offset:offset + hi - lo] - offset
+                window_exclude = None if exclude is None else (exclude[0] - lo, exclude[1] - lo)
+                for end in best_alignments(window_totals, window_starts, length, SEARCH_COARSE_CANDIDATES, window_exclude):
+                    hits.append((float(window_totals[end]), lo + int(window_starts[end]), lo + int(end)))
+                offset += hi - lo + 2
+    elif len(target) >= (length + 1) // 2:
+        totals, starts = subsequence_dtw(query, target)
+        for end in best_alignments(totals, starts, length, SEARCH_COARSE_CANDIDATES, exclude):
+            hits.append((float(totals[end]), int(starts[end]), int(end)))
+    
+    kept = []
+    for cost, first, last in sorted(hits):
+        overlaps = any(min(last, other_last) - max(first, other_first) + 1 > 0.5 * min(last - first, other_last - other_first) + 0.5
+                       for _, other_first, other_last in kept)
+        if not overlaps:
+            kept.append((cost, first, last))
+        if len(kept) == limit:
+            break
+    return kept
+
+def search_cluewords(source_hash, target_hash, segments, limit=SEARCH_MAX_RESULTS, min_score=SEARCH_MIN_SCORE):
+    """
+    Candidate regions in the target recording for each ``(label, start,
+    end)`` segment (seconds) of the source recording, ranked by score.
+    When both are the same recording the segment itself is excluded.
+    """
+    frame_len, hop = feature_filters(STANDARD_FRAME_RATE)[:2]
+    factor = SEARCH_COARSE_FACTOR
+    source, source_coarse = search_features(source_hash)
+    target, target_coarse = search_features(target_hash)
+    # The coarse pass only considers the target's speech (and its margins)
+    coarse_penalty = silence_penalty(target_hash, len(target_coarse), factor * FEATURE_HOP_MS,
+                                    (factor - 1) * FEATURE_HOP_MS + FEATURE_FRAME_MS)
+    results = []
+    with timed_span('search') as span:
+        for label, start, end in segments:
+            first = min(int(np.ceil(start * STANDARD_FRAME_RATE / hop)), max(len(source) - 1, 0))
+            last = min(max(first, int((end * STANDARD_FRAME_RATE - frame_len) // hop)), len(source) - 1)
+            candidates = []
+            if last >= first:
+                exclude = (first, last) if source_hash == target_hash else None
+                hits = search_segment(source[first:last + 1], source_coarse[-(-first // factor):(last + 1) // factor],
+                                      target, target_coarse, limit, exclude, coarse_penalty)
+                candidates = [
+                    {'start': round(hit_first * hop / STANDARD_FRAME_RATE, 3),
+                     'end': round((hit_last * hop + frame_len) / STANDARD_FRAME_RATE, 3),
+                     'score': round(1 - cost, 4)}
+                    for cost, hit_first, hit_last in hits if 1 - cost >= min_score
+                ]
+                span['samples'] += (last - first + 1) * hop
+            results.append({'label': label, 'start': start, 'end': end, 'candidates': candidates})
+    return results
 
 def format_time_hhmmssms(milliseconds):
     """Convert milliseconds to HH:MM:SS:MS format"""
@@ -0,0 +1,182 @@
+"""
+Headless batch generation of clueword packages.
+
+Builds one ZIP per case, in parallel across CPU cores, using the same
+matching, extraction and report code as the /process route.
+
+Cases come from saved sessions (by id) and/or a directory of JSON
+manifests:
+
+    {
+        "name": "case-42",
+        "question_audio": "recordings/question.mp3",
+        "control_audio": "recordings/control.mp3",
+        "annotations": {"question": [...], "control": [...]},
+        "enable_bandpass": true,
+        "label_match": "exact",
+        "case_info": {"case_number": "42", "police_station": "...", ...}
+    }
+
+Relative audio paths are resolved against the manifest's directory.
+Sessions use the audio they reference in the audio cache when it is still
+stored, and otherwise their recorded paths (relative ones under
+--audio-root).
+
+Usage:
+    python batch_process.py --sessions 3 4 5 --audio-root /evidence --out packages
+    python batch_process.py --manifests manifests/ --workers 8 --out packages
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from app import (
+    app, ForensicSession, LABEL_MATCH, build_clueword_jobs, make_bandpass_settings,
+    standardize_into_cache, lookup_audio_cache, cached_audio_path, map_standardized_wav, write_package,
+    source_fingerprint
+)
+
+
+def session_case(session, audio_root=None):
+    """Turn a saved ForensicSession into a case description."""
+    def audio_path(file_path, filename):
+        path = file_path or filename or ''
+        if audio_root and path and not os.path.isabs(path):
+            path = os.path.join(audio_root, path)
+        return path
+
+    return {
+        'name': f"session_{session.id}_{session.session_name}",
+        'question_audio': audio_path(session.question_file_path, session.question_filename),
+        'control_audio': audio_path(session.control_file_path, session.control_filename),
+        'question_audio_hash': session.question_audio_hash,
+        'control_audio_hash': session.control_audio_hash,
+        'question_filename': session.question_filename,
+        'control_filename': session.control_filename,
+        'annotations': session.get_annotations(),
+        'enable_bandpass': bool(session.bandpass_enabled),
+        'case_info': {
+            'case_number': session.case_number or '',
+            'police_station': session.police_station or '',
+            'district': session.district or '',
+            'cr_adr_number': session.cr_number or '',
+            'speaker_name': session.speaker_name or ''
+        }
+    }
+
+
+def manifest_case(path):
+    """Load a case description from a JSON manifest."""
+    with open(path) as f:
+        case = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for key in ('question_audio', 'control_audio'):
+        case[key] = os.path.join(base_dir, case[key])
+    case.setdefault('name', os.path.splitext(os.path.basename(path))[0])
+    return case
+
+
+def safe_name(name):
+    return "".join(c for c in name if c.isalnum() or c in (' ', '_', '-')).strip() or 'case'
+
+
+def process_case(case, out_dir, extraction_workers=1, label_match=LABEL_MATCH):
+    """Build the package for one case. Returns a result summary."""
+    started = time.perf_counter()
+    result = {'name': case['name'], 'cluewords': 0, 'audio_seconds': 0.0, 'error': None}
+    try:
+        sources = {}
+        fingerprints = {}
+        for panel in ('question', 'control'):
+            # Audio a saved session references is used from the audio cache as is
+            audio_hash = case.get(f'{panel}_audio_hash')
+            if not audio_hash or lookup_audio_cache(audio_hash) is None:
+                audio = case[f'{panel}_audio']
+                if not audio or not os.path.exists(audio):
+                    raise FileNotFoundError(f"{panel} audio not found: {audio or '(none recorded)'}")
+                audio_hash = standardize_into_cache(audio)
+            samples, frame_rate = map_standardized_wav(cached_audio_path(audio_hash))
+            sources[panel] = (samples, frame_rate)
+            fingerprints[panel] = source_fingerprint(samples, frame_rate, audio_hash)
+            result['audio_seconds'] += len(samples) / frame_rate
+
+        annotations = case.get('annotations') or {}
+        jobs = build_clueword_jobs(annotations.get('question', []), annotations.get('control', []),
+                                   label_match=case.get('label_match') or label_match)
+        if not jobs:
+            raise ValueError("No matching annotations found between question and control files.")
+
+        enable_bandpass = case.get('enable_bandpass', True)
+        package_path = os.path.join(out_dir, f"{safe_name(case['name'])}.zip")
+        write_package(
+            package_path, jobs, sources, make_bandpass_settings(enable_bandpass),
+            case.get('question_filename') or os.path.basename(case['question_audio']),
+            case.get('control_filename') or os.path.basename(case['control_audio']),
+            enable_bandpass, case.get('case_info') or {}, max_workers=extraction_workers, fingerprints=fingerprints
+        )
+        result['cluewords'] = len(jobs)
+        result['package'] = package_path
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build clueword packages for many cases without the web UI.")
+    parser.add_argument('--sessions', nargs='*', type=int, default=[], help="ForensicSession ids to process")
+    parser.add_argument('--audio-root', help="Directory used to resolve relative session audio paths")
+    parser.add_argument('--manifests', help="Directory of JSON case manifests")
+    parser.add_argument('--out', default='batch_output', help="Directory for the generated packages")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Cases processed in parallel")
+    parser.add_argument('--label-match', choices=('exact', 'fuzzy'), default=LABEL_MATCH,
+                        help="Label matching for cases whose manifest does not set label_match")
+    args = parser.parse_args(argv)
+
+    cases = []
+    if args.sessions:
+        with app.app_context():
+            for session_id in args.sessions:
+                session = ForensicSession.query.get(session_id)
+                if session is None:
+                    print(f"Session {session_id} not found, skipping", file=sys.stderr)
+                    continue
+                cases.append(session_case(session, args.audio_root))
+    if args.manifests:
+        for filename in sorted(os.listdir(args.manifests)):
+            if filename.endswith('.json'):
+                cases.append(manifest_case(os.path.join(args.manifests, filename)))
+
+    if not cases:
+        parser.error("no cases to process (use --sessions and/or --manifests)")
+
+    os.makedirs(args.out, exist_ok=True)
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(process_case, case, args.out, label_match=args.label_match) for case in cases]
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"FAILED  {result['name']}: {result['error']}")
+            else:
+                print(f"OK      {result['name']}: {result['cluewords']} cluewords in {result['seconds']:.2f}s -> {result['package']}")
+
+    elapsed = time.perf_counter() - started
+    succeeded = [r for r in results if not r['error']]
+    cluewords = sum(r['cluewords'] for r in succeeded)
+    audio_seconds = sum(r['audio_seconds'] for r in succeeded)
+    print()
+    print(f"Cases:      {len(succeeded)} succeeded, {len(results) - len(succeeded)} failed")
+    print(f"Wall time:  {elapsed:.2f}s with {args.workers} workers")
+    print(f"Throughput: {len(succeeded) / elapsed:.2f} cases/s, {cluewords / elapsed:.1f} cluewords/s, "
+          f"{audio_seconds / elapsed:.1f} s of audio/s")
+    return 0 if len(succeeded) == len(results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
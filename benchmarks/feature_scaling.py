@@ -0,0 +1,60 @@
+"""
+Measure how the acoustic comparison stage scales with the number of cluewords.
+
+Runs compare_cluewords over a synthetic speech-like recording pair for
+cases of increasing size and prints one line per size, including the
+throughput in analysed audio seconds per wall-clock second.
+
+Usage:
+    python benchmarks/feature_scaling.py
+    python benchmarks/feature_scaling.py --counts 10 100 500 1000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import compare_cluewords, build_clueword_jobs, map_standardized_wav
+from pipeline import synthesize_recording, synthetic_annotations
+
+
+def best_of(repeat, func, *args):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the acoustic comparison stage against clueword count.")
+    parser.add_argument('--counts', nargs='*', type=int, default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument('--duration', type=float, default=600, help="Seconds of synthetic audio per recording")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the best time is reported")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        question_path = synthesize_recording(os.path.join(tmp, 'question.wav'), args.duration, seed=1)
+        control_path = synthesize_recording(os.path.join(tmp, 'control.wav'), args.duration, seed=2)
+        sources = {'question': map_standardized_wav(question_path), 'control': map_standardized_wav(control_path)}
+
+        # Warm the per-rate filter constants outside the timed runs
+        warmup = synthetic_annotations(1, args.duration)
+        compare_cluewords(build_clueword_jobs(warmup['question'], warmup['control'], tmp), sources)
+
+        print(f"{'cluewords':>10} {'audio s':>9} {'ms':>9} {'ms/clueword':>12} {'x realtime':>11}")
+        for count in args.counts:
+            annotations = synthetic_annotations(count, args.duration)
+            jobs = build_clueword_jobs(annotations['question'], annotations['control'], tmp)
+            audio_seconds = sum(job[panel][1] - job[panel][0] for job in jobs for panel in ('question', 'control')) / 1000
+            seconds = best_of(args.repeat, compare_cluewords, jobs, sources)
+            print(f"{len(jobs):>10} {audio_seconds:>9.1f} {seconds * 1000:>9.1f} "
+                  f"{seconds * 1000 / max(len(jobs), 1):>12.2f} {audio_seconds / seconds:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+"""
+Benchmark the clueword pipeline on synthetic cases.
+
+Each case is a pair of synthetic question/control recordings (configurable
+length, sample rate, channel count and file format) with N matching
+annotations. A case is run in one or both modes:
+
+- ``http``: through the Flask test client (/standardize twice, then /process),
+  timing each request.
+- ``direct``: calling the pipeline functions, timing each phase
+  (standardize, extract, bandpass, report, zip).
+
+Every run happens in a fresh child process inside a scratch directory, so
+caches start cold and peak RSS belongs to that run alone. Results (wall time,
+peak RSS, per-phase seconds) are written to a JSON file; pass an earlier file
+with ``--compare`` to print the change per phase.
+
+Usage:
+    python benchmarks/pipeline.py --duration 60 600 --cluewords 20 200 --output results.json
+    python benchmarks/pipeline.py --format mp3 --channels 2 --rate 48000 --compare baseline.json
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import zipfile
+import argparse
+import platform
+import resource
+import tempfile
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def synthesize_recording(path, duration, frame_rate=44100, channels=1, audio_format='wav', seed=0):
+    """Write a speech-like test recording: harmonic tones in noise with pauses."""
+    rng = np.random.default_rng(seed)
+    frames = int(duration * frame_rate)
+    t = np.arange(frames) / frame_rate
+    pitch = 120 + 40 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / frame_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = (np.sin(2 * np.pi * 1.5 * t) > -0.3).astype(np.float64)
+    signal = 0.3 * voiced * envelope + 0.02 * rng.standard_normal(frames)
+    samples = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    samples = np.repeat(samples[:, None], channels, axis=1).ravel()
+
+    from pydub import AudioSegment
+    audio = AudioSegment(samples.tobytes(), frame_rate=frame_rate, sample_width=2, channels=channels)
+    audio.export(path, format=audio_format)
+    return path
+
+
+def synthetic_annotations(count, duration, seed=0):
+    """count matching question/control annotations spread over the recording."""
+    rng = np.random.default_rng(seed)
+    slot = duration / max(count, 1)
+    annotations = {'question': [], 'control': []}
+    for i in range(count):
+        for panel in ('question', 'control'):
+            length = min(slot * 0.8, rng.uniform(0.25, 0.9))
+            start = i * slot + rng.uniform(0, max(slot - length, 0))
+            annotations[panel].append({'label': f"clueword {i}", 'start': round(start, 3), 'end': round(start + length, 3)})
+    return annotations
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and its finished children (MiB)."""
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    usage = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return usage * 1024 / scale / 1024
+
+
+class PhaseTimer:
+    """Records seconds and the peak RSS reached by the end of each named phase."""
+
+    def __init__(self):
+        self.phases = {}
+        self.rss = {}
+
+    def run(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+        self.rss[name] = round(peak_rss_mb(), 1)
+        return result
+
+
+def run_http(app_module, case, question_path, control_path, annotations, timer):
+    """Drive the pipeline the way the browser does."""
+    client = app_module.app.test_client()
+    for panel, path in (('question', question_path), ('control', control_path)):
+        with open(path, 'rb') as f:
+            response = timer.run(f"standardize_{panel}", client.post, '/standardize', data={
+                'type': panel, 'audio_file': (f, os.path.basename(path))
+            }, content_type='multipart/form-data')
+        if response.status_code != 200:
+            raise RuntimeError(f"/standardize failed: {response.get_json()}")
+
+    form = {
+        'annotations': json.dumps(annotations),
+        'question_original_filename': os.path.basename(question_path),
+        'control_original_filename': os.path.basename(control_path),
+        'enable_bandpass': str(case['bandpass']).lower(),
+        'stream_package': str(case['stream']).lower(),
+        'case_number': 'BENCH-1'
+    }
+    response = timer.run('process', client.post, '/process', data=form)
+    if response.status_code != 200:
+        raise RuntimeError(f"/process failed: {response.get_data(as_text=True)[:200]}")
+    return len(response.get_data())
+
+
+def run_direct(app_module, case, question_path, control_path, annotations, timer):
+    """Call the pipeline stages directly, one timed phase each."""
+    sources = {}
+    for panel, path in (('question', question_path), ('control', control_path)):
+        standardized = f"{path}.standardized.wav"
+        timer.run('standardize', app_module.standardize_to_wav, path, standardized)
+        sources[panel] = app_module.map_standardized_wav(standardized)
+
+    jobs = app_module.build_clueword_jobs(annotations['question'], annotations['control'])
+
+    def extract():
+        files = []
+        for indices, _, group_files in app_module.iter_extraction_groups(jobs, sources, None):
+            arc_dir = os.path.basename(jobs[indices[0]]['dir'])
+            files += [(f"{arc_dir}/{name}", data) for name, data in group_files]
+        return files
+    files = timer.run('extract', extract)
+
+    if case['bandpass']:
+        bandpass = app_module.make_bandpass_settings(True)
+
+        def filter_all():
+            filtered = []
+            for job in jobs:
+                arc_dir = os.path.basename(job['dir'])
+                for panel, (samples, frame_rate) in sources.items():
+                    seg = app_module.slice_pcm(samples, frame_rate, *job[panel])
+                    seg_bpf = app_module.apply_bandpass_filter(app_module.pcm_to_segment(seg, frame_rate), **bandpass)
+                    buffer = io.BytesIO()
+                    seg_bpf.export(buffer, format='wav')
+                    filtered.append((f"{arc_dir}/bpf_{panel}.wav", buffer.getvalue()))
+            return filtered
+        files += timer.run('bandpass', filter_all)
+
+    report_data, _ = app_module.collect_extraction_results(jobs, [None] * len(jobs))
+    report_args = (report_data, os.path.basename(question_path), os.path.basename(control_path),
+                   len(jobs), case['bandpass'], {'case_number': 'BENCH-1'})
+    files.append(timer.run('report', app_module.build_report, *report_args))
+    if app_module.REPORT_SIDECARS:
+        files += timer.run('report', app_module.build_report_sidecars, *report_args)
+
+    def write_zip():
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w') as zipf:
+            for name, data in files:
+                zipf.writestr(name, data, compress_type=app_module.zip_compression_for(name))
+        return buffer.getbuffer().nbytes
+    return timer.run('zip', write_zip)
+
+
+def run_case(case, mode):
+    """Run one benchmark in the current process (called in a fresh child)."""
+    workdir = tempfile.mkdtemp(prefix='clueword-bench-')
+    try:
+        os.chdir(workdir)
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        if mode == 'direct':
+            # Measure rendering itself, not the clueword artifact cache
+            os.environ['CLUEWORD_CACHE_MAX_BYTES'] = '0'
+        sys.path.insert(0, REPO_ROOT)
+        import app as app_module
+
+        question_path = synthesize_recording(os.path.join(workdir, f"question.{case['format']}"), case['duration'],
+                                             case['rate'], case['channels'], case['format'], seed=1)
+        control_path = synthesize_recording(os.path.join(workdir, f"control.{case['format']}"), case['duration'],
+                                            case['rate'], case['channels'], case['format'], seed=2)
+        annotations = synthetic_annotations(case['cluewords'], case['duration'])
+        baseline_rss = peak_rss_mb()
+
+        timer = PhaseTimer()
+        started = time.perf_counter()
+        runner = run_http if mode == 'http' else run_direct
+        package_bytes = runner(app_module, case, question_path, control_path, annotations, timer)
+        wall = time.perf_counter() - started
+
+        return {
+            'case': case,
+            'mode': mode,
+            'wall_seconds': round(wall, 4),
+            'phases': {name: round(seconds, 4) for name, seconds in timer.phases.items()},
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'peak_rss_mb_before_run': round(baseline_rss, 1),
+            'phase_peak_rss_mb': timer.rss,
+            'package_bytes': package_bytes,
+            'audio_seconds_per_wall_second': round(2 * case['duration'] / wall, 2) if wall else None
+        }
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_isolated(case, mode):
+    """Run a benchmark in a child process and return its result."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', json.dumps({'case': case, 'mode': mode})],
+        capture_output=True, text=True
+    )
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"benchmark worker failed:\n{completed.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def case_key(result):
+    case = result['case']
+    return (result['mode'], case['format'], case['duration'], case['rate'], case['channels'],
+            case['cluewords'], case['bandpass'], case['stream'])
+
+
+def print_comparison(results, baseline):
+    """Print per-phase ratios of these results against a previous results file."""
+    previous = {case_key(result): result for result in baseline['results']}
+    print()
+    print(f"Compared with {baseline['meta'].get('git_commit') or 'baseline'} ({baseline['meta'].get('created_at')}):")
+    for result in results:
+        old = previous.get(case_key(result))
+        if not old:
+            continue
+        case = result['case']
+        print(f"  {result['mode']:6} {case['format']} {case['duration']}s x{case['cluewords']}: "
+              f"wall {result['wall_seconds'] / old['wall_seconds']:.2f}x, "
+              f"rss {result['peak_rss_mb'] / old['peak_rss_mb']:.2f}x")
+        for phase, seconds in result['phases'].items():
+            if old['phases'].get(phase):
+                print(f"      {phase:22} {old['phases'][phase]:9.4f}s -> {seconds:9.4f}s  ({seconds / old['phases'][phase]:.2f}x)")
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the clueword pipeline on synthetic cases.")
+    parser.add_argument('--duration', nargs='*', type=float, default=[60.0], help="Recording length(s) in seconds")
+    parser.add_argument('--cluewords', nargs='*', type=int, default=[20], help="Matching annotation count(s)")
+    parser.add_argument('--format', default='wav', help="Container of the synthetic uploads (wav, flac, mp3, ...)")
+    parser.add_argument('--rate', type=int, default=48000, help="Sample rate of the synthetic uploads")
+    parser.add_argument('--channels', type=int, default=2, help="Channel count of the synthetic uploads")
+    parser.add_argument('--no-bandpass', action='store_true', help="Skip bandpass filtering")
+    parser.add_argument('--stream', action='store_true', help="Use the streamed ZIP in http mode")
+    parser.add_argument('--mode', choices=['http', 'direct', 'both'], default='both')
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per case (each in a fresh process)")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        spec = json.loads(args.worker)
+        print(json.dumps(run_case(spec['case'], spec['mode'])))
+        return 0
+
+    modes = ['http', 'direct'] if args.mode == 'both' else [args.mode]
+    results = []
+    for duration in args.duration:
+        for cluewords in args.cluewords:
+            case = {
+                'format': args.format, 'duration': duration, 'rate': args.rate, 'channels': args.channels,
+                'cluewords': cluewords, 'bandpass': not args.no_bandpass, 'stream': args.stream
+            }
+            for mode in modes:
+                for repeat in range(args.repeat):
+                    result = run_isolated(case, mode)
+                    result['repeat'] = repeat
+                    results.append(result)
+                    phases = ', '.join(f"{name} {seconds:.3f}s" for name, seconds in result['phases'].items())
+                    print(f"{mode:6} {args.format} {duration:g}s x{cluewords}: {result['wall_seconds']:.3f}s, "
+                          f"peak RSS {result['peak_rss_mb']:.0f} MiB [{phases}]")
+
+    output = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
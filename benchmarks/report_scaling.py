@@ -0,0 +1,67 @@
+"""
+Measure how report generation time scales with the number of cluewords.
+
+Times the DOCX report and the CSV/JSON sidecars for synthetic cases of
+increasing size and prints one line per size.
+
+Usage:
+    python benchmarks/report_scaling.py
+    python benchmarks/report_scaling.py --counts 10 100 1000 5000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import build_report, build_report_sidecars
+
+CASE_INFO = {
+    'case_number': '42/2024',
+    'police_station': 'Central',
+    'district': 'District',
+    'cr_adr_number': 'CR-42',
+    'speaker_name': 'Speaker'
+}
+
+
+def synthetic_report_data(count):
+    """report_data rows for count matched cluewords."""
+    data = []
+    for i in range(count):
+        data.append(["Question", f"clueword {i}", 1000.0 * i, 1000.0 * i + 450, 450.0])
+        data.append(["Control", f"clueword {i}", 1500.0 * i, 1500.0 * i + 380, 380.0])
+    return data
+
+
+def best_of(repeat, func, *args):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report generation against clueword count.")
+    parser.add_argument('--counts', nargs='*', type=int, default=[10, 50, 100, 500, 1000, 2000])
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size; the best time is reported")
+    args = parser.parse_args(argv)
+
+    # Build the cached template outside the timed runs
+    build_report([], 'question.wav', 'control.wav', 0, True, CASE_INFO)
+
+    print(f"{'cluewords':>10} {'docx ms':>10} {'sidecars ms':>12} {'us/clueword':>12}")
+    for count in args.counts:
+        data = synthetic_report_data(count)
+        report_args = (data, 'question.wav', 'control.wav', count, True, CASE_INFO)
+        docx_seconds = best_of(args.repeat, build_report, *report_args)
+        sidecar_seconds = best_of(args.repeat, build_report_sidecars, *report_args)
+        per_clueword = (docx_seconds + sidecar_seconds) / max(count, 1) * 1e6
+        print(f"{count:>10} {docx_seconds * 1000:>10.1f} {sidecar_seconds * 1000:>12.1f} {per_clueword:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,7 @@ echo "FFmpeg found"
 
 echo
 echo "Installing Python dependencies..."
-pip3 install Flask==2.3.3 Flask-SQLAlchemy==3.1.1 pydub==0.25.1 python-docx==0.8.11
+pip3 install Flask==2.3.3 Flask-SQLAlchemy==3.1.1 pydub==0.25.1 python-docx==0.8.11 numpy scipy
 
 echo
 echo "Starting application..."
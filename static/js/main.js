@@ -5,6 +5,8 @@ let questionAnnotations = [];
 let controlAnnotations = [];
 let questionOriginalFilename = '';
 let controlOriginalFilename = '';
+// Audio cache keys of the loaded files, saved with sessions so they can be reopened
+let audioHashes = { question: null, control: null };
 let currentModal = null;
 let pendingRegion = null;
 let pendingPanelType = null;
@@ -20,6 +22,8 @@ let controlZoomSlider = null;
 // Session management variables
 let currentSessionId = null;
 let currentSessionName = '';
+let currentSessionVersion = null;
+let sessionSaveChain = Promise.resolve();
 let availableSessions = [];
 
 // Zoom tracking
@@ -178,6 +182,9 @@ function handleWheelZoom(e, type) {
             wavesurfer.drawBuffer();
         }
         
+        // Fetch peaks matching the new resolution
+        schedulePeaksRefresh(type);
+        
         // Update status to show zoom level
         updateStatus(`${type.charAt(0).toUpperCase() + type.slice(1)} zoom: ${newZoomLevel.toFixed(1)}x`);
         
@@ -315,6 +322,9 @@ function applyZoom(type, zoomLevel) {
             wavesurfer.drawBuffer();
         }
         
+        // Fetch peaks matching the new resolution
+        schedulePeaksRefresh(type);
+        
         // Update status to show zoom level
         updateStatus(`${type.charAt(0).toUpperCase() + type.slice(1)} zoom: ${zoomLevel.toFixed(1)}x`);
         
@@ -324,16 +334,369 @@ function applyZoom(type, zoomLevel) {
     }
 }
 
+// Precomputed waveform peaks (served by /peaks) instead of decoding audio in the browser.
+// Only the visible window, plus a margin on each side, is fetched at the drawn
+// resolution; the rest of the file is filled in from a coarse overview.
+const PEAKS_OVERVIEW_BINS = 2000;
+const PEAKS_MAX_BINS = 1 << 21; // Same cap as the server
+const PEAKS_WINDOW_MARGIN = 1; // Visible widths fetched on either side
+const peaksRefreshTimers = {};
+const peaksStates = {};
+
+async function fetchPeaks(panelType, params) {
+    const query = new URLSearchParams(Object.assign({ format: 'int16' }, params));
+    const response = await fetch(`/peaks/${panelType}?${query}`);
+    if (!response.ok) {
+        return null;
+    }
+    
+    const raw = new Int16Array(await response.arrayBuffer());
+    const peaks = new Float32Array(raw.length);
+    for (let i = 0; i < raw.length; i++) {
+        peaks[i] = raw[i] / 32768;
+    }
+    const header = name => parseFloat(response.headers.get(`X-Peaks-${name}`));
+    return {
+        peaks: peaks,
+        duration: header('Duration'),
+        start: header('Start'),
+        end: header('End')
+    };
+}
+
+function fillPeaks(target, source, pxPerSec) {
+    // Resample (max, min) pairs covering source.start..source.end into the
+    // target's bins of 1/pxPerSec seconds, keeping the extremes of each bin
+    const bins = target.length / 2;
+    const sourceBins = source.peaks.length / 2;
+    const offset = source.start * pxPerSec;
+    const scale = sourceBins / Math.max(1, (source.end - source.start) * pxPerSec);
+    const first = Math.max(0, Math.floor(offset));
+    const last = Math.min(bins, Math.ceil(source.end * pxPerSec));
+    for (let bin = first; bin < last; bin++) {
+        const from = Math.min(sourceBins - 1, Math.max(0, Math.floor((bin - offset) * scale)));
+        const to = Math.min(sourceBins, Math.max(from + 1, Math.floor((bin + 1 - offset) * scale)));
+        let max = source.peaks[from * 2];
+        let min = source.peaks[from * 2 + 1];
+        for (let i = from + 1; i < to; i++) {
+            max = Math.max(max, source.peaks[i * 2]);
+            min = Math.min(min, source.peaks[i * 2 + 1]);
+        }
+        target[bin * 2] = max;
+        target[bin * 2 + 1] = min;
+    }
+}
+
+async function refreshPeaks(panelType) {
+    // Only waveforms rendered from server peaks need refreshing
+    const state = peaksStates[panelType];
+    const wrapper = state && state.wavesurfer.drawer && state.wavesurfer.drawer.wrapper;
+    if (!wrapper) return;
+    
+    // Visible window and the resolution it is drawn at
+    const duration = state.overview.duration;
+    const scrollWidth = Math.max(wrapper.scrollWidth, wrapper.clientWidth);
+    const start = wrapper.scrollLeft / scrollWidth * duration;
+    const end = (wrapper.scrollLeft + wrapper.clientWidth) / scrollWidth * duration;
+    const pxPerSec = Math.min(scrollWidth * (window.devicePixelRatio || 1) / duration, PEAKS_MAX_BINS / duration);
+    
+    const loaded = state.detail;
+    if (loaded && loaded.pxPerSec === pxPerSec && loaded.start <= start && loaded.end >= Math.min(end, duration - 1e-6)) {
+        return;
+    }
+    
+    const margin = (end - start) * PEAKS_WINDOW_MARGIN;
+    const request = ++state.requests;
+    const detail = await fetchPeaks(panelType, {
+        start: Math.max(0, start - margin),
+        end: Math.min(duration, end + margin),
+        px_per_sec: pxPerSec
+    });
+    // Superseded by a newer refresh or upload
+    if (!detail || peaksStates[panelType] !== state || state.requests !== request) return;
+    detail.pxPerSec = pxPerSec;
+    state.detail = detail;
+    
+    const peaks = new Float32Array(Math.ceil(duration * pxPerSec) * 2);
+    fillPeaks(peaks, state.overview, pxPerSec);
+    fillPeaks(peaks, detail, pxPerSec);
+    state.wavesurfer.backend.setPeaks(peaks, duration);
+    state.wavesurfer.drawBuffer();
+}
+
+function schedulePeaksRefresh(panelType) {
+    clearTimeout(peaksRefreshTimers[panelType]);
+    peaksRefreshTimers[panelType] = setTimeout(() => {
+        refreshPeaks(panelType).catch(error => console.warn('Peaks refresh failed:', error));
+    }, 250);
+}
+
+// Speech regions and word boundaries of each recording (served by /speech)
+const speechIndexes = {};
+const SPEECH_SNAP_SECONDS = 0.1;
+
+async function loadSpeechIndex(panelType) {
+    speechIndexes[panelType] = null;
+    const response = await fetch(`/speech/${panelType}`);
+    if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+    }
+    speechIndexes[panelType] = await response.json();
+}
+
+function snapToSpeech(panelType, time, edge) {
+    // Nearest word onset (edge 'start') or offset (edge 'end') within SPEECH_SNAP_SECONDS
+    const index = speechIndexes[panelType];
+    if (!index) return time;
+    let snapped = time;
+    let distance = SPEECH_SNAP_SECONDS;
+    index.words.forEach(word => {
+        if (Math.abs(word[edge] - time) < distance) {
+            distance = Math.abs(word[edge] - time);
+            snapped = word[edge];
+        }
+    });
+    return snapped;
+}
+
+function snapPendingRegion(region, panelType) {
+    // Only fresh selections snap; named and suggested regions keep their bounds
+    if (!pendingRegions[panelType].includes(region) || region.suggestedLabel) return;
+    const start = snapToSpeech(panelType, region.start, 'start');
+    const end = snapToSpeech(panelType, region.end, 'end');
+    if (end - start >= 0.1 && (start !== region.start || end !== region.end)) {
+        region.update({ start, end });
+    }
+}
+
+function jumpToSpeech(panelType, direction) {
+    // Seek to the next (direction 1) or previous (-1) speech region, skipping silence
+    const index = speechIndexes[panelType];
+    const wavesurfer = panelType === 'question' ? questionWaveSurfer : controlWaveSurfer;
+    if (!index || !wavesurfer) return;
+    const now = wavesurfer.getCurrentTime();
+    const target = direction > 0
+        ? index.regions.find(region => region.start > now + 0.01)
+        : [...index.regions].reverse().find(region => region.start < now - 0.01);
+    if (target) {
+        wavesurfer.setTime(target.start);
+        lastClickedTime[panelType] = target.start;
+    }
+}
+
+// Spectrogram under each waveform, drawn from server-side tiles (served by /spectrogram)
+const spectrograms = {};
+const SPECTROGRAM_TILE_CACHE_LIMIT = 256;
+const spectrogramPalette = buildSpectrogramPalette();
+
+window.addEventListener('resize', () => {
+    Object.keys(spectrograms).forEach(scheduleSpectrogramDraw);
+});
+
+function buildSpectrogramPalette() {
+    // Black -> purple -> red -> orange -> pale yellow, one RGBA entry per level
+    const stops = [
+        [0, [0, 0, 4]],
+        [0.35, [81, 18, 124]],
+        [0.65, [231, 82, 99]],
+        [0.85, [253, 162, 69]],
+        [1, [252, 253, 191]]
+    ];
+    const palette = new Uint8ClampedArray(256 * 4);
+    for (let i = 0; i < 256; i++) {
+        const t = i / 255;
+        let k = 1;
+        while (k < stops.length - 1 && stops[k][0] < t) k++;
+        const [t0, c0] = stops[k - 1];
+        const [t1, c1] = stops[k];
+        const f = (t - t0) / (t1 - t0);
+        for (let j = 0; j < 3; j++) {
+            palette[i * 4 + j] = c0[j] + f * (c1[j] - c0[j]);
+        }
+        palette[i * 4 + 3] = 255;
+    }
+    return palette;
+}
+
+async function initializeSpectrogram(panelType, wavesurfer) {
+    const container = document.getElementById(`${panelType}-waveform`);
+    let canvas = document.getElementById(`${panelType}-spectrogram`);
+    if (!canvas) {
+        canvas = document.createElement('canvas');
+        canvas.id = `${panelType}-spectrogram`;
+        canvas.className = 'spectrogram-canvas';
+        container.insertAdjacentElement('afterend', canvas);
+    }
+    canvas.classList.remove('unavailable');
+    canvas.classList.add('pending');
+    
+    const state = { panelType, wavesurfer, canvas, info: null, tiles: new Map(), pending: new Set(), frame: null };
+    spectrograms[panelType] = state;
+    
+    // The background worker may still be building the tiles
+    let info = null;
+    while (spectrograms[panelType] === state) {
+        const response = await fetch(`/spectrogram/${panelType}`);
+        if (response.status === 202) {
+            await new Promise(resolve => setTimeout(resolve, 1000));
+            continue;
+        }
+        if (response.ok) {
+            info = await response.json();
+        }
+        break;
+    }
+    // Superseded by a newer upload to the same panel
+    if (spectrograms[panelType] !== state) return;
+    
+    canvas.classList.remove('pending');
+    if (!info) {
+        canvas.classList.add('unavailable');
+        return;
+    }
+    state.info = info;
+    
+    const redraw = () => scheduleSpectrogramDraw(panelType);
+    wavesurfer.on('scroll', redraw);
+    wavesurfer.on('zoom', redraw);
+    wavesurfer.on('redraw', redraw);
+    redraw();
+}
+
+function scheduleSpectrogramDraw(panelType) {
+    const state = spectrograms[panelType];
+    if (!state || !state.info || state.frame) return;
+    state.frame = requestAnimationFrame(() => {
+        state.frame = null;
+        drawSpectrogram(state);
+    });
+}
+
+function getSpectrogramTile(state, level, tile) {
+    const key = `${level}/${tile}`;
+    const image = state.tiles.get(key);
+    if (image) {
+        // Most recently used tiles stay at the end of the map
+        state.tiles.delete(key);
+        state.tiles.set(key, image);
+        return image;
+    }
+    if (!state.pending.has(key)) {
+        state.pending.add(key);
+        loadSpectrogramTile(state, level, tile, key);
+    }
+    return null;
+}
+
+async function loadSpectrogramTile(state, level, tile, key) {
+    try {
+        const url = state.info.tile_url.replace('{level}', level).replace('{tile}', tile);
+        const response = await fetch(url);
+        if (!response.ok) return;
+        
+        const values = new Uint8Array(await response.arrayBuffer());
+        const rows = state.info.rows;
+        const columns = values.length / rows;
+        const canvas = document.createElement('canvas');
+        canvas.width = columns;
+        canvas.height = rows;
+        const context = canvas.getContext('2d');
+        const imageData = context.createImageData(columns, rows);
+        // Column-major values, lowest band first -> image rows, lowest band at the bottom
+        for (let x = 0; x < columns; x++) {
+            for (let row = 0; row < rows; row++) {
+                const color = values[x * rows + row] * 4;
+                const pixel = ((rows - 1 - row) * columns + x) * 4;
+                imageData.data[pixel] = spectrogramPalette[color];
+                imageData.data[pixel + 1] = spectrogramPalette[color + 1];
+                imageData.data[pixel + 2] = spectrogramPalette[color + 2];
+                imageData.data[pixel + 3] = 255;
+            }
+        }
+        context.putImageData(imageData, 0, 0);
+        
+        state.tiles.set(key, canvas);
+        while (state.tiles.size > SPECTROGRAM_TILE_CACHE_LIMIT) {
+            state.tiles.delete(state.tiles.keys().next().value);
+        }
+        scheduleSpectrogramDraw(state.panelType);
+    } catch (error) {
+        console.warn('Spectrogram tile failed:', error);
+    } finally {
+        state.pending.delete(key);
+    }
+}
+
+function drawSpectrogram(state) {
+    const { wavesurfer, canvas, info } = state;
+    const wrapper = wavesurfer.drawer && wavesurfer.drawer.wrapper;
+    if (!wrapper) return;
+    
+    // Match the canvas to the visible part of the waveform
+    const ratio = window.devicePixelRatio || 1;
+    const width = Math.max(1, Math.round(wrapper.clientWidth * ratio));
+    const height = Math.max(1, Math.round(canvas.clientHeight * ratio));
+    if (canvas.width !== width || canvas.height !== height) {
+        canvas.width = width;
+        canvas.height = height;
+    }
+    const scrollWidth = Math.max(wrapper.scrollWidth, wrapper.clientWidth);
+    const start = wrapper.scrollLeft / scrollWidth * info.duration;
+    const end = (wrapper.scrollLeft + wrapper.clientWidth) / scrollWidth * info.duration;
+    const secondsPerPixel = Math.max((end - start) / width, 1e-9);
+    
+    // Coarsest level that still has at least one column per pixel
+    let level = 0;
+    while (level + 1 < info.levels.length && info.levels[level + 1].seconds_per_column <= secondsPerPixel) {
+        level++;
+    }
+    
+    const context = canvas.getContext('2d');
+    context.fillStyle = 'rgb(0, 0, 4)';
+    context.fillRect(0, 0, width, height);
+    
+    const drawTile = (image, drawLevel, tile) => {
+        const secondsPerColumn = info.levels[drawLevel].seconds_per_column;
+        const x = (tile * info.tile_columns * secondsPerColumn - start) / secondsPerPixel;
+        context.drawImage(image, x, 0, image.width * secondsPerColumn / secondsPerPixel, height);
+    };
+    
+    const tileSeconds = info.levels[level].seconds_per_column * info.tile_columns;
+    const firstTile = Math.max(0, Math.floor(start / tileSeconds));
+    const lastTile = Math.min(info.levels[level].tiles - 1, Math.floor(end / tileSeconds));
+    const ready = [];
+    for (let tile = firstTile; tile <= lastTile; tile++) {
+        const image = getSpectrogramTile(state, level, tile);
+        if (image) {
+            ready.push([image, tile]);
+            continue;
+        }
+        // Stretch an already loaded coarser tile until this one arrives
+        for (let coarser = level + 1; coarser < info.levels.length; coarser++) {
+            const coarseSeconds = info.levels[coarser].seconds_per_column * info.tile_columns;
+            const coarseTile = Math.floor(tile * tileSeconds / coarseSeconds);
+            const fallback = state.tiles.get(`${coarser}/${coarseTile}`);
+            if (fallback) {
+                drawTile(fallback, coarser, coarseTile);
+                break;
+            }
+        }
+    }
+    ready.forEach(([image, tile]) => drawTile(image, level, tile));
+}
+
 function setupControlButtons() {
     // Question controls
     document.getElementById('q-play-pause').addEventListener('click', () => togglePlayPause('question'));
     document.getElementById('q-stop').addEventListener('click', () => stopWaveform('question'));
     document.getElementById('q-name-segment').addEventListener('click', () => handleNameSegmentClick('question'));
+    document.getElementById('q-find-matches').addEventListener('click', () => findMatches('question'));
     
     // Control controls
     document.getElementById('c-play-pause').addEventListener('click', () => togglePlayPause('control'));
     document.getElementById('c-stop').addEventListener('click', () => stopWaveform('control'));
     document.getElementById('c-name-segment').addEventListener('click', () => handleNameSegmentClick('control'));
+    document.getElementById('c-find-matches').addEventListener('click', () => findMatches('control'));
 }
 
 function setupModalListeners() {
@@ -396,6 +759,7 @@ async function handleFileUpload(event, panelType) {
         } else {
             controlOriginalFilename = result.original_filename;
         }
+        audioHashes[panelType] = result.audio_hash;
         
         // Initialize waveform
         await initializeWaveform(panelType, result.url);
@@ -433,9 +797,15 @@ async function initializeWaveform(panelType, audioUrl) {
     // Clear existing waveform
     container.innerHTML = '';
     
+    // Render from server-side peaks when available; the audio element then
+    // streams the file through Range requests instead of decoding it up front
+    peaksStates[panelType] = null;
+    const overview = await fetchPeaks(panelType, { pixels: PEAKS_OVERVIEW_BINS }).catch(() => null);
+    
     // Create new WaveSurfer instance
     const wavesurfer = WaveSurfer.create({
         container: `#${containerId}`,
+        backend: overview ? 'MediaElement' : 'WebAudio',
         waveColor: getComputedStyle(document.documentElement).getPropertyValue('--waveform-color'),
         progressColor: getComputedStyle(document.documentElement).getPropertyValue('--waveform-progress-color'),
         cursorColor: '#ffffff',
@@ -462,6 +832,9 @@ async function initializeWaveform(panelType, audioUrl) {
     } else {
         controlWaveSurfer = wavesurfer;
     }
+    if (overview) {
+        peaksStates[panelType] = { wavesurfer: wavesurfer, overview: overview, detail: null, requests: 0 };
+    }
 
     // Helper to update timestamp display
     function updateTimestamp(current, duration) {
@@ -473,8 +846,9 @@ async function initializeWaveform(panelType, audioUrl) {
 
     // Load audio
     await new Promise((resolve, reject) => {
-        wavesurfer.load(audioUrl);
-        wavesurfer.on('ready', () => {
+        // Drawn from peaks, the waveform is ready before any audio arrives
+        // ('waveform-ready' fires inside load, so listen first)
+        wavesurfer.once(overview ? 'waveform-ready' : 'ready', () => {
             // After waveform is ready, restore any saved annotations
             setTimeout(() => {
                 if (panelType === 'question' && questionAnnotations.length > 0) {
@@ -489,6 +863,7 @@ async function initializeWaveform(panelType, audioUrl) {
             
             // Create zoom slider for this waveform
             createZoomSlider(panelType);
+            document.getElementById(`${panelType === 'question' ? 'q' : 'c'}-find-matches`).disabled = false;
             
             // Ensure zoom handlers are properly set up (keep for backward compatibility)
             const container = document.getElementById(containerId);
@@ -499,7 +874,23 @@ async function initializeWaveform(panelType, audioUrl) {
             resolve();
         });
         wavesurfer.on('error', reject);
+        if (overview) {
+            wavesurfer.load(audioUrl, overview.peaks, 'metadata', overview.duration);
+        } else {
+            wavesurfer.load(audioUrl);
+        }
     });
+    
+    // Sharpen the overview to the visible window, then follow zoom and scroll
+    if (overview) {
+        wavesurfer.on('zoom', () => schedulePeaksRefresh(panelType));
+        wavesurfer.on('scroll', () => schedulePeaksRefresh(panelType));
+        schedulePeaksRefresh(panelType);
+    }
+    
+    // Spectrogram tiles load in the background; the waveform is usable meanwhile
+    initializeSpectrogram(panelType, wavesurfer).catch(error => console.warn('Spectrogram unavailable:', error));
+    loadSpeechIndex(panelType).catch(error => console.warn('Speech index unavailable:', error));
 
     // Update timestamp as audio plays or is seeked
     wavesurfer.on('audioprocess', () => {
@@ -550,6 +941,7 @@ async function initializeWaveform(panelType, audioUrl) {
         handleRegionUpdate(region, panelType);
     });
     wavesurfer.on('region-update-end', (region) => {
+        snapPendingRegion(region, panelType);
         handleRegionUpdate(region, panelType);
     });
     
@@ -584,7 +976,7 @@ function handleRegionCreated(region, panelType) {
     updateStatus(`${panelType.charAt(0).toUpperCase() + panelType.slice(1)} segment selected - Click "Name Segment" to label it`);
 }
 
-function showAnnotationModal(start, end, title = 'Add Clueword Annotation') {
+function showAnnotationModal(start, end, title = 'Add Clueword Annotation', label = '') {
     const modal = document.getElementById('annotation-modal');
     const modalTitle = modal.querySelector('h3');
     const timeDisplay = document.getElementById('annotation-time-display');
@@ -592,7 +984,7 @@ function showAnnotationModal(start, end, title = 'Add Clueword Annotation') {
     
     modalTitle.textContent = title;
     timeDisplay.textContent = `${formatTime(start)} - ${formatTime(end)} (${formatDuration(end - start)})`;
-    labelInput.value = '';
+    labelInput.value = label;
     
     modal.style.display = 'block';
     labelInput.focus();
@@ -619,7 +1011,65 @@ function handleNameSegmentClick(panelType) {
         modalTitle = `Add Clueword Annotation (${regions.length} segments pending)`;
     }
     
-    showAnnotationModal(region.start, region.end, modalTitle);
+    showAnnotationModal(region.start, region.end, modalTitle, region.suggestedLabel || '');
+}
+
+async function findMatches(panelType) {
+    // Propose regions of this recording that sound like the other panel's cluewords
+    const wavesurfer = panelType === 'question' ? questionWaveSurfer : controlWaveSurfer;
+    const annotations = panelType === 'question' ? questionAnnotations : controlAnnotations;
+    const otherAnnotations = panelType === 'question' ? controlAnnotations : questionAnnotations;
+    if (!wavesurfer) return;
+    
+    const labelled = new Set(annotations.map(ann => ann.label.trim().toLowerCase()));
+    const queries = otherAnnotations.filter(ann => !labelled.has(ann.label.trim().toLowerCase()));
+    if (queries.length === 0) {
+        updateStatus(`Every ${panelType === 'question' ? 'control' : 'question'} clueword is already annotated here`);
+        return;
+    }
+    
+    const button = document.getElementById(`${panelType === 'question' ? 'q' : 'c'}-find-matches`);
+    button.disabled = true;
+    updateStatus(`Searching ${panelType} audio for ${queries.length} clueword${queries.length > 1 ? 's' : ''}...`);
+    try {
+        const response = await fetch(`/candidates/${panelType}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                annotations: queries.map(ann => ({ label: ann.label, start: ann.start, end: ann.end })),
+                limit: 1
+            })
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            throw new Error(result.error || 'Candidate search failed');
+        }
+        
+        let suggested = 0;
+        result.results.forEach(match => {
+            const candidate = match.candidates[0];
+            if (!candidate) return;
+            const region = wavesurfer.addRegion({
+                start: candidate.start,
+                end: candidate.end,
+                color: 'rgba(102, 187, 255, 0.35)',
+                attributes: { label: `${match.label}? (${Math.round(candidate.score * 100)}%)` }
+            });
+            region.suggestedLabel = match.label;
+            if (!pendingRegions[panelType].includes(region)) {
+                pendingRegions[panelType].push(region);
+            }
+            suggested++;
+        });
+        updateNameSegmentButtonState(panelType);
+        updateStatus(suggested
+            ? `${suggested} suggested segment${suggested > 1 ? 's' : ''} - Click "Name Segment" to review`
+            : 'No similar segments found');
+    } catch (error) {
+        showError(`Candidate search failed: ${error.message}`);
+    } finally {
+        button.disabled = false;
+    }
 }
 
 function handleAnnotationSubmit(event) {
@@ -676,7 +1126,9 @@ function handleAnnotationSubmit(event) {
     updateGenerateButtonState();
     updateProgressStep(4);
     updateStatus(`Annotation "${label}" added to ${panelTypeForStatus || 'audio'}`);
-    autoSaveSession();
+    autoSaveSession({
+        add: [{ panel: panelTypeForStatus, id: annotation.id, label: annotation.label, start: annotation.start, end: annotation.end }]
+    });
 }
 
 function closeAnnotationModal() {
@@ -755,7 +1207,7 @@ function deleteAnnotation(panelType, annotationId) {
         updateAnnotationsDisplay(panelType);
         updateGenerateButtonState();
         updateStatus(`Annotation "${annotation.label}" deleted`);
-        autoSaveSession();
+        autoSaveSession({ delete: [{ panel: panelType, id: annotation.id }] });
     }
 }
 
@@ -867,6 +1319,8 @@ async function generateClueWords() {
         formData.append('question_original_filename', questionOriginalFilename);
         formData.append('control_original_filename', controlOriginalFilename);
         formData.append('enable_bandpass', bandpassEnabled.toString());
+        formData.append('label_match', document.getElementById('fuzzy-labels').checked ? 'fuzzy' : 'exact');
+        formData.append('async', 'true');
         
         // Add case information
         formData.append('case_number', document.getElementById('case-number').value || '');
@@ -885,8 +1339,16 @@ async function generateClueWords() {
             throw new Error(errorData.error || 'Processing failed');
         }
         
+        // Wait for the background job to finish building the package
+        const job = await waitForPackageJob(await response.json());
+        const download = await fetch(job.download_url);
+        if (!download.ok) {
+            const errorData = await download.json().catch(() => ({}));
+            throw new Error(errorData.error || 'Download failed');
+        }
+        
         // Handle file download
-        const blob = await response.blob();
+        const blob = await download.blob();
         const url = window.URL.createObjectURL(blob);
         const a = document.createElement('a');
         a.href = url;
@@ -909,6 +1371,35 @@ async function generateClueWords() {
     }
 }
 
+async function waitForPackageJob(job) {
+    const phaseLabels = {
+        queued: 'Waiting for a worker',
+        extracting: 'Extracting cluewords',
+        features: 'Comparing acoustics',
+        report: 'Building report',
+        done: 'Done'
+    };
+    
+    while (job.status === 'queued' || job.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 500));
+        const response = await fetch(job.progress_url);
+        job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.error || 'Lost track of processing job');
+        }
+        
+        if (job.total > 0) {
+            setProgressBar(Math.round(100 * job.done / job.total));
+        }
+        showLoading(`${phaseLabels[job.phase] || job.phase}... (${job.done}/${job.total} cluewords)`);
+    }
+    
+    if (job.status !== 'done') {
+        throw new Error(job.error || 'Processing failed');
+    }
+    return job;
+}
+
 function updateNameSegmentButtonState(panelType) {
     const button = document.getElementById(`${panelType === 'question' ? 'q' : 'c'}-name-segment`);
     const hasPendingRegions = pendingRegions[panelType].length > 0;
@@ -1079,6 +1570,18 @@ function showProgressBar() {
     progressBar.dataset.interval = interval;
 }
 
+function setProgressBar(percent) {
+    const progressBar = document.getElementById('progress-bar');
+    const progressFill = progressBar.querySelector('.progress-fill');
+    
+    // Real progress replaces the simulated animation
+    if (progressBar.dataset.interval) {
+        clearInterval(progressBar.dataset.interval);
+        delete progressBar.dataset.interval;
+    }
+    progressFill.style.width = Math.min(percent, 100) + '%';
+}
+
 function hideProgressBar() {
     const progressBar = document.getElementById('progress-bar');
     const progressFill = progressBar.querySelector('.progress-fill');
@@ -1132,26 +1635,18 @@ function closeLoadSessionModal() {
 async function loadAvailableSessions() {
     const container = document.getElementById('sessions-container');
     container.innerHTML = '<div class="loading-sessions">Loading sessions...</div>';
+    availableSessions = [];
     
     try {
-        const response = await fetch('/api/sessions');
-        if (!response.ok) {
-            throw new Error('Failed to load sessions');
-        }
-        
-        const sessions = await response.json();
-        availableSessions = sessions;
+        const page = await fetchSessionsPage(null);
         
-        if (sessions.length === 0) {
+        if (page.sessions.length === 0) {
             container.innerHTML = '<div class="no-sessions">No saved sessions found.</div>';
             return;
         }
         
         container.innerHTML = '';
-        sessions.forEach(session => {
-            const sessionElement = createSessionElement(session);
-            container.appendChild(sessionElement);
-        });
+        appendSessionsPage(container, page);
         
     } catch (error) {
         console.error('Error loading sessions:', error);
@@ -1159,6 +1654,45 @@ async function loadAvailableSessions() {
     }
 }
 
+async function fetchSessionsPage(cursor) {
+    const params = new URLSearchParams();
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    const response = await fetch(`/api/sessions?${params.toString()}`);
+    if (!response.ok) {
+        throw new Error('Failed to load sessions');
+    }
+    return response.json();
+}
+
+function appendSessionsPage(container, page) {
+    availableSessions = availableSessions.concat(page.sessions);
+    page.sessions.forEach(session => {
+        container.appendChild(createSessionElement(session));
+    });
+    
+    if (page.next_cursor) {
+        const moreButton = document.createElement('button');
+        moreButton.className = 'control-btn small';
+        moreButton.textContent = 'Load more';
+        moreButton.addEventListener('click', async () => {
+            moreButton.disabled = true;
+            moreButton.textContent = 'Loading...';
+            try {
+                const nextPage = await fetchSessionsPage(page.next_cursor);
+                moreButton.remove();
+                appendSessionsPage(container, nextPage);
+            } catch (error) {
+                console.error('Error loading sessions:', error);
+                moreButton.disabled = false;
+                moreButton.textContent = 'Load more';
+            }
+        });
+        container.appendChild(moreButton);
+    }
+}
+
 function createSessionElement(session) {
     const div = document.createElement('div');
     div.className = 'session-item';
@@ -1218,20 +1752,28 @@ async function saveCurrentSession() {
             speaker_name: document.getElementById('speaker-name').value.trim(),
             question_filename: questionOriginalFilename,
             control_filename: controlOriginalFilename,
+            // Left out when unknown, so the server references the workspace's audio
+            question_audio_hash: audioHashes.question || undefined,
+            control_audio_hash: audioHashes.control || undefined,
             bandpass_enabled: document.getElementById('enable-bandpass').checked,
             annotations: {
                 question: questionAnnotations.map(ann => ({
+                    id: ann.id,
                     label: ann.label,
                     start: ann.start,
                     end: ann.end
                 })),
                 control: controlAnnotations.map(ann => ({
+                    id: ann.id,
                     label: ann.label,
                     start: ann.start,
                     end: ann.end
                 }))
             }
         };
+        if (currentSessionId) {
+            sessionData.version = currentSessionVersion;
+        }
         
         const response = await fetch('/api/sessions', {
             method: 'POST',
@@ -1242,12 +1784,14 @@ async function saveCurrentSession() {
         });
         
         if (!response.ok) {
-            throw new Error('Failed to save session');
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.error || 'Failed to save session');
         }
         
         const savedSession = await response.json();
         currentSessionId = savedSession.id;
         currentSessionName = savedSession.session_name;
+        currentSessionVersion = savedSession.version;
         
         updateSessionStatus(`Session "${sessionName}" saved successfully`);
         closeSaveSessionModal();
@@ -1283,19 +1827,31 @@ async function loadSession(sessionId) {
         // Update session tracking
         currentSessionId = session.id;
         currentSessionName = session.session_name;
+        currentSessionVersion = session.version;
         // Set original filenames from session
         questionOriginalFilename = session.question_filename || '';
         controlOriginalFilename = session.control_filename || '';
-        // Load audio files if filenames are present
-        if (questionOriginalFilename) {
-            await initializeWaveform('question', `/static/temp_standardized/question_standardized.wav`);
-            document.getElementById('question-filename').textContent = questionOriginalFilename;
-            document.getElementById('question-filename').classList.add('loaded');
-        }
-        if (controlOriginalFilename) {
-            await initializeWaveform('control', `/static/temp_standardized/control_standardized.wav`);
-            document.getElementById('control-filename').textContent = controlOriginalFilename;
-            document.getElementById('control-filename').classList.add('loaded');
+        // Reopen the session's audio from the server's audio cache
+        const restoreResponse = await fetch(`/api/sessions/${sessionId}/audio`, { method: 'POST' });
+        const restored = restoreResponse.ok ? await restoreResponse.json() : {};
+        const filenames = { question: questionOriginalFilename, control: controlOriginalFilename };
+        for (const panelType of ['question', 'control']) {
+            const filenameElement = document.getElementById(`${panelType}-filename`);
+            audioHashes[panelType] = session[`${panelType}_audio_hash`] || null;
+            if (!filenames[panelType]) continue;
+            if (restored[panelType]) {
+                await initializeWaveform(panelType, restored[panelType].url);
+            } else if (audioHashes[panelType]) {
+                // The referenced audio is gone; it has to be uploaded again
+                filenameElement.textContent = `${filenames[panelType]} (not stored, upload again)`;
+                filenameElement.classList.remove('loaded');
+                continue;
+            } else {
+                // Sessions saved without an audio reference use the workspace's audio
+                await initializeWaveform(panelType, `/audio/${panelType}`);
+            }
+            filenameElement.textContent = filenames[panelType];
+            filenameElement.classList.add('loaded');
         }
         // Refresh annotations display
         updateAnnotationsDisplay('question');
@@ -1320,33 +1876,32 @@ async function loadSession(sessionId) {
     }
 }
 
-// Auto-save session when annotations change
-function autoSaveSession() {
+// Auto-save annotation changes as a patch against the version we last saw.
+// Patches are chained so each one carries the version returned by the previous.
+function autoSaveSession(annotationOps) {
     if (!currentSessionId) return;
-    const sessionData = {
-        session_id: currentSessionId,
-        session_name: currentSessionName,
-        case_number: document.getElementById('case-number').value.trim(),
-        police_station: document.getElementById('police-station').value.trim(),
-        district: document.getElementById('district').value.trim(),
-        cr_number: document.getElementById('cr-adr-number').value.trim(),
-        speaker_name: document.getElementById('speaker-name').value.trim(),
-        question_filename: questionOriginalFilename,
-        control_filename: controlOriginalFilename,
-        bandpass_enabled: document.getElementById('enable-bandpass').checked,
-        annotations: {
-            question: questionAnnotations.map(ann => ({ label: ann.label, start: ann.start, end: ann.end })),
-            control: controlAnnotations.map(ann => ({ label: ann.label, start: ann.start, end: ann.end }))
+    const sessionId = currentSessionId;
+    sessionSaveChain = sessionSaveChain.then(async () => {
+        if (sessionId !== currentSessionId) return;
+        try {
+            const response = await fetch(`/api/sessions/${sessionId}`, {
+                method: 'PATCH',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ version: currentSessionVersion, annotations: annotationOps })
+            });
+            if (response.status === 409) {
+                updateSessionStatus('Session was changed elsewhere - reload it before making further edits', 'error');
+                return;
+            }
+            if (!response.ok) {
+                throw new Error('Failed to save session');
+            }
+            const result = await response.json();
+            currentSessionVersion = result.version;
+            updateSessionStatus('Session auto-saved');
+        } catch (error) {
+            updateSessionStatus('Auto-save failed', 'error');
         }
-    };
-    fetch('/api/sessions', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(sessionData)
-    }).then(() => {
-        updateSessionStatus('Session auto-saved');
-    }).catch(() => {
-        updateSessionStatus('Auto-save failed', 'error');
     });
 }
 
@@ -1371,6 +1926,7 @@ async function deleteSession(sessionId) {
         if (currentSessionId === sessionId) {
             currentSessionId = null;
             currentSessionName = '';
+            currentSessionVersion = null;
             updateSessionStatus('');
         }
         
@@ -1389,6 +1945,7 @@ function createNewSession() {
         document.getElementById('cr-adr-number').value = '';
         document.getElementById('speaker-name').value = '';
         document.getElementById('enable-bandpass').checked = true;
+        document.getElementById('fuzzy-labels').checked = false;
         
         // Clear annotations
         questionAnnotations = [];
@@ -1421,6 +1978,7 @@ function createNewSession() {
         // Reset session tracking
         currentSessionId = null;
         currentSessionName = '';
+        currentSessionVersion = null;
         updateSessionStatus('');
         
         // Reset playing state
@@ -1498,7 +2056,7 @@ function handleRegionUpdate(region, panelType) {
         // Optionally, update label if region label can be changed interactively
         // annotation.label = region.attributes.label;
         updateAnnotationsDisplay(panelType);
-        autoSaveSession();
+        autoSaveSession({ update: [{ panel: panelType, id: annotation.id, start: annotation.start, end: annotation.end }] });
     }
 }
 
@@ -1527,6 +2085,12 @@ document.addEventListener('keydown', function(e) {
         }
     }
     
+    // Jump to the next / previous speech region
+    if (activeWaveform && (e.code === 'KeyN' || e.code === 'KeyB')) {
+        e.preventDefault();
+        jumpToSpeech(activeWaveform, e.code === 'KeyN' ? 1 : -1);
+    }
+    
     // Keyboard zoom controls
     if (activeWaveform && (e.code === 'Equal' || e.code === 'Minus')) {
         e.preventDefault();
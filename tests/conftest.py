@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app reads DATABASE_URL at import time; keep the test database out of the repo
+_state_dir = tempfile.mkdtemp(prefix='clueword-tests-')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(_state_dir, 'forensic_sessions.db'))
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run each test in its own directory, so the relative caches start empty."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(autouse=True)
+def background_workers(workdir, monkeypatch):
+    """Give each test its own background pools and let their work finish inside its directory."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    import app
+
+    executors = [ThreadPoolExecutor(max_workers=2), ThreadPoolExecutor(max_workers=1)]
+    monkeypatch.setattr(app, '_spectrogram_executor', executors[0])
+    monkeypatch.setattr(app, '_package_job_executor', executors[1])
+    monkeypatch.setattr(app, '_spectrogram_jobs', {})
+    yield
+    for executor in executors:
+        executor.shutdown(wait=True)
+
+
+def write_wav(path, samples, frame_rate=44100):
+    """Write mono 16-bit samples to a WAV file."""
+    import wave
+
+    import numpy as np
+
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(frame_rate)
+        f.writeframes(np.asarray(samples, dtype='<i2').tobytes())
+    return path
+
+
+@pytest.fixture
+def recordings(tmp_path):
+    """Two distinct two-second noise recordings, as WAV paths keyed by panel."""
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    return {
+        panel: write_wav(tmp_path / f'{panel}.wav', rng.standard_normal(88200) * 3000)
+        for panel in ('question', 'control')
+    }
+
+
+@pytest.fixture
+def upload():
+    """Standardize a recording into a client's workspace and return the JSON reply."""
+    def upload(client, panel, path):
+        with open(path, 'rb') as f:
+            response = client.post('/standardize', data={'type': panel, 'audio_file': (f, f'{panel}.wav')})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()
+    return upload
+
+
+@pytest.fixture
+def babble():
+    """Speech-like int16 signal: syllables of random pitch and timbre with short pauses."""
+    import numpy as np
+
+    def babble(seconds, seed=0, frame_rate=44100):
+        rng = np.random.default_rng(seed)
+        parts, length = [], 0
+        while length < seconds * frame_rate:
+            n = int(rng.uniform(0.12, 0.3) * frame_rate)
+            f0 = rng.uniform(100, 250) * (1 + 0.1 * np.arange(n) / n)
+            phase = 2 * np.pi * np.cumsum(f0) / frame_rate
+            weights = rng.uniform(0.1, 1, 8)
+            syllable = sum(w * np.sin(k * phase) for k, w in enumerate(weights, 1)) / weights.sum()
+            pause = np.zeros(int(rng.uniform(0.02, 0.1) * frame_rate))
+            parts += [syllable * np.hanning(n), pause]
+            length += n + len(pause)
+        signal = np.concatenate(parts)[:int(seconds * frame_rate)]
+        return (0.5 * signal + 0.002 * rng.standard_normal(len(signal))) * 32767
+    return babble
@@ -0,0 +1,65 @@
+import os
+import time
+
+import app
+
+
+def fake_audio_entry(audio_hash, size, age):
+    entry_dir = app.audio_cache_dir(audio_hash)
+    os.makedirs(entry_dir)
+    with open(os.path.join(entry_dir, 'standardized.wav'), 'wb') as f:
+        f.write(b'\0' * size)
+    meta_path = os.path.join(entry_dir, 'meta.json')
+    with open(meta_path, 'w') as f:
+        f.write('{}')
+    stamp = time.time() - age
+    os.utime(meta_path, (stamp, stamp))
+
+
+def fake_clueword(name, size, age):
+    os.makedirs(app.CLUEWORD_CACHE_FOLDER, exist_ok=True)
+    path = app.clueword_artifact_path(name)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+
+
+def test_store_caps_are_enforced_by_the_collector(monkeypatch):
+    monkeypatch.setattr(app, 'AUDIO_CACHE_MAX_BYTES', 2500)
+    monkeypatch.setattr(app, 'CLUEWORD_CACHE_MAX_BYTES', 150)
+    oldest, older, newest = 'a' * 64, 'b' * 64, 'c' * 64
+    fake_audio_entry(oldest, 1000, age=300)
+    fake_audio_entry(older, 1000, age=200)
+    fake_audio_entry(newest, 1000, age=100)
+    for i in range(3):
+        fake_clueword(f"k{i}", 100, age=300 - i)
+
+    with app.app.app_context():
+        session = app.ForensicSession(session_name='kept')
+        app.set_session_audio(session, 'question', oldest)
+        app.db.session.add(session)
+        app.db.session.commit()
+        try:
+            stats = app.collect_artifacts()
+        finally:
+            app.db.session.delete(session)
+            app.db.session.commit()
+
+    # The referenced entry survives although it is the least recently used
+    assert sorted(os.listdir(app.AUDIO_CACHE_FOLDER)) == [oldest, newest]
+    assert sorted(os.listdir(app.CLUEWORD_CACHE_FOLDER)) == ['k2.wav']
+    assert stats['last_collection']['removed']['budget'] == 3
+    assert stats['stores']['audio']['referenced_count'] == 1
+
+
+def test_shared_budget_spans_stores(monkeypatch):
+    monkeypatch.setattr(app, 'ARTIFACT_MAX_BYTES', 1500)
+    fake_audio_entry('d' * 64, 1000, age=100)
+    fake_clueword('old', 1000, age=500)
+
+    with app.app.app_context():
+        app.collect_artifacts()
+
+    assert os.listdir(app.AUDIO_CACHE_FOLDER) == ['d' * 64]
+    assert os.listdir(app.CLUEWORD_CACHE_FOLDER) == []
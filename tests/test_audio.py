@@ -0,0 +1,61 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(recordings, upload):
+    client = app.app.test_client()
+    upload(client, 'question', recordings['question'])
+    return client
+
+
+def read_wav(data):
+    with wave.open(io.BytesIO(data), 'rb') as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype='<i2'), f.getframerate()
+
+
+def test_range_request_returns_partial_content(client):
+    full = client.get('/audio/question')
+    assert full.status_code == 200
+    assert full.headers['Accept-Ranges'] == 'bytes'
+
+    response = client.get('/audio/question', headers={'Range': 'bytes=100-1099'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-1099/{len(full.data)}'
+    assert response.data == full.data[100:1100]
+
+
+def test_unchanged_audio_revalidates_with_304(client):
+    full = client.get('/audio/question')
+    response = client.get('/audio/question', headers={'If-None-Match': full.headers['ETag']})
+    assert response.status_code == 304
+    assert not response.data
+
+
+def test_window_is_a_self_contained_wav(client):
+    samples, frame_rate = read_wav(client.get('/audio/question').data)
+
+    response = client.get('/audio/question?start=0.5&end=0.75')
+    assert response.status_code == 200
+    window, window_rate = read_wav(response.data)
+    assert window_rate == frame_rate
+    assert np.array_equal(window, samples[int(0.5 * frame_rate):int(0.75 * frame_rate)])
+
+    etag = response.headers['ETag']
+    assert client.get('/audio/question?start=0.5&end=0.75', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/audio/question?start=0.5&end=1', headers={'If-None-Match': etag}).status_code == 200
+
+    ranged = client.get('/audio/question?start=0.5&end=0.75', headers={'Range': 'bytes=0-43'})
+    assert ranged.status_code == 206
+    assert ranged.data == response.data[:44]
+
+
+def test_missing_and_invalid_requests(client):
+    assert client.get('/audio/control').status_code == 404
+    assert client.get('/audio/other').status_code == 400
+    assert client.get('/audio/question?start=soon').status_code == 400
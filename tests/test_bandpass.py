@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+import app
+
+
+def speech_like(seconds=0.5, frame_rate=app.STANDARD_FRAME_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * frame_rate)) * 4000).astype('<i2')
+
+
+def test_failed_bandpass_is_not_cached(monkeypatch):
+    samples = speech_like()
+    sources = {'question': (samples, app.STANDARD_FRAME_RATE), 'control': (samples, app.STANDARD_FRAME_RATE)}
+    job = {'question': (0, 200), 'control': (100, 300)}
+    bandpass = app.make_bandpass_settings(True, engine='ffmpeg')
+    fingerprints = {panel: app.source_fingerprint(*sources[panel]) for panel in sources}
+    job['artifact_keys'] = app.clueword_artifact_keys(job, fingerprints, bandpass)
+
+    def ffmpeg_missing(*args, **kwargs):
+        raise FileNotFoundError('ffmpeg')
+
+    monkeypatch.setattr(app, 'apply_bandpass_filter_ffmpeg', ffmpeg_missing)
+    files = dict(app.render_clueword(job, sources, bandpass))
+
+    # The package still gets the unfiltered fallback, but it is not cached
+    assert files['bpf_question.wav'] == files['question.wav']
+    for panel in ('question', 'control'):
+        assert os.path.exists(app.clueword_artifact_path(job['artifact_keys'][f"{panel}.wav"]))
+        assert not os.path.exists(app.clueword_artifact_path(job['artifact_keys'][f"bpf_{panel}.wav"]))
+
+    # Once the filter works again the bandpass files are rendered and cached
+    monkeypatch.setattr(app, 'apply_bandpass_filter_ffmpeg', lambda segment, low, high: segment.apply_gain(-6))
+    files = dict(app.render_clueword(job, sources, bandpass))
+    assert files['bpf_question.wav'] != files['question.wav']
+    assert os.path.exists(app.clueword_artifact_path(job['artifact_keys']['bpf_question.wav']))
+
+
+def test_apply_bandpass_filter_fallback(monkeypatch):
+    segment = app.pcm_to_segment(speech_like(), app.STANDARD_FRAME_RATE)
+
+    def broken(*args, **kwargs):
+        raise RuntimeError('filter failed')
+
+    monkeypatch.setattr(app, 'design_bandpass_sos', broken)
+    assert app.apply_bandpass_filter(segment, 400, 4000) is segment
+    with pytest.raises(RuntimeError):
+        app.apply_bandpass_filter(segment, 400, 4000, fallback=False)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="ffmpeg binary not installed")
+@pytest.mark.parametrize('scale', [0.3, 1.2])
+def test_numpy_engine_matches_ffmpeg(scale):
+    rng = np.random.default_rng(3)
+    # At scale 1.2 the input clips, which is where coefficient differences show most
+    samples = np.clip(rng.standard_normal(3 * app.STANDARD_FRAME_RATE) * 32767 * scale / 3, -32768, 32767).astype('<i2')
+    segment = app.pcm_to_segment(samples, app.STANDARD_FRAME_RATE)
+
+    numpy_out = app.apply_bandpass_filter(segment, app.BANDPASS_LOW_FREQ, app.BANDPASS_HIGH_FREQ, engine='numpy', fallback=False)
+    ffmpeg_out = app.apply_bandpass_filter_ffmpeg(segment, app.BANDPASS_LOW_FREQ, app.BANDPASS_HIGH_FREQ)
+
+    a = np.frombuffer(numpy_out.raw_data, dtype='<i2').astype(np.int32)
+    b = np.frombuffer(ffmpeg_out.raw_data, dtype='<i2').astype(np.int32)
+    assert len(a) == len(b)
+    assert np.abs(a - b).max() <= app.BANDPASS_TOLERANCE_LSB
@@ -0,0 +1,45 @@
+import importlib.util
+import json
+import os
+import wave
+
+import pytest
+
+spec = importlib.util.spec_from_file_location(
+    'pipeline_benchmark', os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'pipeline.py'))
+pipeline = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(pipeline)
+
+
+def test_synthetic_case_has_the_requested_shape(tmp_path):
+    path = pipeline.synthesize_recording(str(tmp_path / 'q.wav'), 1.5, frame_rate=22050, channels=2)
+    with wave.open(path, 'rb') as f:
+        assert (f.getframerate(), f.getnchannels(), f.getsampwidth()) == (22050, 2, 2)
+        assert f.getnframes() == int(1.5 * 22050)
+
+    annotations = pipeline.synthetic_annotations(8, 10.0)
+    assert annotations == pipeline.synthetic_annotations(8, 10.0)
+    for panel in ('question', 'control'):
+        spans = annotations[panel]
+        assert [a['label'] for a in spans] == [f'clueword {i}' for i in range(8)]
+        # Every annotation stays inside its own slot of the recording
+        for i, a in enumerate(spans):
+            assert i * 1.25 <= a['start'] < a['end'] <= (i + 1) * 1.25 + 1e-3
+
+
+@pytest.mark.parametrize('mode', ['http', 'direct'])
+def test_run_reports_phases_and_compares(tmp_path, capsys, mode):
+    output = tmp_path / 'results.json'
+    args = ['--duration', '2', '--cluewords', '3', '--rate', '22050', '--mode', mode, '--output', str(output)]
+    assert pipeline.main(args) == 0
+    results = json.loads(output.read_text())['results']
+    assert len(results) == 1
+    result = results[0]
+    assert result['mode'] == mode
+    assert result['package_bytes'] > 0
+    expected = {'standardize_question', 'standardize_control', 'process'} if mode == 'http' else \
+        {'standardize', 'extract', 'bandpass', 'report', 'zip'}
+    assert set(result['phases']) == expected
+
+    assert pipeline.main(args[:-1] + [str(tmp_path / 'again.json'), '--compare', str(output)]) == 0
+    assert 'Compared with' in capsys.readouterr().out
@@ -0,0 +1,65 @@
+import pytest
+
+import app
+from conftest import write_wav
+
+FRAME_RATE = 44100
+
+
+@pytest.fixture
+def client(tmp_path, babble, upload):
+    question, control = babble(4, seed=1), babble(4, seed=2)
+    # The question's 0.5-1.0 s is said again at 2.3 s of the control and at 3.0 s of the question
+    control[int(2.3 * FRAME_RATE):int(2.8 * FRAME_RATE)] = question[int(0.5 * FRAME_RATE):int(1.0 * FRAME_RATE)]
+    question[int(3.0 * FRAME_RATE):int(3.5 * FRAME_RATE)] = question[int(0.5 * FRAME_RATE):int(1.0 * FRAME_RATE)]
+    client = app.app.test_client()
+    upload(client, 'question', write_wav(tmp_path / 'q.wav', question))
+    upload(client, 'control', write_wav(tmp_path / 'c.wav', control))
+    return client
+
+
+def search(client, panel, **body):
+    body.setdefault('annotations', [{'label': 'word', 'start': 0.5, 'end': 1.0}])
+    return client.post(f'/candidates/{panel}', json=body)
+
+
+def test_planted_segment_is_the_best_candidate(client):
+    response = search(client, 'control')
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['source'] == 'question'
+    [result] = body['results']
+    assert result['label'] == 'word'
+    best = result['candidates'][0]
+    assert abs(best['start'] - 2.3) < 0.03 and abs(best['end'] - 2.8) < 0.03
+    assert best['score'] > 0.9
+    assert [c['score'] for c in result['candidates']] == sorted((c['score'] for c in result['candidates']), reverse=True)
+
+
+def test_same_recording_search_skips_the_segment_itself(client):
+    [result] = search(client, 'question', source='question', limit=1).get_json()['results']
+    [best] = result['candidates']
+    assert abs(best['start'] - 3.0) < 0.03 and abs(best['end'] - 3.5) < 0.03
+
+
+def test_min_score_filters_candidates(client):
+    [result] = search(client, 'control', min_score=0.99).get_json()['results']
+    assert result['candidates'] == []
+
+
+@pytest.mark.parametrize('body', [
+    {'annotations': []},
+    {'annotations': [{'label': 'word', 'start': 1.0, 'end': 0.5}]},
+    {'annotations': [{'label': 'word', 'start': 0, 'end': 6}]},
+    {'annotations': [{'label': 'word', 'start': 'soon', 'end': 1}]},
+    {'source': 'other'},
+    {'limit': 0},
+])
+def test_invalid_searches_are_rejected(client, body):
+    assert search(client, 'control', **body).status_code == 400
+
+
+def test_search_needs_both_recordings(babble, tmp_path, upload):
+    client = app.app.test_client()
+    upload(client, 'question', write_wav(tmp_path / 'q.wav', babble(2)))
+    assert search(client, 'control').status_code == 404
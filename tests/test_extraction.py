@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture(params=['array', 'memmap'])
+def sources(request, tmp_path):
+    rng = np.random.default_rng(3)
+    sources = {}
+    for panel in ('question', 'control'):
+        samples = (rng.standard_normal(3 * app.STANDARD_FRAME_RATE) * 3000).astype('<i2')
+        if request.param == 'memmap':
+            path = tmp_path / f'{panel}.pcm'
+            samples.tofile(path)
+            samples = np.memmap(path, dtype='<i2', mode='r')
+        sources[panel] = (samples, app.STANDARD_FRAME_RATE)
+    return sources
+
+
+def annotations(*spans):
+    return [{'label': label, 'start': start, 'end': end} for label, start, end in spans]
+
+
+def extract(jobs, sources, executor):
+    results = {}
+    for indices, errors, files in app.iter_extraction_groups(jobs, sources, app.make_bandpass_settings(True),
+                                                             max_workers=2, executor=executor):
+        results[tuple(indices)] = (errors, files)
+    return results
+
+
+def test_process_pool_matches_thread_pool(monkeypatch, sources):
+    # Render every file in both runs instead of reusing the clueword cache
+    monkeypatch.setattr(app, 'CLUEWORD_CACHE_MAX_BYTES', 0)
+    jobs = app.build_clueword_jobs(
+        annotations(('one', 0.1, 0.4), ('two', 0.5, 0.9), ('one', 1.0, 1.3), ('three', 2.0, 2.2)),
+        annotations(('two', 0.2, 0.7), ('one', 1.1, 1.5), ('three', 2.5, 2.9))
+    )
+
+    threaded = extract(jobs, sources, 'thread')
+    processes = extract(jobs, sources, 'process')
+
+    assert processes == threaded
+    assert sorted(i for indices in threaded for i in indices) == list(range(len(jobs)))
+    assert all(error is None for errors, _ in threaded.values() for error in errors)
+    assert all(files for _, files in threaded.values())
+
+
+def test_failing_job_does_not_abort_the_others(sources):
+    jobs = app.build_clueword_jobs(annotations(('one', 0.1, 0.4), ('two', 0.5, 0.9)),
+                                   annotations(('one', 0.2, 0.7), ('two', 1.1, 1.5)))
+    broken = dict(sources, control=(None, app.STANDARD_FRAME_RATE))
+
+    results = extract(jobs, broken, 'thread')
+
+    errors = [error for group_errors, _ in results.values() for error in group_errors]
+    assert len(errors) == len(jobs)
+    assert all(error is not None for error in errors)
@@ -0,0 +1,67 @@
+import numpy as np
+
+import app
+
+FRAME_RATE = app.STANDARD_FRAME_RATE
+
+
+def voice(f0, seconds, harmonics=(1.0, 0.6, 0.4, 0.25, 0.15), seed=0):
+    """A steady voiced sound: harmonics of f0 in a little noise, as int16."""
+    t = np.arange(int(seconds * FRAME_RATE)) / FRAME_RATE
+    signal = sum(a * np.sin(2 * np.pi * k * f0 * t) for k, a in enumerate(harmonics, 1))
+    signal = 0.3 * signal / np.abs(signal).max() + 0.003 * np.random.default_rng(seed).standard_normal(len(t))
+    return (signal * 32767).astype('<i2')
+
+
+def test_segment_features_measure_pitch_and_voicing():
+    samples = np.concatenate([voice(150, 0.5), np.zeros(FRAME_RATE // 2, dtype='<i2'), voice(220, 0.5)])
+    tone, silence, higher = app.segment_features(samples, FRAME_RATE, [(50, 450), (550, 950), (1050, 1450)])
+
+    assert abs(tone['f0_mean_hz'] - 150) < 5
+    assert abs(higher['f0_mean_hz'] - 220) < 7
+    assert tone['voiced_fraction'] > 0.9
+    assert silence['voiced_fraction'] == 0 and silence['f0_mean_hz'] is None
+    assert tone['duration_ms'] == 400.0
+    assert len(tone['mfcc_mean']) == app.FEATURE_MFCC_COUNT
+
+
+def test_batching_does_not_change_features(monkeypatch):
+    samples = np.concatenate([voice(140, 1.0), voice(190, 1.0, seed=1)])
+    segments = [(100, 600), (700, 900), (1200, 1900)]
+    together = app.segment_features(samples, FRAME_RATE, segments)
+
+    monkeypatch.setattr(app, 'FEATURE_BATCH_FRAMES', 7)
+    alone = [app.segment_features(samples, FRAME_RATE, [segment])[0] for segment in segments]
+    for expected, actual in zip(together, alone):
+        assert expected.keys() == actual.keys()
+        # float32 sums may differ in the last rounded digit
+        for name in expected:
+            np.testing.assert_allclose(np.array(actual[name], dtype=float), np.array(expected[name], dtype=float),
+                                       atol=2e-3, err_msg=name)
+
+
+def test_same_voice_scores_higher_than_a_different_one():
+    question = voice(150, 1.0)
+    control = np.concatenate([voice(152, 1.0, seed=1), voice(240, 1.0, harmonics=(0.2, 1.0, 0.1, 0.7, 0.5), seed=2)])
+    jobs = app.build_clueword_jobs(
+        [{'label': 'same', 'start': 0.1, 'end': 0.6}, {'label': 'other', 'start': 0.3, 'end': 0.8}],
+        [{'label': 'same', 'start': 0.2, 'end': 0.7}, {'label': 'other', 'start': 1.2, 'end': 1.7}]
+    )
+    sources = {'question': (question, FRAME_RATE), 'control': (control, FRAME_RATE)}
+
+    features = app.compare_cluewords(jobs, sources)
+    same = features[jobs[0]['label']]['similarity']
+    other = features[jobs[1]['label']]['similarity']
+
+    assert abs(same['f0_difference_semitones']) < 0.5
+    assert other['f0_difference_semitones'] < -7
+    assert same['mfcc_cosine'] > other['mfcc_cosine']
+    assert same['score'] > other['score'] + 0.1
+    assert all(0 <= scores['score'] <= 1 for scores in (same, other))
+
+
+def test_comparison_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(app, 'ACOUSTIC_FEATURES', False)
+    samples = voice(150, 1.0)
+    jobs = app.build_clueword_jobs([{'label': 'a', 'start': 0.1, 'end': 0.5}], [{'label': 'a', 'start': 0.2, 'end': 0.6}])
+    assert app.analyse_cluewords(jobs, {'question': (samples, FRAME_RATE), 'control': (samples, FRAME_RATE)}) is None
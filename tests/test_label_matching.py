@@ -0,0 +1,30 @@
+import app
+
+
+def annotations(*labels):
+    return [{'label': label, 'start': i, 'end': i + 0.5} for i, label in enumerate(labels)]
+
+
+def test_numbered_pairs_do_not_reuse_a_real_label():
+    jobs = app.build_clueword_jobs(annotations('hello', 'hello', 'hello (1)'), annotations('hello', 'Hello (1)'))
+
+    labels = [job['label'] for job in jobs]
+    assert len(jobs) == 3
+    assert len({label.casefold() for label in labels}) == 3
+    assert 'hello (1)' in labels
+    assert len({job['dir'] for job in jobs}) == 3
+
+
+def test_report_keeps_every_pair():
+    jobs = app.build_clueword_jobs(annotations('hello', 'hello', 'hello (1)'), annotations('hello', 'Hello (1)'))
+    report_data, failures = app.collect_extraction_results(jobs, [None] * len(jobs))
+
+    assert not failures
+    assert len(app.report_matches(report_data)) == len(jobs)
+
+
+def test_repeated_labels_are_numbered_in_time_order():
+    jobs = app.build_clueword_jobs(annotations('Bolan', 'x', 'bolan'), annotations('bolan', 'Bolan', 'BOLAN'))
+
+    assert [job['label'] for job in jobs] == ['Bolan (1)', 'Bolan (2)', 'Bolan (3)']
+    assert [job['question'][0] for job in jobs] == [0, 2000, 0]
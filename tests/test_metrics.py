@@ -0,0 +1,75 @@
+import json
+import re
+
+import app
+
+
+def process_form():
+    annotations = {
+        'question': [{'id': 1, 'label': 'hello', 'start': 0.2, 'end': 0.6}],
+        'control': [{'id': 2, 'label': 'hello', 'start': 1.0, 'end': 1.5}]
+    }
+    return {
+        'annotations': json.dumps(annotations),
+        'question_original_filename': 'question.wav',
+        'control_original_filename': 'control.wav'
+    }
+
+
+def sample(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_registry_renders_prometheus_text():
+    registry = app.MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe('jobs_total', 'counter', 'Jobs.')
+    registry.describe('job_seconds', 'histogram', 'Job time.')
+    registry.inc('jobs_total', {'kind': 'a "b"'})
+    registry.inc('jobs_total', {'kind': 'a "b"'}, 2)
+    for value in (0.05, 0.5, 5):
+        registry.observe('job_seconds', value, {'kind': 'x'})
+
+    assert registry.render().splitlines() == [
+        '# HELP jobs_total Jobs.',
+        '# TYPE jobs_total counter',
+        'jobs_total{kind="a \\"b\\""} 3',
+        '# HELP job_seconds Job time.',
+        '# TYPE job_seconds histogram',
+        'job_seconds_bucket{kind="x",le="0.1"} 1',
+        'job_seconds_bucket{kind="x",le="1.0"} 2',
+        'job_seconds_bucket{kind="x",le="+Inf"} 3',
+        'job_seconds_sum{kind="x"} 5.55',
+        'job_seconds_count{kind="x"} 3',
+    ]
+
+
+def test_pipeline_phases_are_exposed(monkeypatch, tmp_path, recordings, upload):
+    timing_log = tmp_path / 'timing.jsonl'
+    monkeypatch.setattr(app, 'TIMING_LOG_PATH', str(timing_log))
+    client = app.app.test_client()
+    phases = ('decode', 'resample', 'peaks', 'slice', 'wav_export', 'report', 'zip')
+    before = client.get('/metrics').get_data(as_text=True)
+
+    for panel, path in recordings.items():
+        upload(client, panel, path)
+    assert client.post('/process', data=process_form()).status_code == 200
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    for phase in phases:
+        series = f'clueword_phase_duration_seconds_count{{phase="{phase}"}}'
+        assert sample(text, series) > sample(before, series), phase
+    series = 'clueword_http_requests_total{method="POST",route="/standardize",status="200"}'
+    assert sample(text, series) == sample(before, series) + 2
+    series = 'clueword_phase_samples_total{phase="resample"}'
+    assert sample(text, series) - sample(before, series) == 2 * 88200
+
+    # Spectrogram and search index builds run in the background and log their own records
+    records = [json.loads(line) for line in timing_log.read_text().splitlines()]
+    records = [record for record in records if record['job'] in ('standardize', 'process')]
+    assert [record['job'] for record in records] == ['standardize', 'standardize', 'process']
+    assert {'decode', 'resample'} <= set(records[0]['phases'])
+    assert {'slice', 'wav_export', 'zip'} <= set(records[-1]['phases'])
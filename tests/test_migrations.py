@@ -0,0 +1,58 @@
+import json
+
+import app
+
+
+def legacy_session(annotations):
+    session = app.ForensicSession(session_name='legacy', annotations_data=json.dumps(annotations))
+    app.db.session.add(session)
+    app.db.session.commit()
+    return session.id
+
+
+def test_migrates_blob_once():
+    with app.app.app_context():
+        session_id = legacy_session({'question': [{'label': 'a', 'start': 0, 'end': 1}], 'control': []})
+        app.migrate_annotation_blobs()
+        app.migrate_annotation_blobs()
+
+        assert app.SessionAnnotation.query.filter_by(session_id=session_id).count() == 1
+        assert app.db.session.get(app.ForensicSession, session_id).annotations_data is None
+
+
+def test_blob_claimed_by_another_worker_is_skipped(monkeypatch):
+    with app.app.app_context():
+        session_id = legacy_session({'question': [{'label': 'b', 'start': 0, 'end': 1}], 'control': []})
+        annotation_rows = app.annotation_rows
+
+        def migrated_elsewhere(annotations):
+            # Another worker migrates the session between our read and our claim
+            with app.db.engine.begin() as conn:
+                conn.execute(app.db.text("UPDATE forensic_sessions SET annotations_data = NULL WHERE id = :id"),
+                             {'id': session_id})
+            return annotation_rows(annotations)
+
+        monkeypatch.setattr(app, 'annotation_rows', migrated_elsewhere)
+        assert app.migrate_annotation_blobs() == 0
+        assert app.SessionAnnotation.query.filter_by(session_id=session_id).count() == 0
+
+
+def test_only_stale_labels_are_renormalized():
+    with app.app.app_context():
+        session = app.ForensicSession(session_name='labels')
+        session.set_annotations({'question': [{'label': 'Hello!', 'start': 0, 'end': 1},
+                                              {'label': 'World', 'start': 1, 'end': 2}], 'control': []})
+        app.db.session.add(session)
+        app.db.session.commit()
+        rows = app.SessionAnnotation.query.filter_by(session_id=session.id).order_by(app.SessionAnnotation.position).all()
+        assert [row.label_normalizer for row in rows] == [app.LABEL_NORMALIZER_VERSION] * 2
+
+        # One row was keyed by an older normalizer
+        with app.db.engine.begin() as conn:
+            conn.execute(app.db.text("UPDATE session_annotations SET label_normalized = 'Hello!', label_normalizer = 0 "
+                                     "WHERE id = :id"), {'id': rows[0].id})
+        assert app.renormalize_annotation_labels() == 1
+        assert app.renormalize_annotation_labels() == 0
+
+        app.db.session.expire_all()
+        assert app.db.session.get(app.SessionAnnotation, rows[0].id).label_normalized == 'hello'
@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import time
+import zipfile
+
+import numpy as np
+
+import app
+
+
+def test_report_sidecars_change_the_package_cache_key(monkeypatch):
+    samples = np.zeros(800, dtype=np.int16)
+    fingerprints = {panel: app.source_fingerprint(samples, 8000) for panel in ('question', 'control')}
+    args = ([], fingerprints, None, 'q.wav', 'c.wav', False, {})
+
+    monkeypatch.setattr(app, 'REPORT_SIDECARS', True)
+    with_sidecars = app.package_cache_key(*args)
+    monkeypatch.setattr(app, 'REPORT_SIDECARS', False)
+    without_sidecars = app.package_cache_key(*args)
+
+    assert with_sidecars != without_sidecars
+
+
+def process_form(**fields):
+    annotations = {
+        'question': [{'id': 1, 'label': 'hello', 'start': 0.2, 'end': 0.6}],
+        'control': [{'id': 2, 'label': 'hello', 'start': 1.0, 'end': 1.5}]
+    }
+    return dict({
+        'annotations': json.dumps(annotations),
+        'question_original_filename': 'question.wav',
+        'control_original_filename': 'control.wav'
+    }, **fields)
+
+
+def test_process_keys_caches_by_upload_hash(monkeypatch, recordings, upload):
+    client = app.app.test_client()
+    hashes = {panel: upload(client, panel, path)['audio_hash'] for panel, path in recordings.items()}
+    hashed = []
+    file_sha256 = app.file_sha256
+    monkeypatch.setattr(app, 'file_sha256', lambda path: hashed.append(path) or file_sha256(path))
+
+    assert client.post('/process', data=process_form()).status_code == 200
+
+    # The standardized WAVs are never read just to be hashed
+    assert hashed == []
+    fingerprints = {panel: app.source_fingerprint(None, app.STANDARD_FRAME_RATE, hashes[panel]) for panel in hashes}
+    form = process_form()
+    annotations = json.loads(form['annotations'])
+    job = app.build_clueword_jobs(annotations['question'], annotations['control'])[0]
+    # /process parses the filter edges as floats
+    bandpass = app.make_bandpass_settings(True, float(app.BANDPASS_LOW_FREQ), float(app.BANDPASS_HIGH_FREQ))
+    keys = app.clueword_artifact_keys(job, fingerprints, bandpass)
+    assert all(os.path.exists(app.clueword_artifact_path(key)) for key in keys.values())
+
+
+def test_package_cache_is_keyed_by_upload_hash(recordings, upload):
+    client = app.app.test_client()
+    hashes = {panel: upload(client, panel, path)['audio_hash'] for panel, path in recordings.items()}
+
+    job = client.post('/process', data=process_form(**{'async': 'true'})).get_json()
+    for _ in range(100):
+        job = client.get(job['progress_url']).get_json()
+        if job['status'] != 'queued' and job['status'] != 'running':
+            break
+        time.sleep(0.05)
+    assert job['status'] == 'done'
+
+    annotations = json.loads(process_form()['annotations'])
+    jobs = app.build_clueword_jobs(annotations['question'], annotations['control'])
+    fingerprints = {panel: app.source_fingerprint(None, app.STANDARD_FRAME_RATE, hashes[panel]) for panel in hashes}
+    bandpass = app.make_bandpass_settings(True, float(app.BANDPASS_LOW_FREQ), float(app.BANDPASS_HIGH_FREQ))
+    case_info = dict.fromkeys(('case_number', 'police_station', 'district', 'cr_adr_number', 'speaker_name'), '')
+    key = app.package_cache_key(jobs, fingerprints, bandpass, 'question.wav', 'control.wav', True, case_info)
+    assert os.path.exists(app.cached_package_path(key))
+
+
+def test_batch_and_process_build_the_same_archive(tmp_path, recordings, upload):
+    import batch_process
+
+    client = app.app.test_client()
+    for panel, path in recordings.items():
+        upload(client, panel, path)
+    form = process_form(case_number='C-7', speaker_name='A. Speaker')
+    response = client.post('/process', data=form)
+    assert response.status_code == 200
+    streamed = client.post('/process', data=dict(form, stream_package='true'))
+    assert streamed.data == response.data
+
+    # In the order /process reads the form
+    case_info = {'case_number': 'C-7', 'police_station': '', 'district': '', 'cr_adr_number': '', 'speaker_name': 'A. Speaker'}
+    result = batch_process.process_case({
+        'name': 'case',
+        'question_audio': str(recordings['question']),
+        'control_audio': str(recordings['control']),
+        'question_filename': 'question.wav',
+        'control_filename': 'control.wav',
+        'annotations': json.loads(form['annotations']),
+        'enable_bandpass': True,
+        'case_info': case_info
+    }, str(tmp_path))
+    assert result['error'] is None
+
+    with open(result['package'], 'rb') as f:
+        assert f.read() == response.data
+
+
+def test_process_zip_is_removed_once_the_response_closes(workdir, recordings, upload):
+    client = app.app.test_client()
+    for panel, path in recordings.items():
+        upload(client, panel, path)
+
+    response = client.post('/process', data=process_form())
+    assert response.status_code == 200
+    # Still on disk while the response holds it open
+    assert len(list(workdir.glob('workspaces/*/output/*.zip'))) == 1
+
+    zipfile.ZipFile(io.BytesIO(response.data)).testzip()
+    response.close()
+    assert list(workdir.glob('workspaces/*/output/*')) == []
@@ -0,0 +1,65 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client(recordings, upload):
+    client = app.app.test_client()
+    upload(client, 'question', recordings['question'])
+    return client
+
+
+@pytest.fixture
+def samples(client):
+    with wave.open(io.BytesIO(client.get('/audio/question').data), 'rb') as f:
+        return np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+
+
+def raw_peaks(client, **params):
+    response = client.get('/peaks/question', query_string=dict(params, format='int16'))
+    assert response.status_code == 200
+    peaks = np.frombuffer(response.data, dtype='<i2').reshape(-1, 2)
+    assert int(response.headers['X-Peaks-Bins']) == len(peaks)
+    return peaks, response.headers
+
+
+def test_window_is_cut_from_the_matching_level(client, samples):
+    # 700 samples per bin is served from the 512-sample level, widened to whole bins
+    peaks, headers = raw_peaks(client, start=0.5, end=1.0, samples_per_bin=700)
+    assert int(headers['X-Peaks-Samples-Per-Bin']) == 512
+    first_bin, last_bin = 22050 // 512, -(-44100 // 512)
+    assert float(headers['X-Peaks-Start']) == first_bin * 512 / 44100
+    assert float(headers['X-Peaks-End']) == last_bin * 512 / 44100
+    assert np.array_equal(peaks, app.compute_peaks(samples, 512)[first_bin:last_bin])
+
+
+def test_whole_file_overview(client, samples):
+    peaks, headers = raw_peaks(client, pixels=100)
+    assert int(headers['X-Peaks-Samples-Per-Bin']) == 512
+    assert float(headers['X-Peaks-Duration']) == 2.0
+    assert np.array_equal(peaks, app.compute_peaks(samples, 512))
+
+
+def test_windows_finer_than_the_pyramid_use_the_audio(client, samples):
+    peaks, headers = raw_peaks(client, start=0.5, end=0.6, px_per_sec=4410)
+    assert int(headers['X-Peaks-Samples-Per-Bin']) == 10
+    assert float(headers['X-Peaks-Start']) == 0.5
+    assert np.array_equal(peaks, app.compute_peaks(samples[22050:26460], 10))
+
+
+def test_json_peaks_are_normalized(client, samples):
+    body = client.get('/peaks/question?start=1&end=1.5&samples_per_bin=2048').get_json()
+    expected = app.compute_peaks(samples, 2048)[44100 // 2048:-(-66150 // 2048)]
+    assert body['bins'] == len(expected)
+    assert np.allclose(body['peaks'], expected.ravel() / 32768.0, atol=1e-5)
+
+
+def test_invalid_peaks_requests(client):
+    assert client.get('/peaks/question?start=1.5&end=1').status_code == 400
+    assert client.get('/peaks/question?pixels=many').status_code == 400
+    assert client.get('/peaks/control').status_code == 404
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+
+from docx import Document
+
+import app
+
+CASE_INFO = {
+    'case_number': 'C-17',
+    'police_station': 'Central',
+    'district': 'North',
+    'cr_adr_number': 'CR-9',
+    'speaker_name': 'Speaker A'
+}
+
+
+def report_data(count):
+    data = []
+    for i in range(count):
+        label = f'word {i}'
+        data.append(['Question', label, 1000.0 * i, 1000.0 * i + 250, 250.0])
+        data.append(['Control', label, 2000.0 * i, 2000.0 * i + 400, 400.0])
+    return data
+
+
+def test_report_and_sidecars_carry_the_same_table():
+    files = dict(app.build_report_files(report_data(3), 'q.wav', 'c.wav', 3, True, CASE_INFO))
+    assert set(files) == {'analysis_report.docx', 'analysis_report.csv', 'analysis_report.json'}
+
+    doc = Document(io.BytesIO(files['analysis_report.docx']))
+    assert 'Total Matching Cluewords Found: 3' in [p.text for p in doc.paragraphs]
+    case_cells = [cell.text for row in doc.tables[0].rows for cell in row.cells]
+    assert all(value in case_cells for value in CASE_INFO.values())
+    header = [cell.text for cell in doc.tables[1].rows[0].cells]
+    assert header[0] == 'Question File: q.wav' and header[-1] == 'Control File: c.wav'
+    # Two header rows precede the cluewords
+    docx_rows = [[cell.text for cell in row.cells] for row in doc.tables[1].rows[2:]]
+
+    csv_rows = list(csv.reader(io.StringIO(files['analysis_report.csv'].decode('utf-8'))))
+    assert csv_rows[0][0] == 'Clueword'
+    assert csv_rows[1:] == docx_rows
+    assert docx_rows[1] == ['word 1', '00:00:01:000', '00:00:01:250', '250', '00:00:02:000', '00:00:02:400', '400']
+
+    report = json.loads(files['analysis_report.json'])
+    assert report['case_info'] == CASE_INFO
+    assert report['matches_count'] == 3
+    assert [c['label'] for c in report['cluewords']] == ['word 0', 'word 1', 'word 2']
+    assert report['cluewords'][2]['control'] == {'start_ms': 4000.0, 'end_ms': 4400.0, 'duration_ms': 400.0}
+
+
+def test_sidecars_can_be_turned_off(monkeypatch):
+    monkeypatch.setattr(app, 'REPORT_SIDECARS', False)
+    files = app.build_report_files(report_data(1), 'q.wav', 'c.wav', 1)
+    assert [name for name, _ in files] == ['analysis_report.docx']
+    assert len(Document(io.BytesIO(files[0][1])).tables[0].rows) == 3
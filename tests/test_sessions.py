@@ -0,0 +1,122 @@
+import pytest
+from sqlalchemy import event
+
+import app
+
+
+@pytest.fixture
+def client():
+    with app.app.app_context():
+        app.SessionAnnotation.query.delete()
+        app.ForensicSession.query.delete()
+        app.db.session.commit()
+    return app.app.test_client()
+
+
+def save(client, name, **fields):
+    response = client.post('/api/sessions', json=dict({'session_name': name, 'case_number': 'C1'}, **fields))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_session_list_etag_follows_the_page(client):
+    first = save(client, 'one')
+    save(client, 'two')
+
+    response = client.get('/api/sessions?case_number=C1')
+    etag = response.headers['ETag']
+    assert [s['session_name'] for s in response.get_json()['sessions']] == ['two', 'one']
+    assert client.get('/api/sessions?case_number=C1', headers={'If-None-Match': etag}).status_code == 304
+
+    # An edit bumps the session's version
+    save(client, 'one renamed', session_id=first['id'], version=first['version'])
+    response = client.get('/api/sessions?case_number=C1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    # A deleted session drops out of the page
+    client.delete(f"/api/sessions/{first['id']}")
+    response = client.get('/api/sessions?case_number=C1', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert [s['session_name'] for s in response.get_json()['sessions']] == ['two']
+
+
+def test_session_list_does_not_count_sessions(client):
+    for i in range(3):
+        save(client, f"s{i}")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.lower())
+
+    with app.app.app_context():
+        engine = app.db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        response = client.get('/api/sessions?limit=2&fields=session_name')
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    assert len(response.get_json()['sessions']) == 2
+    assert not any('count(forensic_sessions.id)' in statement for statement in statements)
+
+
+def patch(client, session_id, body):
+    return client.patch(f'/api/sessions/{session_id}', json=body)
+
+
+def test_patch_bumps_the_version_and_rejects_stale_saves(client):
+    session = save(client, 'one')
+
+    response = patch(client, session['id'], {'version': session['version'], 'fields': {'district': 'North'}})
+    assert response.status_code == 200
+    assert response.get_json()['version'] == session['version'] + 1
+
+    stale = patch(client, session['id'], {'version': session['version'], 'fields': {'district': 'South'}})
+    assert stale.status_code == 409
+    assert stale.get_json()['version'] == session['version'] + 1
+    assert client.get(f"/api/sessions/{session['id']}").get_json()['district'] == 'North'
+
+
+def test_patch_adds_updates_and_deletes_annotations(client):
+    session = save(client, 'one', annotations={
+        'question': [{'id': 1, 'label': 'hello', 'start': 0.0, 'end': 0.5}],
+        'control': [{'id': 2, 'label': 'hello', 'start': 1.0, 'end': 1.5}]
+    })
+
+    response = patch(client, session['id'], {'version': session['version'], 'annotations': {
+        'add': [{'panel': 'question', 'id': 3, 'label': 'world', 'start': 2.0, 'end': 2.5}],
+        'update': [{'panel': 'question', 'id': 1, 'label': 'hullo', 'end': 0.75}],
+        'delete': [{'panel': 'control', 'id': 2}]
+    }})
+    assert response.status_code == 200
+    assert response.get_json()['added'] == [{'panel': 'question', 'id': 3}]
+
+    annotations = client.get(f"/api/sessions/{session['id']}").get_json()['annotations']
+    assert annotations['question'] == [
+        {'id': 1, 'label': 'hullo', 'start': 0.0, 'end': 0.75},
+        {'id': 3, 'label': 'world', 'start': 2.0, 'end': 2.5}
+    ]
+    assert annotations['control'] == []
+
+
+@pytest.mark.parametrize('body', [
+    [1, 2],
+    {'version': 1, 'fields': {'session_name': None}},
+    {'version': 1, 'fields': {'bandpass_enabled': 'yes'}},
+    {'version': 1, 'fields': {'district': 7}},
+    {'version': 1, 'fields': ['district']},
+    {'version': 1, 'annotations': {'add': [{'panel': 'question', 'id': 9, 'label': None, 'start': 0, 'end': 1}]}},
+    {'version': 1, 'annotations': {'add': [{'panel': 'question', 'id': 9, 'label': 'x', 'start': 'soon', 'end': 1}]}},
+    {'version': 1, 'annotations': {'update': ['not an annotation']}},
+])
+def test_patch_rejects_malformed_bodies(client, body):
+    session = save(client, 'one')
+
+    response = patch(client, session['id'], body)
+    assert response.status_code == 400
+
+    saved = client.get(f"/api/sessions/{session['id']}").get_json()
+    assert saved['version'] == session['version']
+    assert saved['session_name'] == 'one'
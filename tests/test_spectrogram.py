@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+
+import app
+
+
+def wait_for_spectrogram(client, panel):
+    for _ in range(200):
+        response = client.get(f'/spectrogram/{panel}')
+        if response.status_code != 202:
+            return response
+        time.sleep(0.02)
+    raise AssertionError('spectrogram still pending')
+
+
+def test_failed_build_is_retried(monkeypatch, recordings, upload):
+    write_spectrogram_pyramid = app.write_spectrogram_pyramid
+
+    def disk_full(*args):
+        raise OSError('No space left on device')
+
+    monkeypatch.setattr(app, 'write_spectrogram_pyramid', disk_full)
+    client = app.app.test_client()
+    upload(client, 'question', recordings['question'])
+    assert wait_for_spectrogram(client, 'question').status_code == 500
+
+    monkeypatch.setattr(app, 'write_spectrogram_pyramid', write_spectrogram_pyramid)
+    response = wait_for_spectrogram(client, 'question')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'ready'
+
+
+def test_pyramid_levels_are_built_block_by_block(monkeypatch, tmp_path):
+    monkeypatch.setattr(app, 'SPECTROGRAM_TILE_COLUMNS', 32)
+    monkeypatch.setattr(app, 'SPECTROGRAM_BLOCK_COLUMNS', 10)
+    frame_rate = app.STANDARD_FRAME_RATE
+    t = np.arange(2 * frame_rate) / frame_rate
+    # A tone centred on row 16 and below the dB ceiling in the first second, silence after it
+    tone_row = 16
+    freq = (tone_row + 0.5) * app.SPECTROGRAM_MAX_FREQ / app.SPECTROGRAM_ROWS
+    samples = (np.where(t < 1, 0.02 * np.sin(2 * np.pi * freq * t), 0) * 32767).astype('<i2')
+    path = str(tmp_path / 'spectrogram.bin')
+    app.write_spectrogram_pyramid(path, samples, frame_rate)
+
+    info, levels = app.read_spectrogram_pyramid(path)
+    assert [len(level) for level in levels] == [200, 50, 13]
+    assert np.array_equal(levels[0], app.spectrogram_columns(samples, frame_rate, 0, 200))
+    for fine, coarse in zip(levels, levels[1:]):
+        padded = np.concatenate([fine, np.zeros((-len(fine) % 4, info['rows']), dtype=np.uint8)])
+        assert np.array_equal(coarse, padded.reshape(-1, 4, info['rows']).max(axis=1))
+
+    assert (levels[0][10:90].argmax(axis=1) == tone_row).all()
+    assert levels[0][110:].max() == 0
+
+
+def test_tiles_cover_each_level(monkeypatch, recordings, upload):
+    monkeypatch.setattr(app, 'SPECTROGRAM_TILE_COLUMNS', 32)
+    client = app.app.test_client()
+    audio_hash = upload(client, 'question', recordings['question'])['audio_hash']
+    info = wait_for_spectrogram(client, 'question').get_json()
+    assert [(level['columns'], level['tiles']) for level in info['levels']] == [(200, 7), (50, 2), (13, 1)]
+
+    _, levels = app.read_spectrogram_pyramid(app.spectrogram_path(audio_hash))
+    for index, level in enumerate(info['levels']):
+        tiles = []
+        for tile in range(level['tiles']):
+            response = client.get(info['tile_url'].format(level=index, tile=tile))
+            assert response.status_code == 200
+            columns = int(response.headers['X-Spectrogram-Columns'])
+            assert len(response.data) == columns * info['rows']
+            assert float(response.headers['X-Spectrogram-Start']) == \
+                tile * 32 * float(response.headers['X-Spectrogram-Seconds-Per-Column'])
+            tiles.append(response.data)
+        assert b''.join(tiles) == levels[index].tobytes()
+        assert client.get(info['tile_url'].format(level=index, tile=level['tiles'])).status_code == 404
+    assert client.get(info['tile_url'].format(level=len(levels), tile=0)).status_code == 404
+
+    tile_url = info['tile_url'].format(level=0, tile=1)
+    etag = client.get(tile_url).headers['ETag']
+    assert client.get(tile_url, headers={'If-None-Match': etag}).status_code == 304
@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+import pytest
+
+import app
+from conftest import write_wav
+
+FRAME_RATE = 44100
+
+
+@pytest.fixture
+def recording(tmp_path, babble):
+    """Speech at 1.0-2.5 s and 3.7-4.5 s of a 5.5 s recording, faint noise elsewhere."""
+    rng = np.random.default_rng(5)
+
+    def noise(seconds):
+        return rng.standard_normal(int(seconds * FRAME_RATE)) * 30
+
+    samples = np.concatenate([noise(1.0), babble(1.5, seed=3), noise(1.2), babble(0.8, seed=4), noise(1.0)])
+    return write_wav(tmp_path / 'speech.wav', samples)
+
+
+def spans(segments):
+    return [(segment['start'], segment['end']) for segment in segments]
+
+
+def test_speech_regions_follow_the_recording(recording, upload):
+    client = app.app.test_client()
+    upload(client, 'question', recording)
+
+    response = client.get('/speech/question')
+    assert response.status_code == 200
+    index = response.get_json()
+    assert index['duration'] == 5.5
+    assert np.allclose(spans(index['regions']), [(1.0, 2.5), (3.7, 4.5)], atol=0.05)
+    assert abs(index['speech_seconds'] - 2.3) < 0.1
+    # Pauses between syllables split words but not regions
+    words = spans(index['words'])
+    assert len(words) > 4
+    assert all(any(start <= w_start < w_end <= end for start, end in spans(index['regions'])) for w_start, w_end in words)
+
+    window = client.get('/speech/question?start=3&end=5').get_json()
+    assert spans(window['regions']) == spans(index['regions'])[1:]
+    assert spans(window['words']) == [word for word in words if word[1] > 3]
+
+
+def test_index_is_rebuilt_for_older_cache_entries(recording, upload):
+    client = app.app.test_client()
+    audio_hash = upload(client, 'question', recording)['audio_hash']
+    expected = client.get('/speech/question').get_json()
+
+    os.remove(app.speech_index_path(audio_hash))
+    app.load_speech_index.cache_clear()
+    assert client.get('/speech/question').get_json() == expected
+    assert os.path.exists(app.speech_index_path(audio_hash))
+
+
+def test_speech_segments_of_an_energy_track():
+    energy = np.full(600, -70.0, dtype=np.float32)
+    energy[100:150] = -20   # word
+    energy[155:200] = -20   # after a 50 ms pause: another word, same region
+    energy[250:254] = -20   # 40 ms click, too short for speech
+    energy[450:520] = -25   # separate region
+
+    regions, words = app.speech_segments(energy)
+    assert regions.tolist() == [[99, 201], [449, 521]]
+    assert words.tolist() == [[99, 151], [154, 201], [449, 521]]
+
+
+def test_invalid_speech_requests(recording, upload):
+    client = app.app.test_client()
+    assert client.get('/speech/question').status_code == 404
+    upload(client, 'question', recording)
+    assert client.get('/speech/question?start=3&end=2').status_code == 400
+    assert client.get('/speech/question?start=soon').status_code == 400
+    assert client.get('/speech/other').status_code == 400
@@ -0,0 +1,62 @@
+import functools
+import hashlib
+import wave
+
+import numpy as np
+import pytest
+from pydub import AudioSegment
+
+import app
+
+
+def write_wav(path, sample_width, channels, frame_rate=48000, seconds=0.25, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = int(frame_rate * seconds)
+    if sample_width == 1:
+        data = rng.integers(0, 256, frames * channels, dtype=np.uint8).tobytes()
+    elif sample_width == 2:
+        data = rng.integers(-2 ** 15, 2 ** 15, frames * channels).astype('<i2').tobytes()
+    else:
+        samples = rng.integers(-2 ** 23, 2 ** 23, frames * channels).astype('<i4')
+        data = samples.view(np.uint8).reshape(-1, 4)[:, :3].tobytes()
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(frame_rate)
+        f.writeframes(data)
+
+
+@pytest.mark.parametrize('channels', [1, 2, 4])
+@pytest.mark.parametrize('sample_width', [1, 2, 3])
+def test_streamed_standardization_matches_pydub(tmp_path, monkeypatch, sample_width, channels):
+    source = tmp_path / 'source.wav'
+    write_wav(source, sample_width, channels)
+    # Small blocks, so resampler state is carried across many block boundaries
+    monkeypatch.setattr(app, 'decode_pcm_blocks', functools.partial(app.decode_pcm_blocks, block_frames=1000))
+
+    output = tmp_path / 'standardized.wav'
+    app.standardize_to_wav(str(source), str(output))
+
+    expected = AudioSegment.from_file(str(source)).set_frame_rate(44100).set_channels(1).set_sample_width(2)
+    with wave.open(str(output), 'rb') as f:
+        assert (f.getframerate(), f.getnchannels(), f.getsampwidth()) == (44100, 1, 2)
+        assert f.readframes(f.getnframes()) == expected.raw_data
+
+
+def test_repeated_upload_is_served_from_the_audio_cache(monkeypatch, recordings, upload):
+    client = app.app.test_client()
+    first = upload(client, 'question', recordings['question'])
+    assert not first['cached']
+    assert first['audio_hash'] == hashlib.sha256(recordings['question'].read_bytes()).hexdigest()
+    standardized = client.get('/audio/question').data
+
+    def decode(*args):
+        raise AssertionError('cached upload was decoded again')
+
+    monkeypatch.setattr(app, 'build_audio_cache_entry', decode)
+    other_client = app.app.test_client()
+    second = upload(other_client, 'control', recordings['question'])
+    assert second['cached']
+    assert second['audio_hash'] == first['audio_hash']
+    assert second['duration'] == first['duration']
+    assert other_client.get('/audio/control').data == standardized
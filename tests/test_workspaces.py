@@ -0,0 +1,38 @@
+import os
+import time
+
+import app
+
+
+def workspace_of(client):
+    with client.session_transaction() as session:
+        return os.path.abspath(os.path.join(app.WORKSPACE_FOLDER, session['workspace_id']))
+
+
+def test_browsers_do_not_see_each_others_audio(recordings, upload):
+    alice, bob = app.app.test_client(), app.app.test_client()
+    upload(alice, 'question', recordings['question'])
+    upload(bob, 'question', recordings['control'])
+
+    assert workspace_of(alice) != workspace_of(bob)
+    assert alice.get('/audio/question').data != bob.get('/audio/question').data
+
+    upload(alice, 'control', recordings['control'])
+    assert alice.get('/peaks/control').status_code == 200
+    assert bob.get('/peaks/control').status_code == 404
+    assert bob.get('/audio/control').status_code == 404
+
+
+def test_idle_workspaces_expire(monkeypatch, recordings, upload):
+    monkeypatch.setattr(app, 'WORKSPACE_TTL_SECONDS', 60)
+    idle, active = app.app.test_client(), app.app.test_client()
+    upload(idle, 'question', recordings['question'])
+    upload(active, 'question', recordings['question'])
+    stamp = time.time() - 120
+    os.utime(workspace_of(idle), (stamp, stamp))
+
+    app.collect_artifacts()
+
+    assert not os.path.exists(workspace_of(idle))
+    assert active.get('/audio/question').status_code == 200
+    assert idle.get('/audio/question').status_code == 404